@@ -30,10 +30,58 @@ MCP_SERVER_URL = os.getenv("LARA_MCP_SERVER_URL", "https://mcp.laratranslate.com
 LARA_ACCESS_KEY_ID = os.getenv("LARA_ACCESS_KEY_ID", "")
 LARA_ACCESS_KEY_SECRET = os.getenv("LARA_ACCESS_KEY_SECRET", "")
 
+# MCP HTTP transport settings
+MCP_REQUEST_TIMEOUT = 30  # Seconds to wait for a response from the MCP server
+MCP_HTTP_POOL_SIZE = 10  # Maximum pooled keep-alive connections to the MCP server
+MCP_HTTP_KEEPALIVE_SECONDS = 60  # How long idle pooled connections are kept open (HTTP/2 only)
+MCP_HTTP2 = os.getenv("LARA_MCP_HTTP2", "").lower() in ("1", "true", "yes")  # Requires httpx[http2]
+
 # Translation settings
 SOURCE_LANGUAGE = "en"  # English
 TARGET_LANGUAGE = "fr"  # French
 
+# Translation batching settings
+TRANSLATION_BATCH_MAX_CUES = 50  # Maximum subtitle cues packed into one translate request
+TRANSLATION_BATCH_MIN_CUES = 5  # Smallest batch the adaptive controller backs off to
+TRANSLATION_BATCH_INITIAL_CUES = 20  # Batch size the adaptive controller starts from
+SENTENCE_PACKING_ENABLED = True  # Merge cue fragments of one sentence into a single translation unit
+SENTENCE_PACKING_MAX_CHARS = 300  # Maximum characters in a merged sentence unit
+TRANSLATION_BATCH_MAX_CHARS = 4000  # Maximum characters of cue text packed into one translate request
+TRANSLATION_STREAM_WINDOW_CUES = 500  # Cues read, translated and written to disk at a time (bounds memory on long files)
+
+# Translation concurrency settings
+TRANSLATION_MAX_CONCURRENCY = 4  # Maximum translate requests in flight at once (1 = sequential)
+TRANSLATION_INITIAL_CONCURRENCY = 2  # Requests in flight the adaptive controller starts from
+TRANSLATION_ADAPTIVE = True  # Grow/shrink concurrency and batch size from observed latency and throttling
+TRANSLATION_MAX_RETRIES = 3  # Retries per batch after HTTP 429/5xx or a timeout
+TRANSLATION_REQUESTS_PER_SECOND = 5.0  # Request rate limit shared by all workers (0 = unlimited)
+TRANSLATION_CHARS_PER_SECOND = 20000  # Character rate limit shared by all workers (0 = unlimited)
+
+# Translation memory settings
+TRANSLATION_CACHE_ENABLED = True  # Reuse earlier translations stored on disk
+TRANSLATION_CACHE_PATH = PROJECT_ROOT / "cache" / "translation_memory.sqlite3"
+TRANSLATION_CACHE_MAX_ENTRIES = 200000  # Least recently used entries are evicted beyond this size
+TRANSLATION_CACHE_MAX_AGE_DAYS = 180  # Entries unused for longer than this are evicted
+
+# Probe cache settings
+PROBE_CACHE_ENABLED = True  # Persist ffprobe results across runs
+PROBE_CACHE_PATH = PROJECT_ROOT / "cache" / "probe_cache.json"
+PROBE_CACHE_MAX_ENTRIES = 20000  # Oldest probes are dropped beyond this many files
+
+# Non-translatable cue settings
+CUE_CLASSIFIER_ENABLED = True  # Pass music notes, sound tags, numbers and symbol-only cues through without an API call
+PLACEHOLDER_MASKING_ENABLED = True  # Mask names, numbers and timestamps so similar cues share translations
+
+# Language identification settings
+LANGUAGE_ID_ENABLED = True  # Skip cues already in the target language and label untagged tracks offline
+LANGUAGE_ID_MIN_LETTERS = 12  # Shorter cues are never labeled and are always translated
+LANGUAGE_ID_MIN_MARGIN = 0.15  # Lead over the runner-up language required to trust a label
+
+# Subtitle charset detection settings
+CHARSET_SAMPLE_BYTES = 65536  # Prefix of a subtitle file inspected to detect its encoding
+CHARSET_MIN_CONFIDENCE = 0.5  # chardet guesses below this confidence use the fallback encoding
+CHARSET_FALLBACK = "cp1252"  # Encoding assumed for non-UTF-8 files chardet cannot identify
+
 # Video processing settings
 SUPPORTED_VIDEO_FORMATS = [".mkv", ".mp4", ".avi", ".mov", ".wmv", ".flv", ".webm"]
 SUPPORTED_SUBTITLE_FORMATS = [".srt", ".ass", ".ssa", ".sub", ".vtt"]
@@ -44,5 +92,10 @@ FFMPEG_PRESET = "medium"  # Encoding preset (fast, medium, slow)
 FFMPEG_PATH = "C:\\ffmpeg\\bin"  # Path to FFmpeg directory containing ffmpeg.exe and ffprobe.exe
 
 # Subtitle extraction settings
+SUBTITLE_EXTRACTION_ENGINE = "auto"  # "auto" (native Matroska reader for text tracks, ffmpeg otherwise) or "ffmpeg"
+SUBTITLE_TRACK_SELECTION = "auto"  # Track to translate: "auto" (best score), "first" or a stream index
+BITMAP_SUBTITLE_ACTION = "copy"  # "copy" (stream-copy PGS to .sup) or "skip"; bitmap tracks are never converted to text
 MIN_SUBTITLE_DURATION = 0.5  # Minimum subtitle duration in seconds
 MAX_SUBTITLE_DURATION = 10.0  # Maximum subtitle duration in seconds
+SUBTITLE_TIMING_ENABLED = False  # Enforce the duration limits, resolve overlaps and close gaps after translation (needs numpy)
+SUBTITLE_CLOSE_GAPS_MS = 100  # Gaps between cues up to this long are closed to avoid flicker (0 disables)
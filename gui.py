@@ -99,6 +99,7 @@ class VideoSubtitleGUI:
         # Sync language settings when they change
         self.language_frame.source_language.trace('w', self._on_language_changed)
         self.language_frame.target_language.trace('w', self._on_language_changed)
+        self.language_frame.set_track_mode_callback(self._on_track_mode_changed)
     
     def load_settings(self):
         """Load application settings."""
@@ -587,6 +588,23 @@ class VideoSubtitleGUI:
             
         except Exception as e:
             self.status_frame.log_message(f"Error updating language settings: {e}")
+    
+    def _on_track_mode_changed(self, *args):
+        """Handle source track selection changes, choosing the queued videos' source subtitles again."""
+        track_mode = self.language_frame.get_track_mode()
+        if track_mode == self.core_processor.track_mode:
+            return
+        self.core_processor.set_track_selection(track_mode)
+        self.status_frame.log_message(f"Source track selection: {track_mode}")
+        
+        if self.core_processor.get_queue():
+            try:
+                queue_data = self.core_processor.reselect_source_subtitles()
+                self.queue_frame.update_queue_display(queue_data)
+                items_with_subtitles = len([q for q in queue_data if q.get('subtitle_path')])
+                self.status_frame.log_message(f"Source subtitles selected again: {items_with_subtitles} video(s) with a subtitle")
+            except Exception as e:
+                self.status_frame.log_message(f"Error selecting source subtitles: {e}")
 
 
 def main():
@@ -8,19 +8,25 @@ from typing import List, Dict, Tuple
 import click
 from tqdm import tqdm
 
-from config import BASE_VIDEOS_DIR, SUBTITLES_DIR, TRANSLATED_SUBTITLES_DIR, OUTPUT_DIR
+from config import (BASE_VIDEOS_DIR, SUBTITLES_DIR, TRANSLATED_SUBTITLES_DIR, OUTPUT_DIR, SOURCE_LANGUAGE,
+                    SUBTITLE_TRACK_SELECTION, SUBTITLE_TIMING_ENABLED)
 from modules.subtitle_extractor import SubtitleExtractor
 from modules.mcp_client import MCPClient
 from modules.video_processor import VideoProcessor
+from modules.track_selector import TrackSelector
+from modules.subtitle_timing import TimingAdjuster
 
 
 class VideoSubtitleProcessor:
     """Main class that orchestrates the entire subtitle processing workflow."""
     
-    def __init__(self):
+    def __init__(self, max_concurrency: int = None, track_mode: str = None, timing: TimingAdjuster = None):
         self.extractor = SubtitleExtractor()
-        self.translator = MCPClient()
+        self.translator = MCPClient(max_concurrency=max_concurrency)
         self.processor = VideoProcessor()
+        self.selector = TrackSelector(SOURCE_LANGUAGE)
+        self.track_mode = track_mode or SUBTITLE_TRACK_SELECTION
+        self.timing = timing or TimingAdjuster()
         
     def process_single_video(self, video_path: Path, hardcoded: bool = False) -> bool:
         """Process a single video through the entire workflow."""
@@ -31,34 +37,36 @@ class VideoSubtitleProcessor:
         try:
             # Step 1: Extract subtitles
             print("\n1. Extracting subtitles...")
-            extracted_subtitles = self.extractor.extract_all_subtitles(video_path)
+            # Translation needs text, so text tracks are converted to SRT and bitmap tracks skipped
+            extracted_subtitles = self.extractor.extract_all_subtitles(video_path, output_format='srt')
             
             if not extracted_subtitles:
                 print(f"No subtitles found in {video_path.name}")
                 return False
             
-            # Step 2: Translate subtitles
-            print("\n2. Translating subtitles...")
-            translated_subtitles = []
+            # Step 2: Choose the source track, so only one track is sent to translation
+            print(f"\n2. Selecting source subtitle track ({self.track_mode})...")
+            source_subtitle = self.selector.select_file(
+                self.extractor.list_subtitle_tracks(video_path), extracted_subtitles, self.track_mode
+            )
+            
+            if not source_subtitle:
+                print("No translatable subtitle track found")
+                return False
             
-            for subtitle_path in extracted_subtitles:
-                print(f"   Translating: {subtitle_path.name}")
-                translated_path = self.translator.translate_subtitle_file(subtitle_path)
-                if translated_path:
-                    translated_subtitles.append(translated_path)
-                else:
-                    print(f"   Failed to translate: {subtitle_path.name}")
+            # Step 3: Translate the chosen subtitle
+            print(f"\n3. Translating: {source_subtitle.name}")
+            subtitle_path = self.translator.translate_subtitle_file(source_subtitle)
             
-            if not translated_subtitles:
-                print("No subtitles were successfully translated")
+            if not subtitle_path:
+                print(f"   Failed to translate: {source_subtitle.name}")
                 return False
             
-            # Step 3: Process video with translated subtitles
-            print("\n3. Processing video with translated subtitles...")
+            # Optional timing stage: shift, framerate conversion and duration/overlap fixes
+            self.timing.adjust_file(subtitle_path)
             
-            # Use the first translated subtitle for now
-            # In the future, you could add logic to choose the best subtitle
-            subtitle_path = translated_subtitles[0]
+            # Step 4: Process video with translated subtitles
+            print("\n4. Processing video with translated subtitles...")
             
             result_path = self.processor.process_video_with_subtitle(
                 video_path, subtitle_path, hardcoded=hardcoded
@@ -120,7 +128,17 @@ class VideoSubtitleProcessor:
 @click.option('--hardcoded', '-h', is_flag=True, help='Create hardcoded subtitle videos')
 @click.option('--keep-files', '-k', is_flag=True, help='Keep intermediate subtitle files')
 @click.option('--test', '-t', is_flag=True, help='Test MCP server connection')
-def main(video, all, hardcoded, keep_files, test):
+@click.option('--concurrency', '-c', type=int, default=None, help='Maximum translation requests in flight at once')
+@click.option('--track', default=None, help='Source subtitle track to translate: auto, first or a stream index')
+@click.option('--shift', type=int, default=0, help='Shift translated subtitles by this many milliseconds (negative = earlier)')
+@click.option('--fps-from', default=None, help='Frame rate the subtitles were timed for (e.g. 23.976)')
+@click.option('--fps-to', default=None, help='Frame rate of the target video (e.g. 25)')
+@click.option('--fix-timing', is_flag=True, help='Enforce duration limits, resolve overlaps and close small gaps')
+@click.option('--mux', type=(str, str), multiple=True, metavar='SUBTITLE LANG',
+              help='Add a subtitle file and its language to --video without translating (repeatable, one pass)')
+@click.option('--variant', type=click.Choice(['per-language', 'no-subtitles', 'hardcoded']), multiple=True,
+              help='Extra output written with --mux from the same read of the video (repeatable)')
+def main(video, all, hardcoded, keep_files, test, concurrency, track, shift, fps_from, fps_to, fix_timing, mux, variant):
     """Video Subtitle Extractor and Translator using LARA MCP Server."""
     
     if test:
@@ -133,12 +151,37 @@ def main(video, all, hardcoded, keep_files, test):
         print("Please check your LARA_ACCESS_KEY_ID and LARA_ACCESS_KEY_SECRET configuration")
         return
     
+    if mux:
+        if not video:
+            click.echo("--mux needs --video")
+            return
+        # Every subtitle goes into one output in a single pass; the first is the default track
+        tracks = [{'path': Path(path), 'language': language, 'default': i == 0}
+                  for i, (path, language) in enumerate(mux)]
+        video_processor = VideoProcessor()
+        variants = video_processor.plan_output_variants(
+            Path(video), tracks, per_language='per-language' in variant,
+            without_subtitles='no-subtitles' in variant, hardcoded='hardcoded' in variant or hardcoded
+        )
+        for result_path in video_processor.create_output_variants(Path(video), variants).values():
+            if result_path:
+                print(f"\n[OK] Successfully processed: {result_path.name}")
+            else:
+                print(f"\n[ERROR] Failed to process: {Path(video).name}")
+        return
+    
     if not video and not all:
         click.echo("Please specify either --video or --all option")
         click.echo("Use --help for more information")
         return
     
-    processor = VideoSubtitleProcessor()
+    try:
+        timing = TimingAdjuster(shift_ms=shift, source_fps=fps_from, target_fps=fps_to, normalize=fix_timing or SUBTITLE_TIMING_ENABLED)
+    except (ValueError, ZeroDivisionError) as e:
+        click.echo(f"Invalid timing options: {e}")
+        return
+    
+    processor = VideoSubtitleProcessor(max_concurrency=concurrency, track_mode=track, timing=timing)
     
     if video:
         # Process single video
@@ -0,0 +1,155 @@
+"""
+Adaptive concurrency and batch-size control for translation requests.
+"""
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+
+
+class ServerBusyError(Exception):
+    """Raised when the server throttles (429), fails (5xx) or times out on a request."""
+
+    def __init__(self, message: str, status_code: int = None, retry_after: float = None, timeout: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.timeout = timeout
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delay in seconds or HTTP date) into seconds from now."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveController:
+    """AIMD controller for translation concurrency and batch size.
+
+    After every ``increase_interval`` successful requests whose smoothed
+    per-cue latency stays within ``latency_tolerance`` of the best observed
+    so far, concurrency grows by one and the batch size by ``batch_step``
+    (additive increase). A 429, 5xx or timeout halves concurrency, and a
+    timeout also halves the batch size (multiplicative decrease). Retry-After
+    pauses every sender until the server is ready again.
+    """
+
+    def __init__(self, min_concurrency: int = 1, max_concurrency: int = 8, initial_concurrency: int = 2,
+                 min_batch_size: int = 5, max_batch_size: int = 100, initial_batch_size: int = 25,
+                 batch_step: int = 5, increase_interval: int = 3, latency_tolerance: float = 1.5,
+                 smoothing: float = 0.3, enabled: bool = True):
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.min_batch_size = max(1, min_batch_size)
+        self.max_batch_size = max(self.min_batch_size, max_batch_size)
+        self.batch_step = batch_step
+        self.increase_interval = max(1, increase_interval)
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.enabled = enabled
+
+        if enabled:
+            self.concurrency = min(max(initial_concurrency, self.min_concurrency), self.max_concurrency)
+            self.batch_size = min(max(initial_batch_size, self.min_batch_size), self.max_batch_size)
+        else:
+            # Fixed settings: always run at the configured ceilings
+            self.concurrency = self.max_concurrency
+            self.batch_size = self.max_batch_size
+
+        self.latency_per_cue: Optional[float] = None
+        self.best_latency_per_cue: Optional[float] = None
+        self.paused_until = 0.0
+        self.successes = 0
+        self.throttles = 0
+        self.timeouts = 0
+        self._streak = 0
+        self._lock = threading.Lock()
+
+    def record_success(self, latency: float, cues: int):
+        """Record a completed request and grow limits while latency stays flat."""
+        with self._lock:
+            self.successes += 1
+            sample = latency / max(cues, 1)
+            if self.latency_per_cue is None:
+                self.latency_per_cue = sample
+            else:
+                self.latency_per_cue += self.smoothing * (sample - self.latency_per_cue)
+
+            if self.best_latency_per_cue is None or self.latency_per_cue < self.best_latency_per_cue:
+                self.best_latency_per_cue = self.latency_per_cue
+
+            if not self.enabled:
+                return
+
+            if self.latency_per_cue > self.best_latency_per_cue * self.latency_tolerance:
+                # Latency is rising: hold the current settings
+                self._streak = 0
+                return
+
+            self._streak += 1
+            if self._streak >= self.increase_interval:
+                self._streak = 0
+                self.concurrency = min(self.concurrency + 1, self.max_concurrency)
+                self.batch_size = min(self.batch_size + self.batch_step, self.max_batch_size)
+
+    def record_throttle(self, retry_after: float = None, timeout: bool = False):
+        """Back off after a 429, 5xx or timeout, honoring Retry-After."""
+        with self._lock:
+            self._streak = 0
+            if timeout:
+                self.timeouts += 1
+            else:
+                self.throttles += 1
+
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+            if not self.enabled:
+                return
+
+            self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+            if timeout:
+                # Large batches are the usual cause of timeouts
+                self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+
+    def set_max_concurrency(self, max_concurrency: int):
+        """Change the concurrency ceiling, bringing the current setting within it."""
+        with self._lock:
+            self.max_concurrency = max(self.min_concurrency, max_concurrency)
+            if self.enabled:
+                self.concurrency = min(self.concurrency, self.max_concurrency)
+            else:
+                self.concurrency = self.max_concurrency
+
+    def pause_remaining(self) -> float:
+        """Seconds left before requests may be sent again."""
+        return max(0.0, self.paused_until - time.monotonic())
+
+    def wait_if_paused(self):
+        """Block until any Retry-After pause has elapsed."""
+        remaining = self.pause_remaining()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get the current settings and counters for monitoring."""
+        with self._lock:
+            return {
+                'adaptive': self.enabled,
+                'concurrency': self.concurrency,
+                'batch_size': self.batch_size,
+                'latency_per_cue': self.latency_per_cue,
+                'best_latency_per_cue': self.best_latency_per_cue,
+                'paused_for': self.pause_remaining(),
+                'successes': self.successes,
+                'throttles': self.throttles,
+                'timeouts': self.timeouts
+            }
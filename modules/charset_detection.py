@@ -0,0 +1,223 @@
+"""
+Charset detection for subtitle files: BOM check, then a bounded prefix sample, then a single decode.
+"""
+import codecs
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from config import CHARSET_SAMPLE_BYTES, CHARSET_MIN_CONFIDENCE, CHARSET_FALLBACK
+
+# Optional: chardet guesses legacy 8-bit encodings; without it they fall back to CHARSET_FALLBACK
+try:
+    import chardet
+except ImportError:
+    chardet = None
+
+# Byte order marks, longest first (the UTF-32 LE mark starts with the UTF-16 LE one)
+_BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Guesses replaced by the superset actually written by Windows subtitle tools
+_SUPERSETS = {
+    'ascii': 'utf-8',
+    'iso8859-1': 'cp1252',
+}
+
+# Python codec names that iconv (used by ffmpeg's -sub_charenc) spells differently
+_ICONV_NAMES = {
+    'mac-roman': 'MACINTOSH',
+    'mac-cyrillic': 'MACCYRILLIC',
+}
+
+# Encodings ffmpeg reads without being told (it expects UTF-8 and skips its BOM)
+_FFMPEG_NATIVE = {'utf-8', 'utf-8-sig'}
+
+_CACHE_MAX_ENTRIES = 4096
+
+_READ_CHUNK_BYTES = 1 << 20
+
+
+def _normalize(encoding: str) -> Optional[str]:
+    """Python's canonical name of an encoding, or None when Python does not know it."""
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        return None
+    return _SUPERSETS.get(name, name)
+
+
+def detect_bytes(sample: bytes, complete: bool = False) -> str:
+    """Encoding of a byte sample: a BOM, valid UTF-8, or chardet's guess.
+
+    ``complete`` says the sample is the whole file; otherwise a multi-byte
+    character cut at the end of the sample is not held against UTF-8.
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=complete)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    if chardet is not None:
+        guess = chardet.detect(sample)
+        encoding = _normalize(guess.get('encoding') or '')
+        if encoding and (guess.get('confidence') or 0) >= CHARSET_MIN_CONFIDENCE:
+            return encoding
+    return CHARSET_FALLBACK
+
+
+def ffmpeg_charset(encoding: str) -> Optional[str]:
+    """Value for ffmpeg's ``sub_charenc``/``charenc`` options, or None when ffmpeg needs no hint."""
+    name = _normalize(encoding) or encoding
+    if name in _FFMPEG_NATIVE:
+        return None
+    return _ICONV_NAMES.get(name, name.upper())
+
+
+class CharsetDetector:
+    """Detects and caches the encoding of subtitle files.
+
+    The guess is made from the first ``sample_bytes`` only, then checked by
+    decoding the rest of the file; a file the guess cannot decode gets
+    ``CHARSET_FALLBACK``. Results are cached by (path, size, mtime), so a file
+    read by several stages (track selection, language detection, translation,
+    muxing) is examined once.
+    """
+
+    def __init__(self, sample_bytes: int = CHARSET_SAMPLE_BYTES):
+        self.sample_bytes = max(4, sample_bytes)
+        self._cache: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path: Path, stat: os.stat_result) -> Tuple[str, int, int]:
+        return str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns
+
+    def _remember(self, key: Tuple[str, int, int], encoding: str):
+        with self._lock:
+            if len(self._cache) >= _CACHE_MAX_ENTRIES:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = encoding
+
+    @staticmethod
+    def _decodes(f, sample: bytes, encoding: str) -> bool:
+        """Whether the sample followed by the rest of an open file decodes with an encoding."""
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            decoder.decode(sample)
+            for chunk in iter(lambda: f.read(_READ_CHUNK_BYTES), b''):
+                decoder.decode(chunk)
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return False
+        return True
+
+    def detect(self, path: Path) -> str:
+        """Encoding of a file: guessed from its first ``sample_bytes``, checked against the whole file."""
+        with open(path, 'rb') as f:
+            key = self._key(path, os.fstat(f.fileno()))
+            encoding = self._cache.get(key)
+            if encoding is None:
+                sample = f.read(self.sample_bytes)
+                encoding = detect_bytes(sample, complete=key[1] <= len(sample))
+                if encoding != CHARSET_FALLBACK and not self._decodes(f, sample, encoding):
+                    print(f"[WARNING] {Path(path).name} is not valid {encoding}, decoding as {CHARSET_FALLBACK}")
+                    encoding = CHARSET_FALLBACK
+                self._remember(key, encoding)
+        return encoding
+
+    def iter_lines(self, path: Path) -> Iterator[str]:
+        """Yield the lines of a file as they are read, decoded strictly with its detected encoding.
+
+        Memory stays bounded by the longest line. Should a line still fail to
+        decode (the file changed since it was checked), the rest of the file
+        is read with the fallback encoding and the cache is corrected.
+        """
+        encoding = self.detect(path)
+        if encoding.startswith(('utf-16', 'utf-32')):
+            # Only chosen from a BOM; these cannot be split on newline bytes
+            with open(path, 'r', encoding=encoding, errors='replace') as f:
+                yield from f
+            return
+
+        with open(path, 'rb') as f:
+            key = self._key(path, os.fstat(f.fileno()))
+            for raw in f:
+                try:
+                    line = raw.decode(encoding)
+                except UnicodeDecodeError:
+                    if encoding != CHARSET_FALLBACK:
+                        print(f"[WARNING] {Path(path).name} is not valid {encoding}, "
+                              f"decoding the rest as {CHARSET_FALLBACK}")
+                        encoding = CHARSET_FALLBACK
+                        self._remember(key, encoding)
+                    line = raw.decode(encoding, errors='replace')
+                if '\r' in line.rstrip('\r\n'):
+                    # Lone CR line breaks (classic Mac files)
+                    yield from line.rstrip('\r\n').replace('\r\n', '\n').replace('\r', '\n').split('\n')
+                else:
+                    yield line
+
+    def read_text(self, path: Path) -> str:
+        """Read a file once as bytes and decode it once with its detected encoding.
+
+        A file whose sampled prefix looked like UTF-8 but which turns out not
+        to be is decoded with the fallback encoding instead, and the cache is
+        corrected so later stages do not repeat the mistake.
+        """
+        with open(path, 'rb') as f:
+            key = self._key(path, os.fstat(f.fileno()))
+            data = f.read()
+
+        encoding = self._cache.get(key)
+        if encoding is None:
+            encoding = detect_bytes(data[:self.sample_bytes], complete=len(data) <= self.sample_bytes)
+            self._remember(key, encoding)
+
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            if encoding != CHARSET_FALLBACK:
+                print(f"[WARNING] {Path(path).name} is not valid {encoding}, decoding as {CHARSET_FALLBACK}")
+                self._remember(key, CHARSET_FALLBACK)
+            return data.decode(CHARSET_FALLBACK, errors='replace')
+
+
+_shared_detector: Optional[CharsetDetector] = None
+_shared_lock = threading.Lock()
+
+
+def get_charset_detector() -> CharsetDetector:
+    """Process-wide detector, so every stage shares one cache."""
+    global _shared_detector
+    if _shared_detector is None:
+        with _shared_lock:
+            if _shared_detector is None:
+                _shared_detector = CharsetDetector()
+    return _shared_detector
+
+
+def detect_charset(path: Path) -> str:
+    """Encoding of a subtitle file (cached)."""
+    return get_charset_detector().detect(path)
+
+
+def read_subtitle_text(path: Path) -> str:
+    """Content of a subtitle file in whatever encoding it was saved."""
+    return get_charset_detector().read_text(path)
+
+
+def iter_subtitle_lines(path: Path) -> Iterator[str]:
+    """Lines of a subtitle file in whatever encoding it was saved, read lazily."""
+    return get_charset_detector().iter_lines(path)
@@ -8,10 +8,12 @@ from typing import List, Dict, Optional, Callable
 import threading
 from queue import Queue
 
-from config import SUPPORTED_VIDEO_FORMATS, SUPPORTED_SUBTITLE_FORMATS
+from config import SUPPORTED_VIDEO_FORMATS, SUPPORTED_SUBTITLE_FORMATS, SUBTITLE_TRACK_SELECTION
 from .subtitle_extractor import SubtitleExtractor
 from .mcp_client import MCPClient
 from .video_processor import VideoProcessor
+from .track_selector import TrackSelector
+from .subtitle_timing import TimingAdjuster
 
 
 class CoreProcessor:
@@ -24,6 +26,8 @@ class CoreProcessor:
         self.processing_queue = []
         self.queue_lock = threading.Lock()
         self.stop_processing = False
+        self.track_mode = SUBTITLE_TRACK_SELECTION
+        self.timing = TimingAdjuster()
         
     def set_output_directory(self, output_path: Path):
         """Set the output directory for video processing."""
@@ -49,34 +53,60 @@ class CoreProcessor:
             return []
         
         # Find matching subtitle files in the subtitles directory
-        subtitle_files = []
-        subtitles_dir = Path("subtitles")
-        if subtitles_dir.exists():
-            for ext in SUPPORTED_SUBTITLE_FORMATS:
-                subtitle_files.extend(subtitles_dir.glob(f"*{ext}"))
+        subtitle_files = self._find_subtitle_files()
         
         # Build queue
         for video_file in sorted(video_files):
-            video_name = video_file.stem
-            matching_subtitle = None
-            
-            # Look for matching subtitle
-            for subtitle_file in subtitle_files:
-                subtitle_stem = subtitle_file.stem
-                # Check if subtitle filename starts with video name (handles _subtitle_X suffix)
-                if subtitle_stem.startswith(video_name):
-                    matching_subtitle = subtitle_file.name
-                    break
-            
             # Add to queue
             self.processing_queue.append({
                 'video_path': video_file,
-                'subtitle_path': matching_subtitle,
+                'subtitle_path': self._match_subtitle(video_file, subtitle_files),
                 'status': 'Pending'
             })
         
         return self.processing_queue.copy()
     
+    def _find_subtitle_files(self) -> List[Path]:
+        """List the subtitle files in the subtitles directory."""
+        subtitle_files = []
+        subtitles_dir = Path("subtitles")
+        if subtitles_dir.exists():
+            for ext in SUPPORTED_SUBTITLE_FORMATS:
+                subtitle_files.extend(subtitles_dir.glob(f"*{ext}"))
+        return subtitle_files
+    
+    def _match_subtitle(self, video_file: Path, subtitle_files: List[Path]) -> Optional[str]:
+        """Name of the subtitle file to translate for a video, chosen with the current track mode."""
+        # Look for matching subtitles (filename starts with video name, handles _subtitle_X suffix)
+        candidates = sorted(f for f in subtitle_files if f.stem.startswith(video_file.stem))
+        if len(candidates) == 1:
+            return candidates[0].name
+        if candidates:
+            chosen = self.select_source_subtitle(video_file, candidates)
+            return chosen.name if chosen else None
+        return None
+    
+    def reselect_source_subtitles(self) -> List[Dict]:
+        """Choose each queued video's source subtitle again, e.g. after the track mode changed."""
+        subtitle_files = self._find_subtitle_files()
+        with self.queue_lock:
+            items = list(self.processing_queue)
+        for item in items:
+            # Selection may probe the video, so it runs outside the lock
+            self.set_subtitle_for_video(item['video_path'].name, self._match_subtitle(item['video_path'], subtitle_files))
+        return self.get_queue()
+    
+    def select_source_subtitle(self, video_path: Path, subtitle_files: List[Path]) -> Optional[Path]:
+        """Choose which of a video's extracted subtitle files to translate."""
+        try:
+            tracks = self.extractor.list_subtitle_tracks(video_path)
+        except Exception as e:
+            print(f"[WARNING] Could not list subtitle tracks of {video_path.name}: {e}")
+            tracks = []
+        
+        selector = TrackSelector(self.get_language_settings()['source_language'])
+        return selector.select_file(tracks, subtitle_files, self.track_mode)
+    
     def get_queue(self) -> List[Dict]:
         """Get current processing queue."""
         with self.queue_lock:
@@ -121,8 +151,13 @@ class CoreProcessor:
     
     def extract_and_remove_subtitles(self, output_path: Path, 
                                    progress_callback: Callable[[str, float], None] = None,
-                                   status_callback: Callable[[str, str], None] = None) -> List[Dict]:
-        """Extract subtitles and create videos without subtitles."""
+                                   status_callback: Callable[[str, str], None] = None,
+                                   keep_native: bool = False) -> List[Dict]:
+        """Extract subtitles and create videos without subtitles.
+        
+        Subtitles are extracted as SRT, the only format translation reads;
+        ``keep_native`` keeps ASS/WebVTT/PGS tracks in their own format instead.
+        """
         if not self.processing_queue:
             raise ValueError("Queue is empty! Please scan input folder first.")
         
@@ -140,24 +175,31 @@ class CoreProcessor:
                 progress_callback(f"Processing {video_name} ({i+1}/{total})", (i / total) * 100)
             
             try:
-                # Extract subtitles
-                extracted_subtitles = self.extractor.extract_all_subtitles(item['video_path'])
+                # Extract subtitles and strip them from the video in a single read of the source
+                output_file = output_path / f"{item['video_path'].stem}_no_subtitles.mkv"
+                outcome = self.extractor.extract_and_strip(item['video_path'], output_file,
+                                                           output_format=None if keep_native else 'srt')
+                extracted_subtitles = outcome['subtitles']
                 
-                if extracted_subtitles:
+                if extracted_subtitles or outcome['skipped']:
                     if status_callback:
-                        status_callback(video_name, f"Extracted {len(extracted_subtitles)} subtitle tracks")
-                    
-                    # Create video without subtitles
-                    output_file = output_path / f"{item['video_path'].stem}_no_subtitles.mkv"
-                    result = self.processor.create_video_without_subtitles(item['video_path'], output_file)
+                        status_callback(video_name, f"Extracted {len(extracted_subtitles)} subtitle tracks, "
+                                        f"skipped {len(outcome['skipped'])} "
+                                        f"(read the source {outcome['source_reads']}x, "
+                                        f"{outcome['bytes_read'] / 1024 / 1024:.1f} MB, "
+                                        f"wrote {outcome['bytes_written'] / 1024 / 1024:.1f} MB)")
                     
-                    if result:
+                    if outcome['video']:
                         self.update_item_status(video_name, 'Completed')
                         results.append({
                             'video': video_name,
                             'status': 'Completed',
                             'output': str(output_file),
-                            'subtitles_extracted': len(extracted_subtitles)
+                            'subtitles_extracted': len(extracted_subtitles),
+                            'subtitles_skipped': outcome['skipped'],
+                            'source_reads': outcome['source_reads'],
+                            'bytes_read': outcome['bytes_read'],
+                            'bytes_written': outcome['bytes_written']
                         })
                     else:
                         self.update_item_status(video_name, 'Error')
@@ -189,11 +231,30 @@ class CoreProcessor:
     
     def translate_subtitles(self, source_lang: str, target_lang: str,
                           progress_callback: Callable[[str, float], None] = None,
-                          status_callback: Callable[[str, str], None] = None) -> List[Dict]:
-        """Translate existing subtitle files."""
+                          status_callback: Callable[[str, str], None] = None,
+                          max_concurrency: int = None) -> List[Dict]:
+        """Translate existing subtitle files.
+        
+        max_concurrency overrides how many translate requests the client keeps
+        in flight at once (1 sends batches sequentially).
+        """
         if not self.processing_queue:
             raise ValueError("Queue is empty! Please scan input folder first.")
         
+        if max_concurrency:
+            self.translator.set_max_concurrency(max_concurrency)
+        
+        # Surface progress notifications streamed by the server while a file is translating
+        current_video = {'name': None}
+        
+        def on_notification(message: Dict):
+            if message.get('method') == 'notifications/progress':
+                params = message.get('params', {})
+                progress = params.get('message') or f"{params.get('progress')}/{params.get('total', '?')}"
+                status_callback(current_video['name'], f"Server progress: {progress}")
+        
+        self.translator.on_notification = on_notification if status_callback else None
+        
         results = []
         items_with_subtitles = [item for item in self.processing_queue if item['subtitle_path']]
         total = len(items_with_subtitles)
@@ -207,6 +268,7 @@ class CoreProcessor:
             
             video_name = item['video_path'].name
             subtitle_name = item['subtitle_path']
+            current_video['name'] = video_name
             self.update_item_status(video_name, 'Translating')
             
             if progress_callback:
@@ -218,19 +280,16 @@ class CoreProcessor:
                 if not subtitle_path.exists():
                     raise FileNotFoundError(f"Subtitle file not found: {subtitle_path}")
                 
-                # Read subtitle content
-                subtitle_content = subtitle_path.read_text(encoding='utf-8')
+                # Create translated subtitle filename
+                translated_name = Path(subtitle_name).stem + f'_{target_lang}.srt'
+                translated_path = Path("subtitles") / translated_name
                 
-                # Translate subtitle using the new SRT-aware method
-                translated_content = self.translator.translate_srt_content(subtitle_content, source_lang, target_lang)
+                # Translate subtitle cues window by window, writing each window as it completes
+                cues_written = self.translator.translate_srt_stream(subtitle_path, translated_path, source_lang, target_lang)
                 
-                if translated_content:
-                    # Create translated subtitle filename
-                    translated_name = subtitle_name.replace('.srt', f'_{target_lang}.srt')
-                    translated_path = Path("subtitles") / translated_name
-                    
-                    # Write translated content
-                    translated_path.write_text(translated_content, encoding='utf-8')
+                if cues_written:
+                    # Optional timing stage: duration limits, overlaps and gaps
+                    timing_fixes = self.timing.adjust_file(translated_path) or {}
                     
                     # Update queue item to include translated subtitle
                     item['translated_subtitle_path'] = translated_name
@@ -240,11 +299,20 @@ class CoreProcessor:
                         'video': video_name,
                         'status': 'Completed',
                         'original_subtitle': subtitle_name,
-                        'translated_subtitle': translated_name
+                        'translated_subtitle': translated_name,
+                        'dedup_ratio': self.translator.last_dedup_stats.get('dedup_ratio', 0.0),
+                        'requests_saved': self.translator.last_packing_stats.get('requests_saved', 0),
+                        'cues_in_target_language': self.translator.last_language_stats.get('cues_in_target_language', 0),
+                        'requests_avoided': self.translator.last_classifier_stats.get('requests_avoided', 0),
+                        'timing_fixes': timing_fixes
                     })
                     
                     if status_callback:
-                        status_callback(video_name, f"Translated to {target_lang}")
+                        status_callback(video_name, f"Translated to {target_lang} "
+                                        f"({self.translator.last_dedup_stats.get('duplicates_skipped', 0)} duplicate cues skipped, "
+                                        f"{self.translator.last_packing_stats.get('requests_saved', 0)} requests saved by sentence packing, "
+                                        f"{self.translator.last_language_stats.get('cues_in_target_language', 0)} cues already in {target_lang}, "
+                                        f"{self.translator.last_classifier_stats.get('requests_avoided', 0)} requests avoided by pass-through and masking)")
                 else:
                     raise ValueError("Translation returned empty content")
                     
@@ -264,10 +332,28 @@ class CoreProcessor:
         
         return results
     
+    def find_translated_tracks(self, item: Dict, languages: List[str]) -> List[Dict]:
+        """Translations of a queue item's subtitle into the given languages, as mux tracks (first is default)."""
+        tracks = []
+        for language in languages:
+            translated_path = Path("subtitles") / (Path(item['subtitle_path']).stem + f'_{language}.srt')
+            if translated_path.exists():
+                tracks.append({'path': translated_path, 'language': language, 'default': not tracks})
+        return tracks
+    
     def merge_subtitles(self, input_path: Path, output_path: Path,
                        progress_callback: Callable[[str, float], None] = None,
-                       status_callback: Callable[[str, str], None] = None) -> List[Dict]:
-        """Merge selected subtitles with videos."""
+                       status_callback: Callable[[str, str], None] = None,
+                       languages: List[str] = None, per_language: bool = False,
+                       without_subtitles: bool = False) -> List[Dict]:
+        """Merge selected subtitles with videos.
+        
+        With ``languages``, each video's translations into those languages
+        (as written by translate_subtitles) are added together in a single
+        mux, giving one multi-language file instead of one copy per language.
+        ``per_language`` and ``without_subtitles`` add one MKV per language
+        and a subtitle-free MKV, written from the same read of the source.
+        """
         items_with_subtitles = [item for item in self.processing_queue if item['subtitle_path']]
         if not items_with_subtitles:
             raise ValueError("No videos have subtitles selected for merging!")
@@ -295,7 +381,20 @@ class CoreProcessor:
                 
                 # Merge subtitle with video
                 output_file = output_path / f"{video_path.stem}_with_subtitles.mkv"
-                result = self.processor.incorporate_subtitle(video_path, subtitle_path, output_file)
+                if languages:
+                    tracks = self.find_translated_tracks(item, languages)
+                    if not tracks:
+                        raise FileNotFoundError(f"No translations of {item['subtitle_path']} into {', '.join(languages)}")
+                    variants = self.processor.plan_output_variants(
+                        video_path, tracks, output_file, per_language=per_language, without_subtitles=without_subtitles
+                    )
+                    outputs = self.processor.create_output_variants(video_path, variants)
+                    result = outputs.get('subtitles')
+                    extra_outputs = [str(path) for name, path in outputs.items() if path and name != 'subtitles']
+                else:
+                    tracks = [{'path': subtitle_path}]
+                    result = self.processor.incorporate_subtitle(video_path, subtitle_path, output_file)
+                    extra_outputs = []
                 
                 if result:
                     self.update_item_status(video_name, 'Completed')
@@ -303,7 +402,9 @@ class CoreProcessor:
                         'video': video_name,
                         'status': 'Completed',
                         'output': str(output_file),
-                        'subtitle': item['subtitle_path']
+                        'subtitle': item['subtitle_path'],
+                        'tracks': [track['path'].name for track in tracks],
+                        'variants': extra_outputs
                     })
                 else:
                     self.update_item_status(video_name, 'Error')
@@ -373,7 +474,7 @@ class CoreProcessor:
                         })
                 else:
                     # Extract subtitles only
-                    extracted_subtitles = self.extractor.extract_all_subtitles(video_path)
+                    extracted_subtitles = self.extractor.extract_all_subtitles(video_path, output_format='srt')
                     
                     if extracted_subtitles:
                         self.update_item_status(video_name, 'Completed')
@@ -451,6 +552,10 @@ class CoreProcessor:
         self.source_language = source_lang
         self.target_language = target_lang
     
+    def set_track_selection(self, mode: str):
+        """Set how the source subtitle track is chosen: "auto", "first" or a stream index."""
+        self.track_mode = mode or SUBTITLE_TRACK_SELECTION
+    
     def get_language_settings(self) -> Dict[str, str]:
         """Get the current language settings."""
         return {
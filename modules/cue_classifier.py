@@ -0,0 +1,137 @@
+"""
+Local handling of cues that need no translation, and placeholder masking of the rest.
+"""
+import re
+from typing import List, Dict, Optional, Any, Tuple
+
+# Markup and tags that carry no translatable words
+_MARKUP = re.compile(r'<[^>]+>|\{[^}]*\}')
+_SOUND_TAG = re.compile(r'\[[^\]]*\]|\((?:[^a-z()]*)\)')
+_WORD_LETTER = re.compile(r'[^\W\d_]')
+
+# Spans masked as placeholders before translation, most specific first
+_TIMESTAMP = r'\b\d{1,2}:\d{2}(?::\d{2})?\b'
+_NUMBER = r'\b\d+(?:[.,]\d+)*\b'
+# A capitalized word that does not start a sentence (the cue start, or after . ! ? … or a speaker dash)
+_NAME = r"(?<![.!?…\-]\s)(?<!^)\b[A-Z][a-z]+\b(?!')"
+
+_PLACEHOLDER = re.compile(r'\{(\d+)\}')
+
+# Languages that capitalize common nouns, where capitalization does not mark a name
+CAPITALIZED_NOUN_LANGUAGES = {'de'}
+
+
+def is_translatable(text: str) -> bool:
+    """Whether a cue has words left once markup, sound tags ([MUSIC], (SIRENS)) and symbols are removed."""
+    stripped = _SOUND_TAG.sub(' ', _MARKUP.sub(' ', text or ''))
+    return _WORD_LETTER.search(stripped) is not None
+
+
+class CueClassifier:
+    """Separates cues that can be passed through unchanged from those to translate.
+
+    Music notes, sound tags, numbers, punctuation and speaker dashes have
+    nothing to translate; ``pending_texts`` holds the remaining cues and
+    ``merge`` puts their translations back among the passed-through cues.
+    """
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.pending: List[int] = []
+        self.passthrough: List[int] = []
+        for i, text in enumerate(texts):
+            (self.pending if is_translatable(text) else self.passthrough).append(i)
+
+    @property
+    def pending_texts(self) -> List[str]:
+        """Texts of the cues that need translation."""
+        return [self.texts[i] for i in self.pending]
+
+    def merge(self, translations: List[Optional[str]]) -> List[Optional[str]]:
+        """Full list of cue texts: translations for pending cues, originals for the rest."""
+        results: List[Optional[str]] = list(self.texts)
+        for i, translation in zip(self.pending, translations):
+            results[i] = translation
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the pass-through counters."""
+        return {
+            'total_cues': len(self.texts),
+            'passed_through': len(self.passthrough),
+            'unique_passed_through': len({self.texts[i] for i in self.passthrough})
+        }
+
+
+class PlaceholderMasker:
+    """Replaces names, numbers and timestamps with numbered placeholders.
+
+    "Thank you, John." and "Thank you, Mary." both become "Thank you, {0}.",
+    so they share one translation and one translation-memory entry.
+    ``unmask`` restores the original spans and reports every text whose
+    translation lost or duplicated a placeholder, so it can be translated
+    again unmasked.
+    """
+
+    def __init__(self, texts: List[str], mask_names: bool = True):
+        patterns = [_TIMESTAMP, _NUMBER] + ([_NAME] if mask_names else [])
+        self._pattern = re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))
+        self.texts = texts
+        self.masked: List[str] = []
+        self.slots: List[List[str]] = []
+        for text in texts:
+            masked, slots = self.mask(text)
+            self.masked.append(masked)
+            self.slots.append(slots)
+
+    def mask(self, text: str) -> Tuple[str, List[str]]:
+        """Return the masked text and the original span of each placeholder."""
+        if not text or '{' in text or '}' in text:
+            # Braces would be ambiguous with placeholders
+            return text, []
+
+        slots: List[str] = []
+
+        def replace(match):
+            slots.append(match.group(0))
+            return f"{{{len(slots) - 1}}}"
+
+        return self._pattern.sub(replace, text), slots
+
+    @staticmethod
+    def preserved(masked: str, translation: str) -> bool:
+        """Whether a translation kept every placeholder of a masked text exactly once."""
+        return sorted(_PLACEHOLDER.findall(translation)) == sorted(_PLACEHOLDER.findall(masked))
+
+    def unmask(self, translations: List[Optional[str]]) -> Tuple[List[Optional[str]], List[int]]:
+        """Restore placeholders; return the texts and the indexes whose placeholders did not survive."""
+        results: List[Optional[str]] = []
+        failed: List[int] = []
+        for i, (translation, slots) in enumerate(zip(translations, self.slots)):
+            if not slots or translation is None:
+                results.append(translation)
+                continue
+            found = [int(n) for n in _PLACEHOLDER.findall(translation)]
+            if sorted(found) != list(range(len(slots))):
+                failed.append(i)
+                results.append(None)
+                continue
+            results.append(_PLACEHOLDER.sub(lambda match: slots[int(match.group(1))], translation))
+        return results, failed
+
+    @property
+    def masked_count(self) -> int:
+        """Number of texts with at least one placeholder."""
+        return sum(1 for slots in self.slots if slots)
+
+    @property
+    def merged(self) -> int:
+        """Distinct texts that became identical once masked."""
+        return len(set(self.texts)) - len(set(self.masked))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the masking counters."""
+        return {
+            'masked_texts': self.masked_count,
+            'merged_by_masking': self.merged
+        }
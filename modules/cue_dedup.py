@@ -0,0 +1,63 @@
+"""
+In-file deduplication of subtitle cue texts before translation.
+"""
+from typing import List, Dict, Optional, Any
+
+from modules.translation_cache import TranslationCache
+
+
+class CueDeduplicator:
+    """Collapses identical cue texts so each unique string is translated once.
+
+    Texts are compared after the same normalization the translation memory
+    uses for its keys. ``unique_texts`` holds the first occurrence of each
+    distinct text; ``expand`` fans translations of those back out to every
+    original cue position.
+    """
+
+    def __init__(self, texts: List[str]):
+        self.total = len(texts)
+        self.unique_texts: List[str] = []
+        self.positions: List[int] = []
+
+        index_by_key: Dict[str, int] = {}
+        for text in texts:
+            key = TranslationCache.normalize_text(text)
+            unique_index = index_by_key.get(key)
+            if unique_index is None:
+                unique_index = len(self.unique_texts)
+                index_by_key[key] = unique_index
+                self.unique_texts.append(text)
+            self.positions.append(unique_index)
+
+    @property
+    def unique(self) -> int:
+        """Number of distinct texts."""
+        return len(self.unique_texts)
+
+    @property
+    def saved(self) -> int:
+        """Number of cue translations avoided."""
+        return self.total - self.unique
+
+    @property
+    def ratio(self) -> float:
+        """Fraction of cues that are duplicates of an earlier cue."""
+        return self.saved / self.total if self.total else 0.0
+
+    def expand(self, unique_translations: List[Optional[str]]) -> List[Optional[str]]:
+        """Map translations of ``unique_texts`` back onto every original position."""
+        return [unique_translations[unique_index] for unique_index in self.positions]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the deduplication counters."""
+        return {
+            'total_cues': self.total,
+            'unique_cues': self.unique,
+            'duplicates_skipped': self.saved,
+            'dedup_ratio': self.ratio
+        }
+
+    def describe(self) -> str:
+        """Short human-readable summary of the savings."""
+        return f"{self.total} cues → {self.unique} unique ({self.ratio:.1%} duplicates skipped)"
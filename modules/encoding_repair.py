@@ -0,0 +1,74 @@
+"""
+Repair of mojibake: UTF-8 text that was decoded as Latin-1/Windows-1252.
+"""
+import logging
+import re
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Characters Windows-1252 shows for bytes 0x80-0x9F; the five undefined bytes decode to C1 controls
+_CP1252_HIGH = {byte: bytes([byte]).decode('cp1252', errors='ignore') or chr(byte) for byte in range(0x80, 0xA0)}
+
+# Character -> original byte, for every character a UTF-8 continuation byte can turn into
+_TO_BYTE = {char: byte for byte, char in _CP1252_HIGH.items()}
+_TO_BYTE.update({chr(byte): byte for byte in range(0x80, 0xA0) if chr(byte) not in _TO_BYTE})
+_TO_BYTE.update({chr(byte): byte for byte in range(0xA0, 0x100)})
+
+# Characters standing for continuation bytes 0x80-0xBF
+_CONTINUATION = '[' + re.escape(''.join(sorted(char for char, byte in _TO_BYTE.items() if byte < 0xC0))) + ']'
+
+# Sequences whose A0 byte (non-breaking space) was later turned into a plain space or dropped
+_LOST_NBSP = {
+    'Â': '',    # C2 A0, the non-breaking space itself (French typography before ? ! : ;)
+    'Ã ': 'à',  # C3 A0
+}
+
+# A lead byte followed by the number of continuation bytes it announces
+_MOJIBAKE = re.compile(
+    '[\u00c2-\u00df]' + _CONTINUATION +
+    '|[\u00e0-\u00ef]' + _CONTINUATION + '{2}' +
+    '|[\u00f0-\u00f4]' + _CONTINUATION + '{3}'
+)
+
+# Lost-NBSP sequences; "Ã " and "Â" also occur in valid uppercase text ("IRMÃ E MÃE")
+_LOST_NBSP_PATTERN = re.compile('Â(?=[ ?!.,:;»])|Ã ')
+
+# Both kinds, for texts already known to be garbled
+_MOJIBAKE_OR_LOST_NBSP = re.compile(_MOJIBAKE.pattern + '|' + _LOST_NBSP_PATTERN.pattern)
+
+
+def _redecode(match) -> str:
+    """Original characters of one mojibake sequence, or the sequence unchanged if it is not valid UTF-8."""
+    sequence = match.group(0)
+    if sequence in _LOST_NBSP:
+        return _LOST_NBSP[sequence]
+    try:
+        return bytes(_TO_BYTE[char] for char in sequence).decode('utf-8')
+    except UnicodeDecodeError:
+        return sequence
+
+
+def repair_text(text: Optional[str]) -> Optional[str]:
+    """Repair UTF-8-as-Latin-1 mojibake ("Ã©tÃ©" → "été") in a single pass over the text.
+
+    Works for any language: each suspicious sequence is mapped back to its
+    bytes and re-decoded as UTF-8, and kept as-is when that fails, so correct
+    accented text is never altered. Lost non-breaking spaces ("Ã " for "à")
+    are ambiguous with valid text, so they are only repaired in a text that
+    also held an unambiguous mojibake sequence.
+    """
+    if not text:
+        return text
+    repaired = _MOJIBAKE.sub(_redecode, text)
+    if repaired != text and _LOST_NBSP_PATTERN.search(text):
+        # The text is garbled for sure: repair it again, lost non-breaking spaces included
+        repaired = _MOJIBAKE_OR_LOST_NBSP.sub(_redecode, text)
+    if repaired != text and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Repaired mojibake: %r -> %r", text, repaired)
+    return repaired
+
+
+def repair_texts(texts: List[Optional[str]]) -> List[Optional[str]]:
+    """Repair every text of a list, passing non-strings through."""
+    return [repair_text(text) if isinstance(text, str) else text for text in texts]
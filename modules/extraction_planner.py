@@ -0,0 +1,129 @@
+"""
+Codec-aware planning of subtitle track extraction.
+"""
+from pathlib import Path
+from typing import List, Dict, Optional, Any
+
+# Text codecs (ffprobe codec_name) and the file format each is written in natively
+TEXT_CODECS = {
+    'subrip': '.srt',
+    'srt': '.srt',
+    'ass': '.ass',
+    'ssa': '.ass',
+    'webvtt': '.vtt',
+    'mov_text': '.srt',  # MP4 timed text has no standalone file format
+    'text': '.srt',
+    'microdvd': '.sub',
+    'subviewer': '.srt',
+    'subviewer1': '.srt',
+    'realtext': '.srt',
+    'sami': '.srt',
+    'stl': '.srt',
+    'jacosub': '.srt',
+    'mpl2': '.srt',
+    'pjs': '.srt',
+    'vplayer': '.srt',
+}
+
+# Bitmap codecs and the file format they can be stream-copied to (None: no standalone format)
+BITMAP_CODECS = {
+    'hdmv_pgs_subtitle': '.sup',
+    'dvd_subtitle': None,
+    'dvb_subtitle': None,
+    'dvb_teletext': None,
+    'xsub': None,
+}
+
+# ffmpeg muxer for each output extension
+FFMPEG_MUXERS = {
+    '.srt': 'srt',
+    '.ass': 'ass',
+    '.ssa': 'ass',
+    '.vtt': 'webvtt',
+    '.sub': 'microdvd',
+    '.sup': 'sup',
+}
+
+
+class ExtractionJob:
+    """One track to write: its stream index, output extension and how ffmpeg produces it."""
+
+    def __init__(self, track: Dict[str, Any], extension: str, copy: bool = False):
+        self.track = track
+        self.index = track['index']
+        self.extension = extension
+        self.copy = copy
+
+    def output_path(self, directory: Path, video_path: Path) -> Path:
+        """Path of the sidecar file in a directory."""
+        return directory / f"{video_path.stem}_subtitle_{self.index}{self.extension}"
+
+    def ffmpeg_options(self) -> Dict[str, str]:
+        """Output options: stream copy for bitmap tracks, conversion to the muxer's codec otherwise."""
+        options = {'f': FFMPEG_MUXERS[self.extension]}
+        if self.copy:
+            options['c'] = 'copy'
+        return options
+
+
+class ExtractionPlan:
+    """Tracks to extract and tracks skipped, with the reason for each skip."""
+
+    def __init__(self):
+        self.jobs: List[ExtractionJob] = []
+        self.skipped: List[Dict[str, Any]] = []
+
+    def skip(self, track: Dict[str, Any], reason: str):
+        """Record a track that will not be extracted."""
+        self.skipped.append({'index': track['index'], 'codec_name': track.get('codec_name'), 'reason': reason})
+
+    def describe_skipped(self) -> List[str]:
+        """Human-readable lines for the skipped tracks."""
+        return [f"Skipping track {item['index']} ({item['codec_name']}): {item['reason']}" for item in self.skipped]
+
+
+def classify_codec(codec_name: Optional[str]) -> str:
+    """Classify an ffprobe codec_name as 'text', 'bitmap' or 'unknown'."""
+    if codec_name in TEXT_CODECS:
+        return 'text'
+    if codec_name in BITMAP_CODECS:
+        return 'bitmap'
+    return 'unknown'
+
+
+def plan_extraction(tracks: List[Dict[str, Any]], output_format: str = None,
+                    bitmap_action: str = 'copy') -> ExtractionPlan:
+    """Decide how each subtitle track is extracted.
+
+    Text tracks are written in their native format, or converted to
+    ``output_format`` when one is given (text-to-text conversion always
+    works). Bitmap tracks can never become text, so they are skipped when a
+    text format is requested; otherwise, with ``bitmap_action`` "copy", they
+    are stream-copied when a standalone format exists. Tracks with an
+    unrecognized codec are attempted as text.
+    """
+    if output_format and not output_format.startswith('.'):
+        output_format = '.' + output_format
+
+    plan = ExtractionPlan()
+    for track in tracks:
+        codec_name = track.get('codec_name')
+        kind = classify_codec(codec_name)
+
+        if kind == 'bitmap':
+            extension = BITMAP_CODECS[codec_name]
+            if output_format or bitmap_action != 'copy':
+                plan.skip(track, "bitmap subtitles cannot be converted to text")
+            elif extension is None:
+                plan.skip(track, "bitmap subtitles without a standalone file format")
+            else:
+                plan.jobs.append(ExtractionJob(track, extension, copy=True))
+            continue
+
+        extension = output_format or TEXT_CODECS.get(codec_name, '.srt')
+        if extension not in FFMPEG_MUXERS:
+            plan.skip(track, f"no ffmpeg muxer for {extension}")
+            continue
+        plan.jobs.append(ExtractionJob(track, extension))
+
+    return plan
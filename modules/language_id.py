@@ -0,0 +1,253 @@
+"""
+Offline language identification for subtitle cues and tracks.
+"""
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+
+from config import LANGUAGE_ID_MIN_LETTERS, LANGUAGE_ID_MIN_MARGIN
+from modules.charset_detection import read_subtitle_text
+from modules.subtitle_model import SubtitleDocument
+
+# Dialogue-style sample text each Latin-script profile is built from
+SAMPLE_TEXTS = {
+    'en': """
+        What are you doing here? I told you to wait for me outside. I know, but I was worried
+        about you. We have to go now, they will be back any minute. Where is your brother?
+        He said he would meet us at the station. Don't worry, everything is going to be fine.
+        I just need a little more time. Can you help me with this? Of course, that's what
+        friends are for. Why didn't you call me last night? I was waiting for you all evening.
+        I'm sorry, I didn't think it was that important. Listen to me, this is the only way.
+        Thank you so much for coming. I have never seen anything like this before. Nobody
+        knows what happened that night. Let's get out of here before it's too late. Where
+        have you been? I thought you were dead. Please tell me the truth. It was my fault,
+        not yours. We should talk about it tomorrow. The police are looking for them right
+        now. Do you really want to know? Come with me, I will show you something. It's been
+        a long day and I'm tired. She doesn't want to see him again. Are you sure about that?
+        They could have been killed. Everything will be all right, I promise.
+    """,
+    'fr': """
+        Qu'est-ce que tu fais ici ? Je t'avais dit de m'attendre dehors. Je sais, mais je
+        m'inquiétais pour toi. Il faut partir maintenant, ils vont revenir d'une minute à
+        l'autre. Où est ton frère ? Il a dit qu'il nous retrouverait à la gare. Ne t'inquiète
+        pas, tout va bien se passer. J'ai juste besoin d'un peu plus de temps. Tu peux
+        m'aider avec ça ? Bien sûr, c'est à ça que servent les amis. Pourquoi tu ne m'as pas
+        appelé hier soir ? Je t'ai attendu toute la soirée. Je suis désolé, je ne pensais pas
+        que c'était si important. Écoute-moi, c'est la seule solution. Merci beaucoup d'être
+        venu. Je n'ai jamais rien vu de pareil. Personne ne sait ce qui s'est passé cette
+        nuit-là. Sortons d'ici avant qu'il ne soit trop tard. Où étais-tu ? Je croyais que tu
+        étais mort. S'il te plaît, dis-moi la vérité. C'était ma faute, pas la tienne. On
+        devrait en parler demain. La police les cherche en ce moment. Tu veux vraiment savoir ?
+        Viens avec moi, je vais te montrer quelque chose. La journée a été longue et je suis
+        fatigué. Elle ne veut plus le revoir. Tu en es sûr ? Ils auraient pu être tués.
+        Tout ira bien, je te le promets.
+    """,
+    'es': """
+        ¿Qué haces aquí? Te dije que me esperaras afuera. Lo sé, pero estaba preocupado por
+        ti. Tenemos que irnos ahora, volverán en cualquier momento. ¿Dónde está tu hermano?
+        Dijo que nos encontraría en la estación. No te preocupes, todo va a salir bien. Solo
+        necesito un poco más de tiempo. ¿Puedes ayudarme con esto? Claro, para eso están los
+        amigos. ¿Por qué no me llamaste anoche? Te estuve esperando toda la noche. Lo siento,
+        no pensé que fuera tan importante. Escúchame, esta es la única manera. Muchas gracias
+        por venir. Nunca había visto nada igual. Nadie sabe lo que pasó esa noche. Salgamos de
+        aquí antes de que sea demasiado tarde. ¿Dónde has estado? Pensé que estabas muerto.
+        Por favor, dime la verdad. Fue culpa mía, no tuya. Deberíamos hablar de eso mañana.
+        La policía los está buscando ahora mismo. ¿De verdad quieres saberlo? Ven conmigo, te
+        voy a enseñar algo. Ha sido un día muy largo y estoy cansado. Ella no quiere volver a
+        verlo. ¿Estás seguro de eso? Podrían haberlos matado. Todo saldrá bien, te lo prometo.
+    """,
+    'de': """
+        Was machst du hier? Ich habe dir gesagt, du sollst draußen auf mich warten. Ich weiß,
+        aber ich habe mir Sorgen um dich gemacht. Wir müssen jetzt gehen, sie werden jeden
+        Moment zurück sein. Wo ist dein Bruder? Er hat gesagt, er trifft uns am Bahnhof. Mach
+        dir keine Sorgen, alles wird gut. Ich brauche nur ein bisschen mehr Zeit. Kannst du mir
+        dabei helfen? Natürlich, dafür sind Freunde doch da. Warum hast du mich gestern Abend
+        nicht angerufen? Ich habe den ganzen Abend auf dich gewartet. Es tut mir leid, ich
+        dachte nicht, dass es so wichtig ist. Hör mir zu, das ist der einzige Weg. Vielen Dank,
+        dass du gekommen bist. So etwas habe ich noch nie gesehen. Niemand weiß, was in dieser
+        Nacht passiert ist. Lass uns hier verschwinden, bevor es zu spät ist. Wo warst du? Ich
+        dachte, du wärst tot. Bitte sag mir die Wahrheit. Es war meine Schuld, nicht deine. Wir
+        sollten morgen darüber reden. Die Polizei sucht gerade nach ihnen. Willst du es wirklich
+        wissen? Komm mit mir, ich zeige dir etwas. Es war ein langer Tag und ich bin müde. Sie
+        will ihn nicht wiedersehen. Bist du dir sicher? Sie hätten getötet werden können.
+        Alles wird gut, das verspreche ich dir.
+    """,
+    'it': """
+        Che cosa ci fai qui? Ti avevo detto di aspettarmi fuori. Lo so, ma ero preoccupato per
+        te. Dobbiamo andare adesso, torneranno da un momento all'altro. Dov'è tuo fratello? Ha
+        detto che ci avrebbe incontrati alla stazione. Non preoccuparti, andrà tutto bene. Ho
+        solo bisogno di un po' più di tempo. Puoi aiutarmi con questo? Certo, gli amici servono
+        a questo. Perché non mi hai chiamato ieri sera? Ti ho aspettato tutta la sera. Mi
+        dispiace, non pensavo fosse così importante. Ascoltami, questo è l'unico modo. Grazie
+        mille per essere venuto. Non ho mai visto niente del genere. Nessuno sa cosa sia
+        successo quella notte. Andiamocene da qui prima che sia troppo tardi. Dove sei stato?
+        Pensavo fossi morto. Per favore, dimmi la verità. È stata colpa mia, non tua. Dovremmo
+        parlarne domani. La polizia li sta cercando proprio adesso. Vuoi davvero saperlo?
+        Vieni con me, ti mostro una cosa. È stata una lunga giornata e sono stanco. Lei non
+        vuole più vederlo. Ne sei sicuro? Avrebbero potuto essere uccisi. Andrà tutto bene,
+        te lo prometto.
+    """,
+    'pt': """
+        O que você está fazendo aqui? Eu disse para você me esperar lá fora. Eu sei, mas eu
+        estava preocupado com você. Temos que ir agora, eles vão voltar a qualquer momento.
+        Onde está o seu irmão? Ele disse que ia nos encontrar na estação. Não se preocupe, vai
+        dar tudo certo. Eu só preciso de um pouco mais de tempo. Você pode me ajudar com isso?
+        Claro, é para isso que servem os amigos. Por que você não me ligou ontem à noite? Fiquei
+        esperando você a noite toda. Desculpe, não achei que fosse tão importante. Escute, esta
+        é a única maneira. Muito obrigado por ter vindo. Nunca vi nada parecido. Ninguém sabe o
+        que aconteceu naquela noite. Vamos sair daqui antes que seja tarde demais. Onde você
+        estava? Pensei que você estivesse morto. Por favor, me diga a verdade. Foi culpa minha,
+        não sua. Devíamos conversar sobre isso amanhã. A polícia está procurando por eles agora
+        mesmo. Você quer mesmo saber? Venha comigo, vou te mostrar uma coisa. Foi um dia longo e
+        estou cansado. Ela não quer vê-lo de novo. Você tem certeza disso? Eles poderiam ter sido
+        mortos. Vai ficar tudo bem, eu prometo.
+    """,
+}
+
+# Unicode scripts that identify a language on their own
+_SCRIPT_RANGES = [
+    ('ru', 0x0400, 0x04FF),  # Cyrillic
+    ('ar', 0x0600, 0x06FF),  # Arabic
+    ('ko', 0xAC00, 0xD7AF),  # Hangul syllables
+    ('ko', 0x1100, 0x11FF),  # Hangul jamo
+    ('ja', 0x3040, 0x30FF),  # Hiragana and Katakana
+    ('zh', 0x4E00, 0x9FFF),  # CJK ideographs (Japanese only when kana also appear)
+]
+
+_NON_LETTERS = re.compile(r"[^\w']+|[\d_]+")
+_MARKUP = re.compile(r'<[^>]+>|\{[^}]*\}')
+
+
+def _normalize(text: str) -> str:
+    """Lowercase letters only, words separated by single spaces, tags removed."""
+    text = _MARKUP.sub(' ', text).lower()
+    return ' '.join(_NON_LETTERS.sub(' ', text).split())
+
+
+def _trigrams(text: str) -> List[str]:
+    """Character trigrams of a normalized text, with word boundaries as spaces."""
+    padded = f" {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class LanguageIdentifier:
+    """Character-trigram language identifier with no external data.
+
+    Latin-script languages are scored by the average log-probability of the
+    text's trigrams under a profile built from ``SAMPLE_TEXTS``; other
+    scripts (Cyrillic, Arabic, Hangul, kana, Han) decide the language
+    directly. A language is only reported with enough letters and a clear
+    lead over the runner-up, so short or ambiguous cues stay unlabeled
+    (None) and are treated as untranslated.
+    """
+
+    def __init__(self, min_letters: int = 12, min_margin: float = 0.15):
+        self.min_letters = min_letters
+        self.min_margin = min_margin
+        self._profiles: Dict[str, Dict[str, float]] = {}
+        self._floors: Dict[str, float] = {}
+
+        for language, sample in SAMPLE_TEXTS.items():
+            counts = Counter(_trigrams(_normalize(sample)))
+            # Add-one smoothing over the trigram vocabulary seen in all samples
+            total = sum(counts.values()) + len(counts) + 1
+            self._profiles[language] = {gram: math.log((n + 1) / total) for gram, n in counts.items()}
+            self._floors[language] = math.log(1 / total)
+
+    @staticmethod
+    def _script_language(text: str) -> Tuple[Optional[str], int, int]:
+        """Language implied by a non-Latin script, with the counts of script and total letters."""
+        counts = Counter()
+        letters = 0
+        for char in text:
+            if not char.isalpha():
+                continue
+            letters += 1
+            code = ord(char)
+            for language, low, high in _SCRIPT_RANGES:
+                if low <= code <= high:
+                    counts[language] += 1
+                    break
+
+        if not counts:
+            return None, 0, letters
+        if counts['ja'] and counts['zh']:
+            # Japanese mixes kana with kanji
+            counts['ja'] += counts.pop('zh')
+        language, script_letters = counts.most_common(1)[0]
+        return language, script_letters, letters
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Average log-probability per trigram of the text under each Latin-script profile."""
+        grams = _trigrams(_normalize(unicodedata.normalize('NFC', text)))
+        if not grams:
+            return {}
+        return {
+            language: sum(profile.get(gram, self._floors[language]) for gram in grams) / len(grams)
+            for language, profile in self._profiles.items()
+        }
+
+    def identify(self, text: str) -> Tuple[Optional[str], float]:
+        """Return the language of a text and the confidence margin, or (None, 0.0) when unsure."""
+        script_language, script_letters, letters = self._script_language(text)
+        if script_language and script_letters * 2 > letters:
+            return script_language, script_letters / letters
+
+        if letters < self.min_letters:
+            return None, 0.0
+
+        ranked = sorted(self.scores(text).items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return None, 0.0
+        margin = ranked[0][1] - ranked[1][1] if len(ranked) > 1 else float('inf')
+        if margin < self.min_margin:
+            return None, margin
+        return ranked[0][0], margin
+
+    def detect(self, text: str) -> Optional[str]:
+        """Return the language of a text, or None when unsure."""
+        return self.identify(text)[0]
+
+    def detect_track(self, texts: List[str], sample_chars: int = 4000) -> Optional[str]:
+        """Language of a whole track, from the first ``sample_chars`` characters of its cues."""
+        sample = []
+        size = 0
+        for text in texts:
+            sample.append(text)
+            size += len(text)
+            if size >= sample_chars:
+                break
+        return self.detect(' '.join(sample))
+
+
+_shared_identifier: Optional[LanguageIdentifier] = None
+_shared_identifier_lock = threading.Lock()
+
+
+def get_language_identifier() -> LanguageIdentifier:
+    """Return the identifier shared by every module (profiles are built once)."""
+    global _shared_identifier
+    if _shared_identifier is None:
+        with _shared_identifier_lock:
+            if _shared_identifier is None:
+                _shared_identifier = LanguageIdentifier(LANGUAGE_ID_MIN_LETTERS, LANGUAGE_ID_MIN_MARGIN)
+    return _shared_identifier
+
+
+def detect_subtitle_language(subtitle_path: Path) -> Optional[str]:
+    """Language of an extracted SRT or ASS file, or None when unsure."""
+    try:
+        content = read_subtitle_text(subtitle_path)
+    except OSError:
+        return None
+
+    if subtitle_path.suffix.lower() in ('.ass', '.ssa'):
+        texts = [line.split(',', 9)[-1].replace('\\N', ' ')
+                 for line in content.splitlines() if line.startswith('Dialogue:')]
+    else:
+        texts = SubtitleDocument.parse(content).texts()
+    return get_language_identifier().detect_track(texts)
@@ -0,0 +1,653 @@
+"""
+Pure-Python Matroska (EBML) reader for extracting text subtitle tracks.
+"""
+import mmap
+import struct
+import zlib
+from pathlib import Path
+from typing import List, Dict, Optional, Iterator, Tuple
+
+from config import CHARSET_SAMPLE_BYTES
+from modules.charset_detection import detect_bytes
+from modules.subtitle_model import SrtWriter
+
+
+# EBML / Matroska element ids
+EBML_HEADER = 0x1A45DFA3
+SEGMENT = 0x18538067
+SEEK_HEAD = 0x114D9B74
+SEEK = 0x4DBB
+SEEK_ID = 0x53AB
+SEEK_POSITION = 0x53AC
+INFO = 0x1549A966
+TIMESTAMP_SCALE = 0x2AD7B1
+WRITING_APP = 0x5741
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_NUMBER = 0xD7
+TRACK_UID = 0x73C5
+TRACK_TYPE = 0x83
+CODEC_ID = 0x86
+CODEC_PRIVATE = 0x63A2
+LANGUAGE = 0x22B59C
+LANGUAGE_BCP47 = 0x22B59D
+NAME = 0x536E
+DEFAULT_DURATION = 0x23E383
+FLAG_DEFAULT = 0x88
+FLAG_FORCED = 0x55AA
+CONTENT_ENCODINGS = 0x6D80
+CONTENT_ENCODING = 0x6240
+CONTENT_ENCODING_SCOPE = 0x5032
+CONTENT_COMPRESSION = 0x5034
+CONTENT_COMP_ALGO = 0x4254
+CONTENT_COMP_SETTINGS = 0x4255
+CONTENT_ENCRYPTION = 0x5035
+CUES = 0x1C53BB6B
+CUE_POINT = 0xBB
+CUE_TIME = 0xB3
+CUE_TRACK_POSITIONS = 0xB7
+CUE_TRACK = 0xF7
+CUE_CLUSTER_POSITION = 0xF1
+CUE_RELATIVE_POSITION = 0xF0
+CUE_DURATION = 0xB2
+CLUSTER = 0x1F43B675
+CLUSTER_TIMESTAMP = 0xE7
+SIMPLE_BLOCK = 0xA3
+BLOCK_GROUP = 0xA0
+BLOCK = 0xA1
+BLOCK_DURATION = 0x9B
+TAGS = 0x1254C367
+TAG = 0x7373
+TARGETS = 0x63C0
+TAG_TRACK_UID = 0x63C5
+SIMPLE_TAG = 0x67C8
+TAG_NAME = 0x45A3
+TAG_STRING = 0x4487
+
+# Elements that may follow a cluster of unknown size at the top level of the segment
+LEVEL1_IDS = {SEEK_HEAD, INFO, TRACKS, CUES, CLUSTER, TAGS, 0x1043A770, 0x1941A469}
+
+TRACK_TYPE_SUBTITLE = 0x11
+
+# Matroska codec id -> output file extension the reader can write natively
+TEXT_CODECS = {
+    'S_TEXT/UTF8': '.srt',
+    'S_TEXT/ASS': '.ass',
+    'S_TEXT/SSA': '.ass',
+}
+
+# File extensions the reader is tried on
+MATROSKA_SUFFIXES = {'.mkv', '.mka', '.mks', '.webm'}
+
+UNKNOWN_SIZE = -1
+
+
+class MatroskaError(Exception):
+    """Raised when a file cannot be handled by the native Matroska reader."""
+
+
+class MatroskaTrack:
+    """Metadata of one Matroska track entry."""
+
+    def __init__(self, position: int):
+        self.position = position  # Order in the Tracks element, which matches ffprobe's stream index
+        self.number = 0
+        self.uid = 0
+        self.track_type = 0
+        self.codec_id = ''
+        self.codec_private = b''
+        self.language = 'eng'  # Matroska default when the element is absent
+        self.name = ''
+        self.default_duration = None
+        self.flag_default = True
+        self.flag_forced = False
+        self.compression: Optional[int] = None
+        self.header_stripping = b''
+        self.encrypted = False
+
+    @property
+    def is_text_subtitle(self) -> bool:
+        """Whether the reader can extract this track without ffmpeg."""
+        return self.track_type == TRACK_TYPE_SUBTITLE and self.codec_id in TEXT_CODECS and not self.encrypted \
+            and self.compression in (None, 0, 3)
+
+    def decode(self, frame: bytes) -> bytes:
+        """Undo the track's content compression."""
+        if self.compression == 0:
+            return zlib.decompress(frame)
+        if self.compression == 3:
+            return self.header_stripping + frame
+        return frame
+
+
+class MatroskaReader:
+    """Memory-mapped Matroska reader that pulls only text subtitle blocks.
+
+    The SeekHead locates Info, Tracks, Cues and Tags without scanning the
+    file. When the Cues index every block of the wanted tracks (as mkvmerge
+    writes them for subtitles, checked against its NUMBER_OF_FRAMES
+    statistics tags), each block is read directly from its cluster.
+    Otherwise clusters are walked by element headers only, so video and
+    audio payloads are skipped rather than read.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError) as e:
+            self._file.close()
+            raise MatroskaError(f"Cannot map {self.path}: {e}") from e
+
+        self.size = len(self._map)
+        self.timestamp_scale = 1000000
+        self.writing_app = ''
+        self.tracks: List[MatroskaTrack] = []
+        self.segment_start = 0
+        self.segment_end = self.size
+        self._positions: Dict[int, int] = {}
+
+        try:
+            self._parse_headers()
+        except (IndexError, struct.error) as e:
+            self.close()
+            raise MatroskaError(f"Truncated or corrupt Matroska file: {self.path}") from e
+        except MatroskaError:
+            self.close()
+            raise
+
+    def close(self):
+        """Release the memory map and file handle."""
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- EBML primitives -------------------------------------------------
+
+    def _read_id(self, offset: int) -> Tuple[int, int]:
+        """Read an element id, returning (id, offset after it)."""
+        first = self._map[offset]
+        length = 1
+        mask = 0x80
+        while length <= 4 and not first & mask:
+            mask >>= 1
+            length += 1
+        if length > 4:
+            raise MatroskaError(f"Invalid element id at offset {offset}")
+        return int.from_bytes(self._map[offset:offset + length], 'big'), offset + length
+
+    def _read_size(self, offset: int) -> Tuple[int, int]:
+        """Read a variable-length size, returning (size, offset after it); UNKNOWN_SIZE if all ones."""
+        first = self._map[offset]
+        length = 1
+        mask = 0x80
+        while length <= 8 and not first & mask:
+            mask >>= 1
+            length += 1
+        if length > 8:
+            raise MatroskaError(f"Invalid element size at offset {offset}")
+        value = first & (mask - 1)
+        for byte in self._map[offset + 1:offset + length]:
+            value = (value << 8) | byte
+        if value == (1 << (7 * length)) - 1:
+            return UNKNOWN_SIZE, offset + length
+        return value, offset + length
+
+    def _read_header(self, offset: int) -> Tuple[int, int, int]:
+        """Read an element header, returning (id, data offset, data end)."""
+        element_id, offset = self._read_id(offset)
+        size, data = self._read_size(offset)
+        end = self.segment_end if size == UNKNOWN_SIZE else data + size
+        return element_id, data, end
+
+    def _children(self, start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+        """Iterate (id, data offset, data end) of the child elements in a range."""
+        offset = start
+        while offset < end:
+            element_id, data, child_end = self._read_header(offset)
+            yield element_id, data, min(child_end, end)
+            offset = child_end
+
+    def _uint(self, data: int, end: int) -> int:
+        return int.from_bytes(self._map[data:end], 'big')
+
+    def _string(self, data: int, end: int) -> str:
+        return self._map[data:end].rstrip(b'\x00').decode('utf-8', errors='replace')
+
+    # --- Headers -----------------------------------------------------------
+
+    def _parse_headers(self):
+        """Locate the segment and parse Info, Tracks and the positions of Cues."""
+        element_id, data, end = self._read_header(0)
+        if element_id != EBML_HEADER:
+            raise MatroskaError(f"Not a Matroska/EBML file: {self.path}")
+
+        element_id, data, end = self._read_header(end)
+        if element_id != SEGMENT:
+            raise MatroskaError(f"No Segment element in {self.path}")
+        self.segment_start = data
+        self.segment_end = min(end, self.size)
+
+        self._read_seek_head()
+        if INFO not in self._positions or TRACKS not in self._positions:
+            self._scan_level1()
+
+        if TRACKS not in self._positions:
+            raise MatroskaError(f"No Tracks element in {self.path}")
+
+        if INFO in self._positions:
+            _, data, end = self._read_header(self._positions[INFO])
+            for child_id, child_data, child_end in self._children(data, end):
+                if child_id == TIMESTAMP_SCALE:
+                    self.timestamp_scale = self._uint(child_data, child_end)
+                elif child_id == WRITING_APP:
+                    self.writing_app = self._string(child_data, child_end)
+
+        _, data, end = self._read_header(self._positions[TRACKS])
+        for child_id, child_data, child_end in self._children(data, end):
+            if child_id == TRACK_ENTRY:
+                self.tracks.append(self._parse_track(len(self.tracks), child_data, child_end))
+
+    def _read_seek_head(self):
+        """Record element positions listed in the SeekHead, if it comes first in the segment."""
+        offset = self.segment_start
+        # Skip Void/CRC elements that may precede the SeekHead
+        while offset < self.segment_end:
+            element_id, data, end = self._read_header(offset)
+            if element_id == SEEK_HEAD:
+                break
+            if element_id not in (0xEC, 0xBF):
+                return
+            offset = end
+        else:
+            return
+
+        for child_id, child_data, child_end in self._children(data, end):
+            if child_id != SEEK:
+                continue
+            seek_id = position = None
+            for field_id, field_data, field_end in self._children(child_data, child_end):
+                if field_id == SEEK_ID:
+                    seek_id = self._uint(field_data, field_end)
+                elif field_id == SEEK_POSITION:
+                    position = self._uint(field_data, field_end)
+            if seek_id is not None and position is not None:
+                self._positions.setdefault(seek_id, self.segment_start + position)
+
+    def _scan_level1(self):
+        """Find top-level elements by walking segment children by header only."""
+        offset = self.segment_start
+        while offset < self.segment_end:
+            element_id, data, end = self._read_header(offset)
+            self._positions.setdefault(element_id, offset)
+            if element_id == CLUSTER and end == self.segment_end:
+                # Unknown-size cluster: nothing reliable follows without parsing it
+                break
+            offset = end
+
+    def _parse_track(self, position: int, start: int, end: int) -> MatroskaTrack:
+        """Parse one TrackEntry."""
+        track = MatroskaTrack(position)
+        for element_id, data, child_end in self._children(start, end):
+            if element_id == TRACK_NUMBER:
+                track.number = self._uint(data, child_end)
+            elif element_id == TRACK_UID:
+                track.uid = self._uint(data, child_end)
+            elif element_id == TRACK_TYPE:
+                track.track_type = self._uint(data, child_end)
+            elif element_id == CODEC_ID:
+                track.codec_id = self._string(data, child_end)
+            elif element_id == CODEC_PRIVATE:
+                track.codec_private = bytes(self._map[data:child_end])
+            elif element_id == LANGUAGE:
+                track.language = self._string(data, child_end)
+            elif element_id == LANGUAGE_BCP47:
+                track.language = self._string(data, child_end)
+            elif element_id == NAME:
+                track.name = self._string(data, child_end)
+            elif element_id == DEFAULT_DURATION:
+                track.default_duration = self._uint(data, child_end)
+            elif element_id == FLAG_DEFAULT:
+                track.flag_default = bool(self._uint(data, child_end))
+            elif element_id == FLAG_FORCED:
+                track.flag_forced = bool(self._uint(data, child_end))
+            elif element_id == CONTENT_ENCODINGS:
+                self._parse_encodings(track, data, child_end)
+        return track
+
+    def _parse_encodings(self, track: MatroskaTrack, start: int, end: int):
+        """Parse ContentEncodings; only frame compression (zlib or header stripping) is supported."""
+        for element_id, data, child_end in self._children(start, end):
+            if element_id != CONTENT_ENCODING:
+                continue
+            scope = 1
+            for field_id, field_data, field_end in self._children(data, child_end):
+                if field_id == CONTENT_ENCODING_SCOPE:
+                    scope = self._uint(field_data, field_end)
+                elif field_id == CONTENT_ENCRYPTION:
+                    track.encrypted = True
+                elif field_id == CONTENT_COMPRESSION:
+                    algo = 0
+                    for comp_id, comp_data, comp_end in self._children(field_data, field_end):
+                        if comp_id == CONTENT_COMP_ALGO:
+                            algo = self._uint(comp_data, comp_end)
+                        elif comp_id == CONTENT_COMP_SETTINGS:
+                            track.header_stripping = bytes(self._map[comp_data:comp_end])
+                    if scope & 1:
+                        if track.compression is not None:
+                            # Chained encodings are not supported
+                            track.compression = -1
+                        else:
+                            track.compression = algo
+                    if scope & 2 and algo == 0:
+                        track.codec_private = zlib.decompress(track.codec_private)
+
+    # --- Blocks ------------------------------------------------------------
+
+    def _cluster_info(self, offset: int) -> Tuple[int, int, int]:
+        """Return (data offset, data end, timestamp) of the cluster at an offset."""
+        element_id, data, end = self._read_header(offset)
+        if element_id != CLUSTER:
+            raise MatroskaError(f"Cue points to a non-cluster element at offset {offset}")
+        timestamp = 0
+        for child_id, child_data, child_end in self._children(data, end):
+            if child_id == CLUSTER_TIMESTAMP:
+                timestamp = self._uint(child_data, child_end)
+                break
+        return data, end, timestamp
+
+    def _parse_block(self, element_id: int, data: int, end: int,
+                     wanted: Dict[int, MatroskaTrack]) -> Optional[Tuple[int, int, Optional[int], bytes]]:
+        """Parse a SimpleBlock or BlockGroup of a wanted track into (track number, relative time, duration, frame)."""
+        duration = None
+        if element_id == BLOCK_GROUP:
+            block = None
+            for child_id, child_data, child_end in self._children(data, end):
+                if child_id == BLOCK:
+                    block = (child_data, child_end)
+                elif child_id == BLOCK_DURATION:
+                    duration = self._uint(child_data, child_end)
+            if block is None:
+                return None
+            data, end = block
+
+        track_number, offset = self._read_size(data)
+        if track_number not in wanted:
+            return None
+
+        relative_time = struct.unpack('>h', self._map[offset:offset + 2])[0]
+        flags = self._map[offset + 2]
+        if flags & 0x06:
+            raise MatroskaError("Laced subtitle blocks are not supported")
+        return track_number, relative_time, duration, bytes(self._map[offset + 3:end])
+
+    def _frame_counts(self) -> Dict[int, int]:
+        """Return {track uid: frame count} from the statistics tags written by mkvmerge.
+
+        Statistics are only trusted when the application that wrote them is
+        the one that wrote the file, as a later remux may have left them stale.
+        """
+        counts: Dict[int, int] = {}
+        if TAGS not in self._positions:
+            return counts
+
+        element_id, data, end = self._read_header(self._positions[TAGS])
+        if element_id != TAGS:
+            return counts
+        for tag_id, tag_data, tag_end in self._children(data, end):
+            if tag_id != TAG:
+                continue
+            uids = []
+            values = {}
+            for field_id, field_data, field_end in self._children(tag_data, tag_end):
+                if field_id == TARGETS:
+                    uids = [self._uint(target_data, target_end)
+                            for target_id, target_data, target_end in self._children(field_data, field_end)
+                            if target_id == TAG_TRACK_UID]
+                elif field_id == SIMPLE_TAG:
+                    name = value = None
+                    for simple_id, simple_data, simple_end in self._children(field_data, field_end):
+                        if simple_id == TAG_NAME:
+                            name = self._string(simple_data, simple_end)
+                        elif simple_id == TAG_STRING:
+                            value = self._string(simple_data, simple_end)
+                    if name is not None and value is not None:
+                        values[name] = value
+            if values.get('_STATISTICS_WRITING_APP') != self.writing_app:
+                continue
+            try:
+                frames = int(values['NUMBER_OF_FRAMES'])
+            except (KeyError, ValueError):
+                continue
+            for uid in uids:
+                counts[uid] = frames
+        return counts
+
+    def _blocks_from_cues(self, wanted: Dict[int, MatroskaTrack]) -> Optional[List[Tuple[int, int, Optional[int], bytes]]]:
+        """Read the wanted tracks' blocks through the Cues index.
+
+        Cues are only required to index some blocks, so they are used only
+        when they reference as many blocks of each wanted track as its
+        NUMBER_OF_FRAMES statistics tag says it has. Returns None otherwise,
+        or when a cue lacks a relative position, in which case the clusters
+        must be walked.
+        """
+        if CUES not in self._positions:
+            return None
+
+        frame_counts = self._frame_counts()
+        if any(track.uid not in frame_counts for track in wanted.values()):
+            return None
+
+        entries = []
+        cued_tracks = set()
+        _, data, end = self._read_header(self._positions[CUES])
+        for element_id, point_data, point_end in self._children(data, end):
+            if element_id != CUE_POINT:
+                continue
+            for field_id, field_data, field_end in self._children(point_data, point_end):
+                if field_id != CUE_TRACK_POSITIONS:
+                    continue
+                values = {}
+                for value_id, value_data, value_end in self._children(field_data, field_end):
+                    values[value_id] = self._uint(value_data, value_end)
+                if values.get(CUE_TRACK) in wanted:
+                    if CUE_RELATIVE_POSITION not in values or CUE_CLUSTER_POSITION not in values:
+                        return None
+                    entries.append((values[CUE_CLUSTER_POSITION], values[CUE_RELATIVE_POSITION],
+                                    values.get(CUE_DURATION), values[CUE_TRACK]))
+                    cued_tracks.add(values[CUE_TRACK])
+
+        if cued_tracks != set(wanted):
+            return None
+
+        cued_frames = {number: 0 for number in wanted}
+        for _, _, track_number in {(cluster, relative, track) for cluster, relative, _, track in entries}:
+            cued_frames[track_number] += 1
+        if any(cued_frames[number] != frame_counts[track.uid] for number, track in wanted.items()):
+            return None
+
+        blocks = []
+        clusters: Dict[int, Tuple[int, int, int]] = {}
+        seen = set()
+        for cluster_position, relative_position, cue_duration, _ in sorted(entries):
+            if (cluster_position, relative_position) in seen:
+                continue
+            seen.add((cluster_position, relative_position))
+            if cluster_position not in clusters:
+                clusters[cluster_position] = self._cluster_info(self.segment_start + cluster_position)
+            cluster_data, cluster_end, cluster_time = clusters[cluster_position]
+
+            element_id, data, end = self._read_header(cluster_data + relative_position)
+            if element_id not in (SIMPLE_BLOCK, BLOCK_GROUP):
+                return None
+            block = self._parse_block(element_id, data, end, wanted)
+            if block is None:
+                return None
+            track_number, relative_time, duration, frame = block
+            blocks.append((track_number, cluster_time + relative_time,
+                           duration if duration is not None else cue_duration, frame))
+
+        return blocks
+
+    def _blocks_from_clusters(self, wanted: Dict[int, MatroskaTrack]) -> List[Tuple[int, int, Optional[int], bytes]]:
+        """Walk every cluster by element headers, reading only the wanted tracks' blocks."""
+        blocks = []
+        offset = self._positions.get(CLUSTER, self.segment_start)
+        while offset < self.segment_end:
+            element_id, data, end = self._read_header(offset)
+            if element_id != CLUSTER:
+                offset = end
+                continue
+
+            cluster_time = 0
+            child_offset = data
+            while child_offset < end:
+                child_id, child_data, child_end = self._read_header(child_offset)
+                if child_id in LEVEL1_IDS:
+                    # End of an unknown-size cluster
+                    end = child_offset
+                    break
+                if child_id == CLUSTER_TIMESTAMP:
+                    cluster_time = self._uint(child_data, child_end)
+                elif child_id in (SIMPLE_BLOCK, BLOCK_GROUP):
+                    block = self._parse_block(child_id, child_data, child_end, wanted)
+                    if block is not None:
+                        track_number, relative_time, duration, frame = block
+                        blocks.append((track_number, cluster_time + relative_time, duration, frame))
+                child_offset = child_end
+            offset = end
+        return blocks
+
+    def read_subtitles(self, tracks: List[MatroskaTrack]) -> Dict[int, List[Tuple[int, int, bytes]]]:
+        """Read the frames of text subtitle tracks.
+
+        Returns {track number: [(start ms, end ms, decoded frame), ...]} sorted by start time.
+        """
+        wanted = {track.number: track for track in tracks}
+        try:
+            blocks = self._blocks_from_cues(wanted)
+            if blocks is None:
+                blocks = self._blocks_from_clusters(wanted)
+        except (IndexError, struct.error, zlib.error) as e:
+            raise MatroskaError(f"Corrupt block data in {self.path}: {e}") from e
+
+        to_ms = self.timestamp_scale / 1000000
+        by_track: Dict[int, List[Tuple[int, Optional[int], bytes]]] = {number: [] for number in wanted}
+        for track_number, timestamp, duration, frame in blocks:
+            by_track[track_number].append((timestamp, duration, wanted[track_number].decode(frame)))
+
+        events: Dict[int, List[Tuple[int, int, bytes]]] = {}
+        for number, items in by_track.items():
+            items.sort(key=lambda item: item[0])
+            track = wanted[number]
+            result = []
+            for i, (timestamp, duration, frame) in enumerate(items):
+                if duration is None and track.default_duration:
+                    duration = track.default_duration / self.timestamp_scale
+                if duration is None:
+                    # No duration anywhere: show until the next cue
+                    duration = items[i + 1][0] - timestamp if i + 1 < len(items) else 0
+                start = int(round(timestamp * to_ms))
+                result.append((start, start + int(round(duration * to_ms)), frame))
+            events[number] = result
+        return events
+
+
+def _ass_time(ms: int) -> str:
+    hours, ms = divmod(max(ms, 0), 3600000)
+    minutes, ms = divmod(ms, 60000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}.{ms // 10:02d}"
+
+
+def _events_encoding(events: List[Tuple[int, int, bytes]]) -> str:
+    """Encoding of a track's text, detected from its first frames.
+
+    The spec requires UTF-8, but muxers copying legacy SRT files often store
+    their original 8-bit bytes; detecting here means the extracted file is
+    always written as UTF-8.
+    """
+    sample = []
+    size = 0
+    for _, _, frame in events:
+        if size >= CHARSET_SAMPLE_BYTES:
+            break
+        sample.append(frame)
+        size += len(frame) + 1
+    return detect_bytes(b'\n'.join(sample)[:CHARSET_SAMPLE_BYTES], complete=True)
+
+
+def write_srt(events: List[Tuple[int, int, bytes]], output_path: Path):
+    """Write S_TEXT/UTF8 events as an SRT file with the subtitle model's writer."""
+    encoding = _events_encoding(events)
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        SrtWriter(f).write_all(
+            (start, end, frame.decode(encoding, errors='replace').replace('\r\n', '\n').strip('\n'))
+            for start, end, frame in events
+        )
+
+
+def write_ass(events: List[Tuple[int, int, bytes]], codec_private: bytes, output_path: Path):
+    """Write S_TEXT/ASS or S_TEXT/SSA events as an ASS file using the track header."""
+    header = codec_private.decode('utf-8', errors='replace').replace('\r\n', '\n').rstrip('\n')
+    if '[Events]' not in header:
+        header += ("\n\n[Events]\n"
+                   "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text")
+
+    encoding = _events_encoding(events)
+    lines = []
+    for start, end, frame in events:
+        # Block payload: ReadOrder, Layer, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+        fields = frame.decode(encoding, errors='replace').split(',', 8)
+        if len(fields) < 9:
+            continue
+        try:
+            read_order = int(fields[0])
+        except ValueError:
+            read_order = len(lines)
+        lines.append((read_order, f"Dialogue: {fields[1]},{_ass_time(start)},{_ass_time(end)},{','.join(fields[2:])}"))
+
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(header + '\n')
+        for _, line in sorted(lines, key=lambda item: item[0]):
+            f.write(line.rstrip('\r\n') + '\n')
+
+
+def extract_text_tracks(video_path: Path, requests: List[Tuple[int, Path]]) -> Dict[int, Path]:
+    """Extract text subtitle tracks natively.
+
+    ``requests`` pairs a stream index (the track's position, as reported by
+    ffprobe) with its output path; the output extension must match the
+    track's native format. Returns {stream index: output path} for the
+    tracks written; tracks the reader cannot handle are left out so the
+    caller can fall back to ffmpeg. Raises MatroskaError if the file itself
+    cannot be read.
+    """
+    written: Dict[int, Path] = {}
+    with MatroskaReader(video_path) as reader:
+        selected = []
+        for index, output_path in requests:
+            if index >= len(reader.tracks):
+                continue
+            track = reader.tracks[index]
+            if track.is_text_subtitle and TEXT_CODECS[track.codec_id] == Path(output_path).suffix.lower():
+                selected.append((track, output_path))
+
+        if not selected:
+            return written
+
+        events = reader.read_subtitles([track for track, _ in selected])
+        for track, output_path in selected:
+            if track.codec_id == 'S_TEXT/UTF8':
+                write_srt(events[track.number], output_path)
+            else:
+                write_ass(events[track.number], track.codec_private, output_path)
+            written[track.position] = output_path
+    return written
@@ -4,20 +4,55 @@ MCP Client module that uses OpenAI as an AI agent to communicate with LARA MCP S
 import os
 import json
 import time
-from typing import List, Dict, Optional, Any
+import itertools
+import tempfile
+import threading
+from typing import List, Dict, Optional, Any, Tuple, Callable
 import openai
 from pathlib import Path
 
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
-from config import MCP_SERVER_URL, LARA_ACCESS_KEY_ID, LARA_ACCESS_KEY_SECRET
+from config import (MCP_SERVER_URL, LARA_ACCESS_KEY_ID, LARA_ACCESS_KEY_SECRET,
+                    TRANSLATION_BATCH_MAX_CUES, TRANSLATION_BATCH_MAX_CHARS,
+                    MCP_REQUEST_TIMEOUT, MCP_HTTP_POOL_SIZE, MCP_HTTP_KEEPALIVE_SECONDS, MCP_HTTP2,
+                    TRANSLATION_MAX_CONCURRENCY, TRANSLATION_REQUESTS_PER_SECOND, TRANSLATION_CHARS_PER_SECOND,
+                    TRANSLATION_CACHE_ENABLED, TRANSLATION_CACHE_PATH, TRANSLATION_CACHE_MAX_ENTRIES,
+                    TRANSLATION_CACHE_MAX_AGE_DAYS, TRANSLATION_BATCH_MIN_CUES, TRANSLATION_BATCH_INITIAL_CUES,
+                    TRANSLATION_INITIAL_CONCURRENCY, TRANSLATION_ADAPTIVE, TRANSLATION_MAX_RETRIES,
+                    SENTENCE_PACKING_ENABLED, SENTENCE_PACKING_MAX_CHARS, LANGUAGE_ID_ENABLED,
+                    CUE_CLASSIFIER_ENABLED, PLACEHOLDER_MASKING_ENABLED, TRANSLATION_STREAM_WINDOW_CUES)
+from modules.mcp_transport import MCPTransport, TransportError, TransportTimeout, iter_sse_events, iter_sse_lines
+from modules.translation_engine import AsyncTranslationEngine, TokenBucket, take_batch
+from modules.adaptive_controller import AdaptiveController, ServerBusyError, parse_retry_after
+from modules.translation_cache import TranslationCache
+from modules.cue_dedup import CueDeduplicator
+from modules.sentence_packer import SentencePacker
+from modules.language_id import get_language_identifier
+from modules.cue_classifier import CueClassifier, PlaceholderMasker, CAPITALIZED_NOUN_LANGUAGES
+from modules.encoding_repair import repair_texts
+from modules.charset_detection import iter_subtitle_lines
+from modules.subtitle_model import SubtitleDocument, SrtWriter, iter_srt_cues, clean_text
 
 
 class MCPClient:
     """MCP Client that communicates directly with LARA MCP Server."""
     
-    def __init__(self, openai_api_key: str = None):
+    # Known (tool name, source argument, target argument) combinations, in probing order
+    _TRANSLATE_METHOD_VARIANTS = [
+        ("translate", "source", "target"),
+        ("translate", "from", "to"),
+        ("translate_text", "source", "target"),
+    ]
+    
+    # Working translate method per server URL, shared by every client in the process
+    _translate_methods: Dict[str, Tuple[str, str, str]] = {}
+    _translate_methods_lock = threading.Lock()
+    
+    def __init__(self, openai_api_key: str = None, batch_max_cues: int = None, batch_max_chars: int = None,
+                 pool_size: int = None, http2: bool = None, max_concurrency: int = None,
+                 use_cache: bool = None, adaptive: bool = None):
         """Initialize the MCP client."""
         # OpenAI API key is kept for potential future use but not required for MCP communication
         self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
@@ -27,90 +62,275 @@ class MCPClient:
         self.access_key_id = LARA_ACCESS_KEY_ID
         self.access_key_secret = LARA_ACCESS_KEY_SECRET
         
+        # Per-request budgets for batched translation
+        self.batch_max_cues = max(1, batch_max_cues or TRANSLATION_BATCH_MAX_CUES)
+        self.batch_max_chars = max(1, batch_max_chars or TRANSLATION_BATCH_MAX_CHARS)
+        
+        # Concurrent batches are dispatched through the async engine when above 1
+        self.max_concurrency = max(1, max_concurrency or TRANSLATION_MAX_CONCURRENCY)
+        
+        # Tunes requests in flight and cues per batch within the limits above
+        self.controller = AdaptiveController(
+            max_concurrency=self.max_concurrency,
+            initial_concurrency=TRANSLATION_INITIAL_CONCURRENCY,
+            min_batch_size=TRANSLATION_BATCH_MIN_CUES,
+            max_batch_size=self.batch_max_cues,
+            initial_batch_size=TRANSLATION_BATCH_INITIAL_CUES,
+            enabled=TRANSLATION_ADAPTIVE if adaptive is None else adaptive
+        )
+        
+        # Rate limits shared by every translate request this client sends, whatever the path
+        self.request_bucket = TokenBucket(TRANSLATION_REQUESTS_PER_SECOND)
+        self.char_bucket = TokenBucket(TRANSLATION_CHARS_PER_SECOND)
+        
+        # Seconds the current thread spent waiting for rate-limit tokens, kept out of measured latency
+        self._rate_wait = threading.local()
+        
+        # JSON-RPC ids must stay unique across concurrent requests
+        self._request_ids = itertools.count(1)
+        self._request_id_lock = threading.Lock()
+        
+        # MCP session state; the handshake runs once and the session id is reused
+        self.session_id: Optional[str] = None
+        self.server_info: Dict[str, Any] = {}
+        self._session_ready = False
+        self._session_lock = threading.Lock()
+        
+        # Receives notifications and partial results streamed during translate calls
+        self.on_notification: Optional[Callable[[Dict[str, Any]], None]] = None
+        
+        # Deduplication counters of the most recently translated file
+        self.last_dedup_stats: Dict[str, Any] = {}
+        
+        # Sentence packing counters of the most recently translated file
+        self.last_packing_stats: Dict[str, Any] = {}
+        
+        # Cues of the most recently translated file found already in the target language
+        self.last_language_stats: Dict[str, Any] = {}
+        
+        # Cues of the most recently translated file passed through or merged by masking
+        self.last_classifier_stats: Dict[str, Any] = {}
+        
+        # Translation memory consulted before any network call
+        self.cache = None
+        if TRANSLATION_CACHE_ENABLED if use_cache is None else use_cache:
+            try:
+                self.cache = TranslationCache(
+                    TRANSLATION_CACHE_PATH,
+                    max_entries=TRANSLATION_CACHE_MAX_ENTRIES,
+                    max_age_days=TRANSLATION_CACHE_MAX_AGE_DAYS
+                )
+            except Exception as e:
+                print(f"! MCPClient: Translation memory unavailable: {e}")
+        
         # Validate LARA credentials
         if not self.access_key_id or not self.access_key_secret:
             raise ValueError("LARA access credentials not configured. Check LARA_ACCESS_KEY_ID and LARA_ACCESS_KEY_SECRET in .env file.")
+        
+        # Pooled keep-alive transport shared by every request this client sends
+        self.transport = MCPTransport(
+            self.mcp_server_url,
+            headers={
+                'Content-Type': 'application/json',
+                'Accept': 'application/json, text/event-stream',
+                'x-lara-access-key-id': self.access_key_id,
+                'x-lara-access-key-secret': self.access_key_secret
+            },
+            # The pool must be able to serve every in-flight request
+            pool_size=max(pool_size or MCP_HTTP_POOL_SIZE, self.max_concurrency),
+            timeout=MCP_REQUEST_TIMEOUT,
+            keepalive_expiry=MCP_HTTP_KEEPALIVE_SECONDS,
+            http2=MCP_HTTP2 if http2 is None else http2
+        )
+    
+    def set_max_concurrency(self, max_concurrency: int):
+        """Change how many translate requests may be in flight at once.
+        
+        The adaptive controller gets the new ceiling and the transport pool
+        is grown when it could not serve that many requests at once.
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.controller.set_max_concurrency(self.max_concurrency)
+        if self.transport.pool_size < self.max_concurrency:
+            self.transport.resize(self.max_concurrency)
+    
+    def close(self):
+        """End the MCP session and close the pooled connections held by the transport."""
+        self.close_session()
+        self.transport.close()
+    
+    def _next_request_id(self) -> int:
+        """Return a JSON-RPC id that is unique for the lifetime of this client."""
+        with self._request_id_lock:
+            return next(self._request_ids)
     
     def _create_mcp_request(self, method: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """Create a properly formatted MCP request."""
         request = {
             "jsonrpc": "2.0",
-            "id": int(time.time() * 1000),  # Unique ID
+            "id": self._next_request_id(),
             "method": method,
             "params": params or {}
         }
         return request
     
-    def _send_mcp_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        """Send MCP request to LARA server using direct HTTP communication."""
+    def _post_mcp_message(self, message: Dict[str, Any],
+                          on_event: Callable[[Dict[str, Any]], None] = None) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """POST one JSON-RPC message over the pooled transport.
+        
+        Server-Sent Events responses are parsed incrementally as they arrive:
+        notifications and other messages that precede the response (progress,
+        partial results) are handed to ``on_event``, and reading stops holding
+        data once the response matching the message id has been parsed.
+        
+        Returns the parsed response and the HTTP response headers. The current
+        session id, if any, is sent along with the message.
+        """
+        headers = {'Mcp-Session-Id': self.session_id} if self.session_id else None
         try:
-            import requests
-            
-            # Set up headers for LARA authentication
-            headers = {
-                'Content-Type': 'application/json',
-                'Accept': 'application/json, text/event-stream',
-                'x-lara-access-key-id': self.access_key_id,
-                'x-lara-access-key-secret': self.access_key_secret
-            }
-            
-            # Send the MCP request to the LARA server
-            response = requests.post(
-                self.mcp_server_url,
-                json=request,
-                headers=headers,
-                timeout=30
-            )
+            # Send the MCP request to the LARA server; auth headers are set on the transport
+            response = self.transport.post_stream(message, headers=headers)
+        except TransportError as e:
+            return {"error": f"Request failed: {str(e)}", "timeout": isinstance(e, TransportTimeout)}, {}
+        
+        try:
+            # Notifications are acknowledged with 202 Accepted and no body
+            if response.status_code == 202:
+                return {}, response.headers
             
             # Check if request was successful
-            if response.status_code == 200:
-                # Handle Server-Sent Events (SSE) response
+            if response.status_code != 200:
+                return {
+                    "error": f"HTTP {response.status_code}: {response.text}",
+                    "status_code": response.status_code,
+                    "retry_after": parse_retry_after(response.headers.get('Retry-After'))
+                }, response.headers
+            
+            if 'text/event-stream' in response.headers.get('Content-Type', ''):
+                lines = response.iter_lines()
+            else:
+                # Plain JSON response
                 response_text = response.text
+                try:
+                    return json.loads(response_text), response.headers
+                except json.JSONDecodeError:
+                    # Some servers send event streams without the matching Content-Type
+                    if 'data:' not in response_text:
+                        return {"result": response_text, "raw_response": True}, response.headers
+                    lines = iter_sse_lines([response_text.encode('utf-8')])
+            
+            # Handle Server-Sent Events (SSE) response
+            result = None
+            for _, data in iter_sse_events(lines):
+                try:
+                    payload = json.loads(data)
+                except json.JSONDecodeError:
+                    result = {"result": data, "raw_response": True}
+                    continue
                 
-                # Look for the last data line in SSE format
-                lines = response_text.strip().split('\n')
-                last_data_line = None
+                if isinstance(payload, dict) and payload.get("id") == message.get("id") and \
+                        ("result" in payload or "error" in payload):
+                    result = payload
+                    break
                 
-                for line in lines:
-                    if line.startswith('data: '):
-                        last_data_line = line[6:]  # Remove 'data: ' prefix
+                # Anything else on the stream is an intermediate message for the caller
+                if on_event:
+                    on_event(payload)
+                result = payload
+            
+            # Drain whatever is left so the connection can go back to the pool
+            for _ in lines:
+                pass
+            
+            if result is None:
+                return {"error": "Empty event stream from MCP server"}, response.headers
+            return result, response.headers
                 
-                if last_data_line:
-                    try:
-                        # Parse the JSON from the data line
-                        return json.loads(last_data_line)
-                    except json.JSONDecodeError:
-                        return {"result": last_data_line, "raw_response": True}
-                else:
-                    # Fallback to regular JSON parsing
-                    try:
-                        return response.json()
-                    except json.JSONDecodeError:
-                        return {"result": response_text, "raw_response": True}
-            else:
-                return {
-                    "error": f"HTTP {response.status_code}: {response.text}",
-                    "status_code": response.status_code
-                }
-                
-        except requests.exceptions.RequestException as e:
-            return {"error": f"Request failed: {str(e)}"}
         except Exception as e:
-            return {"error": f"Failed to send MCP request: {str(e)}"}
+            return {"error": f"Failed to send MCP request: {str(e)}", "timeout": isinstance(e, TransportTimeout)}, {}
+        finally:
+            response.close()
+    
+    def _initialize_session(self) -> Dict[str, Any]:
+        """Run the initialize/initialized handshake and store the server's session id.
+        
+        Returns the initialize response. Callers must hold the session lock.
+        """
+        self.session_id = None
+        self._session_ready = False
+        
+        request = self._create_mcp_request("initialize", {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {},
+            "clientInfo": {
+                "name": "VideoSubtitleProcessor",
+                "version": "1.0.0"
+            }
+        })
+        response, headers = self._post_mcp_message(request)
+        if "error" in response:
+            return response
+        
+        # Servers that keep state hand out a session id that must accompany every later request
+        self.session_id = headers.get('Mcp-Session-Id')
+        self.server_info = response.get("result", {})
+        
+        # Tell the server the client is ready; notifications carry no id
+        self._post_mcp_message({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        
+        self._session_ready = True
+        return response
+    
+    def _ensure_session(self) -> bool:
+        """Establish the MCP session once; later calls reuse it."""
+        if self._session_ready:
+            return True
+        
+        with self._session_lock:
+            if not self._session_ready:
+                response = self._initialize_session()
+                if "error" in response:
+                    print(f"[WARNING] MCP session initialization failed: {response['error']}")
+        return self._session_ready
+    
+    def _send_mcp_request(self, request: Dict[str, Any],
+                          on_event: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+        """Send MCP request to LARA server within the shared MCP session.
+        
+        Intermediate messages streamed before the response are passed to
+        ``on_event``. When the server reports the session as unknown
+        (HTTP 404), the session is re-initialized and the request is retried once.
+        """
+        self._ensure_session()
+        session_id = self.session_id
+        response, _ = self._post_mcp_message(request, on_event)
+        
+        if response.get("status_code") == 404 and session_id:
+            print("[WARNING] MCP session expired, re-initializing")
+            with self._session_lock:
+                # Another thread may already have replaced the expired session
+                if self.session_id == session_id:
+                    self._initialize_session()
+            response, _ = self._post_mcp_message(request, on_event)
+        
+        return response
+    
+    def close_session(self):
+        """Terminate the MCP session on the server, if one is open."""
+        with self._session_lock:
+            if self.session_id:
+                try:
+                    self.transport.delete(headers={'Mcp-Session-Id': self.session_id})
+                except TransportError:
+                    pass
+            self.session_id = None
+            self._session_ready = False
     
     def test_connection(self) -> bool:
-        """Test connection to LARA MCP server."""
+        """Test connection to LARA MCP server by (re)running the session handshake."""
         try:
-            # Try to get server info first
-            request = self._create_mcp_request("initialize", {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {},
-                "clientInfo": {
-                    "name": "VideoSubtitleProcessor",
-                    "version": "1.0.0"
-                }
-            })
-            response = self._send_mcp_request(request)
+            with self._session_lock:
+                response = self._initialize_session()
             
             if "error" not in response:
                 print("[OK] MCP connection test successful")
@@ -123,81 +343,173 @@ class MCPClient:
             print(f"[ERROR] MCP connection test error: {e}")
             return False
     
+    def _discover_translate_method(self) -> Optional[Tuple[str, str, str]]:
+        """Read the server's tool schema via tools/list and pick the translate tool and argument names."""
+        response = self._send_mcp_request(self._create_mcp_request("tools/list"))
+        result = response.get("result")
+        if "error" in response or not isinstance(result, dict):
+            return None
+        
+        tools = {tool.get("name"): tool for tool in result.get("tools", []) if isinstance(tool, dict)}
+        for tool_name in ("translate", "translate_text"):
+            tool = tools.get(tool_name)
+            if tool is None:
+                continue
+            properties = (tool.get("inputSchema") or {}).get("properties") or {}
+            if "source" in properties or "target" in properties:
+                return tool_name, "source", "target"
+            if "from" in properties or "to" in properties:
+                return tool_name, "from", "to"
+            return tool_name, "source", "target"
+        
+        return None
+    
+    def _get_translate_method(self) -> Optional[Tuple[str, str, str]]:
+        """Return the cached translate method, discovering it once per process."""
+        method = self._translate_methods.get(self.mcp_server_url)
+        if method is not None:
+            return method
+        
+        with self._translate_methods_lock:
+            method = self._translate_methods.get(self.mcp_server_url)
+            if method is None:
+                method = self._discover_translate_method()
+                if method is not None:
+                    print(f"[OK] Using MCP tool '{method[0]}' ({method[1]}/{method[2]})")
+                    self._translate_methods[self.mcp_server_url] = method
+        return method
+    
+    def _build_translate_params(self, method: Tuple[str, str, str], texts: List[str],
+                                source_lang: str, target_lang: str) -> Dict[str, Any]:
+        """Build tools/call params for translating a list of texts with the given method."""
+        tool_name, source_arg, target_arg = method
+        return {
+            "name": tool_name,
+            "arguments": {
+                # Server expects array of objects with translatable field
+                "text": [{"text": text, "translatable": True} for text in texts],
+                source_arg: source_lang,
+                target_arg: target_lang
+            }
+        }
+    
+    def _extract_translations(self, response: Dict[str, Any]) -> Optional[List[str]]:
+        """Extract the list of translated texts from a translate tool response."""
+        if "result" in response:
+            result = response["result"]
+            if isinstance(result, dict):
+                # Check for content field first
+                content = result.get("content")
+                if isinstance(content, list) and len(content) > 0 and isinstance(content[0], dict):
+                    text_content = content[0].get("text", "")
+                    if text_content:
+                        # The translate tool returns the translated array as a JSON string
+                        try:
+                            parsed = json.loads(text_content)
+                        except json.JSONDecodeError:
+                            return [text_content]
+                        if isinstance(parsed, list):
+                            return [item.get("text", "") if isinstance(item, dict) else str(item) for item in parsed]
+                        return [text_content]
+                
+                # Try different possible result field names
+                for field in ["translated_texts", "translated_text", "translation", "result"]:
+                    if field in result:
+                        value = result[field]
+                        return value if isinstance(value, list) else [value]
+                return None
+            if isinstance(result, list):
+                return result
+            return [result]
+        if "content" in response:
+            return [response["content"]]
+        return None
+    
+    def _try_translate_method(self, method: Tuple[str, str, str], texts: List[str],
+                              source_lang: str, target_lang: str) -> Tuple[Optional[List[str]], bool]:
+        """Send one tools/call with the given method.
+        
+        Returns (translations, rejected): translations is None on failure, and
+        rejected tells whether the server refused the tool or its arguments,
+        as opposed to a transport or HTTP-level failure.
+        """
+        # Sequential batches, retries, per-cue fallbacks and engine workers all draw from the same buckets
+        waited = self.request_bucket.take(1)
+        waited += self.char_bucket.take(sum(len(text or "") for text in texts))
+        self._rate_wait.seconds = getattr(self._rate_wait, 'seconds', 0.0) + waited
+        
+        params = self._build_translate_params(method, texts, source_lang, target_lang)
+        request = self._create_mcp_request("tools/call", params)
+        if self.on_notification:
+            # Ask the server to stream progress notifications for this call
+            params["_meta"] = {"progressToken": request["id"]}
+        response = self._send_mcp_request(request, self.on_notification)
+        
+        status_code = response.get("status_code") or 0
+        if status_code == 429 or status_code >= 500 or response.get("timeout"):
+            # The server is overloaded, not refusing the method; the caller backs off and retries
+            raise ServerBusyError(response["error"], status_code=status_code or None,
+                                  retry_after=response.get("retry_after"), timeout=bool(response.get("timeout")))
+        
+        if "error" in response:
+            # JSON-RPC errors come back as objects; transport and HTTP errors as strings
+            return None, isinstance(response["error"], dict)
+        
+        result = response.get("result")
+        if isinstance(result, dict) and result.get("isError"):
+            return None, True
+        
+        translations = self._extract_translations(response)
+        if translations is None or len(translations) != len(texts):
+            return None, False
+        
+        return repair_texts(translations), False
+    
+    def _call_translate_tool(self, texts: List[str], source_lang: str, target_lang: str) -> Optional[List[str]]:
+        """Translate a list of texts in a single tools/call request.
+        
+        Uses the method discovered from the server's tool schema. Only when the
+        server rejects that method are the other known variants probed, and
+        the first one that works replaces it in the cache.
+        
+        Returns one translation per input text, or None if no method
+        produced a response that maps back onto the inputs. Raises
+        ServerBusyError when the server throttles, fails or times out.
+        """
+        method = self._get_translate_method()
+        if method is not None:
+            translations, rejected = self._try_translate_method(method, texts, source_lang, target_lang)
+            if not rejected:
+                return translations
+            print(f"[WARNING] MCP tool '{method[0]}' was rejected, probing other translate methods")
+        
+        for candidate in self._TRANSLATE_METHOD_VARIANTS:
+            if candidate == method:
+                continue
+            translations, rejected = self._try_translate_method(candidate, texts, source_lang, target_lang)
+            if translations is not None:
+                with self._translate_methods_lock:
+                    self._translate_methods[self.mcp_server_url] = candidate
+                return translations
+            if not rejected:
+                # The request failed for reasons other than the method; probing further would not help
+                return None
+        
+        return None
+    
     def translate_text(self, text: str, source_lang: str = "en", target_lang: str = "fr") -> Optional[str]:
-        """Translate text using LARA MCP server."""
+        """Translate text using LARA MCP server, consulting the translation memory first."""
         try:
-            # Try different MCP methods for translation
-            methods_to_try = [
-                ("tools/call", {
-                    "name": "translate",
-                    "arguments": {
-                        "text": [{"text": text, "translatable": True}],  # Server expects array of objects with translatable field
-                        "source": source_lang,
-                        "target": target_lang
-                    }
-                }),
-                ("tools/call", {
-                    "name": "translate",
-                    "arguments": {
-                        "text": [{"text": text, "translatable": True}],  # Server expects array of objects with translatable field
-                        "from": source_lang,
-                        "to": target_lang
-                    }
-                }),
-                ("tools/call", {
-                    "name": "translate_text",
-                    "arguments": {
-                        "text": [{"text": text, "translatable": True}],  # Server expects array of objects with translatable field
-                        "source": source_lang,
-                        "target": target_lang
-                    }
-                })
-            ]
+            if self.cache is not None:
+                cached = self.cache.get(source_lang, target_lang, text)
+                if cached is not None:
+                    return cached
             
-            for method, params in methods_to_try:
-                request = self._create_mcp_request(method, params)
-                response = self._send_mcp_request(request)
-                
-                if "error" not in response:
-                    # Extract translated text from response
-                    if "result" in response:
-                        if isinstance(response["result"], dict):
-                            # Check for content field first
-                            if "content" in response["result"]:
-                                content = response["result"]["content"]
-                                if isinstance(content, list) and len(content) > 0:
-                                    # Extract text from content
-                                    text_content = content[0].get("text", "")
-                                    if text_content:
-                                        # Try to parse JSON if it's a string
-                                        try:
-                                            import json
-                                            parsed = json.loads(text_content)
-                                            if isinstance(parsed, list) and len(parsed) > 0:
-                                                translated_text = parsed[0].get("text", text)
-                                                # Apply encoding fix for French characters
-                                                return self._fix_french_encoding(translated_text)
-                                        except json.JSONDecodeError:
-                                            # If not JSON, return as is with encoding fix
-                                            return self._fix_french_encoding(text_content)
-                            
-                            # Try different possible result field names
-                            for field in ["translated_text", "translation", "result"]:
-                                if field in response["result"]:
-                                    translated_text = response["result"][field]
-                                    print(f"🔧 DEBUG: Raw translation from server: '{translated_text}'")
-                                    # Apply encoding fix for French characters
-                                    fixed_text = self._fix_french_encoding(translated_text)
-                                    print(f"🔧 DEBUG: Final translation after fix: '{fixed_text}'")
-                                    return fixed_text
-                        else:
-                            translated_text = response["result"]
-                            # Apply encoding fix for French characters
-                            return self._fix_french_encoding(translated_text)
-                    elif "content" in response:
-                        translated_text = response["content"]
-                        # Apply encoding fix for French characters
-                        return self._fix_french_encoding(translated_text)
+            translations = self._call_translate_tool([text], source_lang, target_lang)
+            if translations:
+                if self.cache is not None:
+                    self.cache.put(source_lang, target_lang, text, translations[0])
+                return translations[0]
             
             # If all methods fail, return original text
             print(f"[ERROR] Translation failed: No working method found")
@@ -207,68 +519,261 @@ class MCPClient:
             print(f"[ERROR] Translation error: {e}")
             return text
     
-    def translate_batch(self, texts: List[str], source_lang: str = "en", target_lang: str = "fr") -> List[Optional[str]]:
-        """Translate multiple texts using LARA MCP server through OpenAI agent."""
+    def _translate_one_batch(self, batch: List[str], source_lang: str, target_lang: str) -> List[Optional[str]]:
+        """Translate one batch in a single request, falling back to per-cue requests.
+        
+        Entries that could not be translated are returned as None.
+        ServerBusyError is propagated so the caller can back off.
+        """
         try:
-            # Create MCP batch translation request
-            request = self._create_mcp_request("translate_batch", {
-                "texts": texts,
-                "source_language": source_lang,
-                "target_language": target_lang
-            })
-            
-            response = self._send_mcp_request(request)
-            
-            if "error" in response:
-                print(f"[ERROR] Batch translation failed: {response['error']}")
-                # Fallback to individual translations
-                return [self.translate_text(text, source_lang, target_lang) for text in texts]
-            
-            # Extract translated texts from response
-            if "result" in response:
-                if isinstance(response["result"], dict):
-                    return response["result"].get("translated_texts", texts)
-                elif isinstance(response["result"], list):
-                    return response["result"]
-                else:
-                    return texts
-            else:
-                return texts
-                
+            translations = self._call_translate_tool(batch, source_lang, target_lang)
+        except ServerBusyError:
+            raise
         except Exception as e:
             print(f"[ERROR] Batch translation error: {e}")
-            # Fallback to individual translations
-            return [self.translate_text(text, source_lang, target_lang) for text in texts]
+            translations = None
+        
+        if translations is None:
+            print(f"[WARNING] Batch of {len(batch)} entries could not be mapped back, falling back to individual translations")
+            translations = []
+            for text in batch:
+                single = self._call_translate_tool([text], source_lang, target_lang)
+                translations.append(single[0] if single else None)
+        
+        return translations
+    
+    def _translate_batch_adaptive(self, batch: List[str], source_lang: str, target_lang: str) -> List[Optional[str]]:
+        """Translate one batch, reporting latency and throttling to the adaptive controller.
+        
+        Time spent waiting for our own rate-limit tokens is not server
+        latency, so it is left out of what the controller sees. After HTTP
+        429/5xx or a timeout the batch is retried, up to
+        TRANSLATION_MAX_RETRIES times, once any Retry-After pause has elapsed.
+        """
+        for attempt in range(TRANSLATION_MAX_RETRIES + 1):
+            self.controller.wait_if_paused()
+            self._rate_wait.seconds = 0.0
+            started = time.monotonic()
+            try:
+                translations = self._translate_one_batch(batch, source_lang, target_lang)
+            except ServerBusyError as e:
+                self.controller.record_throttle(e.retry_after, timeout=e.timeout)
+                settings = self.controller.get_status()
+                print(f"[WARNING] Server busy ({e}), backing off to {settings['concurrency']} in flight, "
+                      f"{settings['batch_size']} cues per batch")
+                if not e.retry_after:
+                    # Without Retry-After, wait a little longer after each attempt
+                    time.sleep(min(2 ** attempt, 30))
+                continue
+            
+            latency = time.monotonic() - started - self._rate_wait.seconds
+            self.controller.record_success(max(latency, 0.0), len(batch))
+            return translations
+        
+        print(f"[ERROR] Batch of {len(batch)} entries failed after {TRANSLATION_MAX_RETRIES} retries")
+        return [None] * len(batch)
+    
+    def _translate_uncached(self, texts: List[str], source_lang: str, target_lang: str) -> List[Optional[str]]:
+        """Send texts to the server in batches; failed entries are returned as None.
+        
+        Batch size and requests in flight are read from the adaptive
+        controller as each batch is dispatched.
+        """
+        if not texts:
+            return []
+        
+        if self.max_concurrency > 1 and len(texts) > self.controller.batch_size:
+            print(f"  📦 Sending {len(texts)} entries with up to {self.max_concurrency} requests in flight")
+            engine = self.create_engine()
+            return engine.translate_texts(
+                texts, source_lang, target_lang,
+                on_batch_done=lambda done, total: print(f"  📦 Translated {done}/{total} entries")
+            )
+        
+        results: List[Optional[str]] = []
+        start = 0
+        batch_number = 0
+        while start < len(texts):
+            end = take_batch(texts, start, self.controller.batch_size, self.batch_max_chars)
+            batch_number += 1
+            print(f"  📦 Processing batch {batch_number} (entries {start + 1}-{end} of {len(texts)})")
+            results.extend(self._translate_batch_adaptive(texts[start:end], source_lang, target_lang))
+            start = end
+        
+        return results
+    
+    def translate_batch(self, texts: List[str], source_lang: str = "en", target_lang: str = "fr",
+                        validate: Callable[[str, str], bool] = None) -> List[Optional[str]]:
+        """Translate multiple texts using as few LARA MCP requests as possible.
+        
+        Texts found in the translation memory are answered locally. The rest
+        are packed into batches bounded by the adaptive controller's batch
+        size (at most ``batch_max_cues``) and ``batch_max_chars``; each batch
+        is one tools/call request whose returned array is mapped back onto
+        the input positions. With ``max_concurrency`` above 1, batches run
+        through the async engine.
+        
+        ``validate(text, translation)`` decides which translations may be
+        stored in, or served from, the translation memory.
+        """
+        results: List[Optional[str]] = list(texts)
+        if not texts:
+            return results
+        
+        pending_indexes = list(range(len(texts)))
+        if self.cache is not None:
+            cached = self.cache.get_many(source_lang, target_lang, texts)
+            pending_indexes = []
+            for index, text in enumerate(texts):
+                hit = cached.get(self.cache.normalize_text(text))
+                if hit is None or (validate is not None and not validate(text, hit)):
+                    pending_indexes.append(index)
+                else:
+                    results[index] = hit
+            print(f"  💾 Translation memory: {len(texts) - len(pending_indexes)}/{len(texts)} entries already translated")
+        
+        pending_texts = [texts[index] for index in pending_indexes]
+        translations = self._translate_uncached(pending_texts, source_lang, target_lang)
+        
+        for index, translated in zip(pending_indexes, translations):
+            # Keep original if translation failed
+            if translated:
+                results[index] = translated
+        
+        if self.cache is not None:
+            self.cache.put_many(source_lang, target_lang, [
+                (text, translated) for text, translated in zip(pending_texts, translations)
+                if translated and (validate is None or validate(text, translated))
+            ])
+        
+        return results
+    
+    def translate_unique(self, texts: List[str], source_lang: str = "en", target_lang: str = "fr",
+                         validate: Callable[[str, str], bool] = None) -> List[Optional[str]]:
+        """Translate texts with identical cues collapsed, so each unique string is sent once."""
+        dedup = CueDeduplicator(texts)
+        self.last_dedup_stats = dedup.get_stats()
+        print(f"  🔁 Deduplication: {dedup.describe()}")
+        
+        unique_translations = self.translate_batch(dedup.unique_texts, source_lang, target_lang, validate)
+        return dedup.expand(unique_translations)
+    
+    def _cues_in_language(self, texts: List[str], language: str) -> List[int]:
+        """Indexes of the cues identified as written in a language."""
+        identifier = get_language_identifier()
+        return [i for i, text in enumerate(texts) if identifier.detect(text) == language]
+    
+    def translate_sentences(self, texts: List[str], source_lang: str = "en", target_lang: str = "fr",
+                            positions: List[int] = None) -> List[Optional[str]]:
+        """Translate cue texts with sentences split across cues merged into one unit.
+        
+        Each unit's translation is redistributed over its original cues. Cues
+        with nothing to translate (music notes, sound tags, numbers) and cues
+        identified as already in the target language are kept as they are,
+        and no unit spans them. ``positions`` gives each text's cue index in
+        its file when some cues were already left out, so no unit spans those either.
+        """
+        positions = positions if positions is not None else list(range(len(texts)))
+        self.last_language_stats = {}
+        self.last_packing_stats = {}
+        self.last_classifier_stats = {}
+        
+        pending = list(range(len(texts)))
+        if CUE_CLASSIFIER_ENABLED:
+            classifier = CueClassifier(texts)
+            pending = classifier.pending
+            self.last_classifier_stats = classifier.get_stats()
+            if classifier.passthrough:
+                print(f"  ⏭️ {len(classifier.passthrough)} cue(s) with nothing to translate passed through")
+        
+        if LANGUAGE_ID_ENABLED and source_lang != target_lang:
+            in_target = self._cues_in_language([texts[i] for i in pending], target_lang)
+            self.last_language_stats = {'cues_in_target_language': len(in_target)}
+            if in_target:
+                print(f"  🌐 {len(in_target)} cue(s) already in {target_lang}, kept untranslated")
+                in_target_set = set(in_target)
+                pending = [i for position, i in enumerate(pending) if position not in in_target_set]
+        
+        if len(pending) == len(texts):
+            translated = self._translate_packed(texts, source_lang, target_lang, positions)
+        else:
+            translated = list(texts)
+            packed = self._translate_packed([texts[i] for i in pending], source_lang, target_lang,
+                                            [positions[i] for i in pending])
+            for i, translation in zip(pending, packed):
+                translated[i] = translation
+        
+        self.last_classifier_stats['requests_avoided'] = (
+            self.last_classifier_stats.get('unique_passed_through', 0) +
+            self.last_classifier_stats.get('merged_by_masking', 0)
+        )
+        return translated
+    
+    def _translate_packed(self, texts: List[str], source_lang: str, target_lang: str,
+                          positions: List[int] = None) -> List[Optional[str]]:
+        """Translate cue texts through the sentence packer when enabled; units never span a gap in ``positions``."""
+        if not texts:
+            return []
+        
+        if not SENTENCE_PACKING_ENABLED:
+            self.last_packing_stats = {}
+            return self._translate_masked(texts, source_lang, target_lang)
+        
+        packer = SentencePacker(texts, max_chars=SENTENCE_PACKING_MAX_CHARS, positions=positions)
+        self.last_packing_stats = packer.get_stats()
+        print(f"  🧩 Sentence packing: {packer.describe()}")
+        
+        unit_translations = self._translate_masked(packer.units, source_lang, target_lang)
+        return packer.unpack(unit_translations)
+    
+    def _translate_masked(self, texts: List[str], source_lang: str, target_lang: str) -> List[Optional[str]]:
+        """Translate texts with names, numbers and timestamps masked as placeholders.
+        
+        Texts whose translation lost a placeholder are translated again
+        unmasked; only translations that kept their placeholders are stored
+        in the translation memory under the masked text.
+        """
+        if not PLACEHOLDER_MASKING_ENABLED:
+            return self.translate_unique(texts, source_lang, target_lang)
+        
+        masker = PlaceholderMasker(texts, mask_names=source_lang not in CAPITALIZED_NOUN_LANGUAGES)
+        self.last_classifier_stats.update(masker.get_stats())
+        
+        translations, failed = masker.unmask(
+            self.translate_unique(masker.masked, source_lang, target_lang, validate=masker.preserved))
+        if failed:
+            print(f"  [WARNING] {len(failed)} translation(s) lost a placeholder, translating them unmasked")
+            retried = self.translate_batch([texts[i] for i in failed], source_lang, target_lang)
+            for i, translation in zip(failed, retried):
+                translations[i] = translation
+        return translations
+    
+    def create_engine(self) -> AsyncTranslationEngine:
+        """Create an async engine that sends batches through this client.
+        
+        The engine gets no rate limits of its own: every request it sends
+        draws from the client's shared buckets.
+        """
+        return AsyncTranslationEngine(
+            self._translate_batch_adaptive,
+            max_concurrency=self.max_concurrency,
+            max_batch_chars=self.batch_max_chars,
+            batch_size_fn=lambda: self.controller.batch_size,
+            concurrency_fn=lambda: self.controller.concurrency
+        )
     
     def translate_subtitle_file(self, subtitle_path: Path, target_lang: str = "fr") -> Optional[Path]:
         """Translate an entire subtitle file using LARA MCP server."""
         try:
-            # Read subtitle file
-            with open(subtitle_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Parse SRT content and extract text
-            subtitle_texts = self._extract_srt_texts(content)
+            output_path = subtitle_path.parent / f"{subtitle_path.stem}_{target_lang}.srt"
             
-            if not subtitle_texts:
+            # Translate and write the file window by window
+            print(f"Translating {subtitle_path.name}...")
+            if not self.translate_srt_stream(subtitle_path, output_path, target_lang=target_lang):
                 print(f"No subtitle text found in {subtitle_path}")
+                output_path.unlink(missing_ok=True)
                 return None
             
-            # Translate all subtitle texts
-            print(f"Translating {len(subtitle_texts)} subtitle entries...")
-            translated_texts = self.translate_batch(subtitle_texts, target_lang=target_lang)
-            
-            if not translated_texts:
-                print("Translation failed")
-                return None
-            
-            # Create translated subtitle file
-            translated_content = self._create_translated_srt(content, translated_texts)
-            output_path = subtitle_path.parent / f"{subtitle_path.stem}_{target_lang}.srt"
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(translated_content)
-            
             print(f"[OK] Translated subtitle saved to: {output_path}")
             return output_path
             
@@ -276,60 +781,6 @@ class MCPClient:
             print(f"[ERROR] Subtitle file translation error: {e}")
             return None
     
-    def _extract_srt_texts(self, srt_content: str) -> List[str]:
-        """Extract text content from SRT format."""
-        texts = []
-        lines = srt_content.strip().split('\n')
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # Skip empty lines and timestamp lines
-            if not line or line.isdigit() or '-->' in line:
-                i += 1
-                continue
-            
-            # This should be subtitle text
-            texts.append(line)
-            i += 1
-        
-        return texts
-    
-    def _create_translated_srt(self, original_content: str, translated_texts: List[str]) -> str:
-        """Create translated SRT content with original timestamps."""
-        lines = original_content.strip().split('\n')
-        translated_lines = []
-        text_index = 0
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            if not line:
-                translated_lines.append(line)
-                i += 1
-                continue
-            
-            if line.isdigit() or '-->' in line:
-                # Keep timestamp and numbering
-                translated_lines.append(line)
-                i += 1
-                continue
-            
-            # Replace subtitle text with translation
-            if text_index < len(translated_texts) and translated_texts[text_index]:
-                translated_lines.append(translated_texts[text_index])
-                text_index += 1
-            else:
-                # Keep original if translation failed
-                translated_lines.append(line)
-                text_index += 1
-            
-            i += 1
-        
-        return '\n'.join(translated_lines)
-    
     def get_status(self) -> Dict[str, Any]:
         """Get the status of the MCP client."""
         return {
@@ -337,7 +788,15 @@ class MCPClient:
             "lara_configured": bool(self.access_key_id and self.access_key_secret),
             "mcp_server_url": self.mcp_server_url,
             "access_key_id_present": bool(self.access_key_id),
-            "access_key_secret_present": bool(self.access_key_secret)
+            "access_key_secret_present": bool(self.access_key_secret),
+            "transport": self.transport.get_status(),
+            "session_active": self._session_ready,
+            "adaptive_controller": self.controller.get_status(),
+            "rate_limits": {
+                "requests_per_second": self.request_bucket.rate,
+                "chars_per_second": self.char_bucket.rate
+            },
+            "translation_memory": self.cache.get_stats() if self.cache is not None else None
         }
     
     def get_credential_status(self) -> Dict[str, Any]:
@@ -351,213 +810,106 @@ class MCPClient:
         })
         return status
 
-    def translate_srt_content(self, srt_content: str, source_lang: str = "en", target_lang: str = "fr") -> str:
-        """Translate SRT content while preserving timing and formatting."""
-        try:
-            # Parse SRT content into entries
-            entries = self._parse_srt_entries(srt_content)
-            
-            if not entries:
-                print("[ERROR] No SRT entries found to translate")
-                return srt_content
-            
-            print(f"📝 Found {len(entries)} SRT entries to translate")
-            
-            # Extract only the text content (without timing and formatting)
-            text_entries = []
-            for entry in entries:
-                if 'text' in entry:
-                    # Clean the text by removing HTML tags and extra whitespace
-                    clean_text = self._clean_srt_text(entry['text'])
-                    if clean_text.strip():
-                        text_entries.append(clean_text)
-            
-            if not text_entries:
-                print("[ERROR] No translatable text found in SRT")
-                return srt_content
-            
-            print(f"🌐 Translating {len(text_entries)} text entries in chunks...")
-            
-            # Translate in chunks with progress updates
-            chunk_size = 20  # Process 20 entries at a time
-            translated_texts = []
-            
-            for i in range(0, len(text_entries), chunk_size):
-                chunk = text_entries[i:i + chunk_size]
-                chunk_end = min(i + chunk_size, len(text_entries))
-                
-                print(f"  📦 Processing chunk {i//chunk_size + 1}/{(len(text_entries) + chunk_size - 1)//chunk_size} (entries {i+1}-{chunk_end})")
-                
-                # Translate this chunk
-                for j, text in enumerate(chunk):
-                    translated = self.translate_text(text, source_lang, target_lang)
-                    if translated and translated != text:
-                        # Apply encoding fix for French characters
-                        fixed_translated = self._fix_french_encoding(translated)
-                        translated_texts.append(fixed_translated)
-                    else:
-                        translated_texts.append(text)  # Keep original if translation failed
-                
-                # Small delay to avoid overwhelming the server
-                import time
-                time.sleep(0.1)
-            
-            print(f"[OK] Translation completed! Processed {len(translated_texts)} entries")
-            
-            # Reconstruct SRT content with translated text
-            return self._reconstruct_srt_with_translations(entries, translated_texts)
-            
-        except Exception as e:
-            print(f"[ERROR] SRT translation error: {e}")
-            return srt_content
-    
-    def _fix_french_encoding(self, text: str) -> str:
-        """Fix common French encoding issues."""
-        if not text:
-            return text
+    def translate_document(self, document: SubtitleDocument, source_lang: str = "en",
+                           target_lang: str = "fr") -> SubtitleDocument:
+        """Translate every cue of a document, keeping its timing."""
+        # Only the text content is translated (without HTML tags and line breaks),
+        # remembering which cue each translatable text belongs to
+        text_entries = []
+        cue_indexes = []
+        for index, text in enumerate(document.texts()):
+            cleaned = clean_text(text)
+            if cleaned:
+                text_entries.append(cleaned)
+                cue_indexes.append(index)
         
-        # Debug: Log the original text and its bytes
-        print(f"🔧 DEBUG: Fixing encoding for: '{text}'")
-        print(f"🔧 DEBUG: Text bytes: {text.encode('utf-8')}")
-        
-        # Common encoding fixes for French characters
-        encoding_fixes = {
-            'Ã©': 'é',  # é
-            'Ã¨': 'è',  # è
-            'Ã ': 'à',  # à
-            'Ã¢': 'â',  # â
-            'Ãª': 'ê',  # ê
-            'Ã®': 'î',  # î
-            'Ã´': 'ô',  # ô
-            'Ã¹': 'ù',  # ù
-            'Ã»': 'û',  # û
-            'Ã§': 'ç',  # ç
-            'Ã«': 'ë',  # ë
-            'Ã¯': 'ï',  # ï
-            'Ã¶': 'ö',  # ö
-            'Ã¼': 'ü',  # ü
-            'Ã¦': 'æ',  # æ
-            'Å"': 'œ',  # œ
-            'Â«': '«',  # «
-            'Â»': '»',  # »
-            'Â°': '°',  # °
-            'Â±': '±',  # ±
-            'Â²': '²',  # ²
-            'Â³': '³',  # ³
-            'Â¼': '¼',  # ¼
-            'Â½': '½',  # ½
-            'Â¾': '¾',  # ¾
-            'Â ': '',   # Remove standalone Â characters
-            'Â?': '?',  # Fix Â followed by question mark
-            'Â!': '!',  # Fix Â followed by exclamation
-            'Â.': '.',  # Fix Â followed by period
-            'Â,': ',',  # Fix Â followed by comma
-        }
+        if not text_entries:
+            print("[ERROR] No translatable text found in SRT")
+            return document
         
-        # Apply fixes
-        fixed_text = text
-        for corrupted, correct in encoding_fixes.items():
-            if corrupted in fixed_text:
-                print(f"🔧 DEBUG: Replacing '{corrupted}' with '{correct}'")
-                fixed_text = fixed_text.replace(corrupted, correct)
-        
-        # Additional fix: Remove any standalone Â character followed by punctuation
-        import re
-        # Pattern to match Â followed by any punctuation
-        pattern = r'Â([?!.,:;])'
-        if re.search(pattern, fixed_text):
-            print(f"🔧 DEBUG: Found Â + punctuation pattern, applying regex fix")
-            fixed_text = re.sub(pattern, r'\1', fixed_text)
-        
-        # Fix for specific UTF-8 encoding issue: Â + non-breaking space + punctuation
-        # This handles the case where Â is followed by \xc2\xa0 (non-breaking space) and punctuation
-        pattern2 = r'Â\s*([?!.,:;])'
-        if re.search(pattern2, fixed_text):
-            print(f"🔧 DEBUG: Found Â + whitespace + punctuation pattern, applying regex fix")
-            fixed_text = re.sub(pattern2, r'\1', fixed_text)
-        
-        # Debug: Log the fixed text
-        if fixed_text != text:
-            print(f"🔧 DEBUG: Fixed text: '{fixed_text}'")
-        else:
-            print(f"🔧 DEBUG: No encoding issues found")
+        print(f"🌐 Translating {len(text_entries)} text entries in batches "
+              f"(up to {self.batch_max_cues} cues / {self.batch_max_chars} chars per request)...")
         
-        return fixed_text
-    
-    def _parse_srt_entries(self, srt_content: str) -> List[Dict]:
-        """Parse SRT content into structured entries."""
-        entries = []
-        lines = srt_content.strip().split('\n')
+        translated_batch = self.translate_sentences(text_entries, source_lang, target_lang, positions=cue_indexes)
         
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # Look for entry number
-            if line.isdigit():
-                entry = {'number': line}
-                i += 1
-                
-                # Get timing line
-                if i < len(lines):
-                    entry['timing'] = lines[i].strip()
-                    i += 1
-                
-                # Get text lines until empty line or next number
-                text_lines = []
-                while i < len(lines) and lines[i].strip() and not lines[i].strip().isdigit():
-                    text_lines.append(lines[i].strip())
-                    i += 1
-                
-                if text_lines:
-                    entry['text'] = '\n'.join(text_lines)
-                    entries.append(entry)
-            
-            i += 1
+        # Cues without translatable text, and cues left unchanged (passed through or
+        # already translated), keep their original content and markup
+        translated_texts: List[Optional[str]] = [None] * len(document)
+        for index, text, translated in zip(cue_indexes, text_entries, translated_batch):
+            if translated != text:
+                translated_texts[index] = translated
         
-        return entries
+        print(f"[OK] Translation completed! Processed {len(text_entries)} entries")
+        return document.with_texts(translated_texts)
     
-    def _clean_srt_text(self, text: str) -> str:
-        """Clean SRT text by removing HTML tags and extra formatting."""
-        import re
+    def translate_srt_stream(self, input_path: Path, output_path: Path, source_lang: str = "en",
+                             target_lang: str = "fr", window_cues: int = None) -> int:
+        """Translate an SRT file window by window, writing each window as soon as it is translated.
         
-        # Remove HTML tags
-        clean_text = re.sub(r'<[^>]+>', '', text)
+        Cues are parsed lazily and at most ``window_cues`` are held at once, so
+        memory stays fixed however long the file is. Repeats across windows are
+        served by the translation memory. Returns the number of cues written;
+        the stats attributes hold totals over all windows.
         
-        # Remove extra whitespace and normalize
-        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+        Windows go to a temporary file in the output directory that replaces
+        ``output_path`` only once the whole file is translated, so a failure
+        part way through leaves any existing file untouched.
+        """
+        input_path, output_path = Path(input_path), Path(output_path)
+        if output_path.resolve() == input_path.resolve():
+            raise ValueError(f"Translated subtitle would overwrite its source: {input_path}")
         
-        return clean_text
-    
-    def _reconstruct_srt_with_translations(self, original_entries: List[Dict], translated_texts: List[str]) -> str:
-        """Reconstruct SRT content with translated text while preserving original structure."""
-        if len(original_entries) != len(translated_texts):
-            print("[WARNING] Entry count mismatch, using original content")
-            return self._entries_to_srt(original_entries)
+        window_cues = max(1, window_cues or TRANSLATION_STREAM_WINDOW_CUES)
+        totals: Dict[str, Dict[str, Any]] = {}
         
-        # Create new entries with translated text
-        new_entries = []
-        for i, entry in enumerate(original_entries):
-            new_entry = entry.copy()
-            if 'text' in entry and i < len(translated_texts):
-                # Replace text with translated version
-                new_entry['text'] = translated_texts[i]
-            new_entries.append(new_entry)
+        fd, temp_name = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.stem}_", suffix='.tmp')
+        try:
+            with open(fd, 'w', encoding='utf-8', newline='') as target:
+                writer = SrtWriter(target)
+                cues = iter_srt_cues(iter_subtitle_lines(input_path))
+                while True:
+                    window = list(itertools.islice(cues, window_cues))
+                    if not window:
+                        break
+                    
+                    translated = self.translate_document(SubtitleDocument.from_cues(window), source_lang, target_lang)
+                    writer.write_all(translated.cues())
+                    self._add_window_stats(totals)
+                    print(f"  💾 {writer.count} cues written to {output_path.name}")
+            os.replace(temp_name, output_path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
         
-        return self._entries_to_srt(new_entries)
+        for name, stats in totals.items():
+            setattr(self, name, stats)
+        if self.last_dedup_stats.get('total_cues'):
+            self.last_dedup_stats['dedup_ratio'] = self.last_dedup_stats['duplicates_skipped'] / self.last_dedup_stats['total_cues']
+        return writer.count
     
-    def _entries_to_srt(self, entries: List[Dict]) -> str:
-        """Convert entries back to SRT format."""
-        srt_lines = []
-        
-        for entry in entries:
-            srt_lines.append(entry['number'])
-            srt_lines.append(entry['timing'])
-            if 'text' in entry:
-                srt_lines.append(entry['text'])
-            srt_lines.append('')  # Empty line between entries
-        
-        return '\n'.join(srt_lines)
+    def _add_window_stats(self, totals: Dict[str, Dict[str, Any]]):
+        """Add the counters of the window just translated to running totals."""
+        for name in ('last_dedup_stats', 'last_packing_stats', 'last_language_stats', 'last_classifier_stats'):
+            bucket = totals.setdefault(name, {})
+            for key, value in getattr(self, name).items():
+                if isinstance(value, int):
+                    bucket[key] = bucket.get(key, 0) + value
+    
+    def translate_srt_content(self, srt_content: str, source_lang: str = "en", target_lang: str = "fr") -> str:
+        """Translate SRT content while preserving timing and formatting."""
+        try:
+            document = SubtitleDocument.parse(srt_content)
+            
+            if not len(document):
+                print("[ERROR] No SRT entries found to translate")
+                return srt_content
+            
+            print(f"📝 Found {len(document)} SRT entries to translate")
+            return self.translate_document(document, source_lang, target_lang).to_srt()
+            
+        except Exception as e:
+            print(f"[ERROR] SRT translation error: {e}")
+            return srt_content
 
 
 def main():
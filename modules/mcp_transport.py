@@ -0,0 +1,256 @@
+"""
+HTTP transport layer for the LARA MCP client.
+"""
+from typing import Dict, Any, Optional, Iterable, Iterator, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Optional: httpx enables HTTP/2 multiplexing when the h2 extra is installed
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class TransportError(Exception):
+    """Raised when an HTTP request to the MCP server fails before a response is received."""
+
+
+class TransportTimeout(TransportError):
+    """Raised when the MCP server does not answer within the request timeout."""
+
+
+def _is_timeout(error: Exception) -> bool:
+    """Tell whether a requests/httpx exception is a connect or read timeout."""
+    if isinstance(error, requests.exceptions.Timeout):
+        return True
+    if httpx is not None and isinstance(error, httpx.TimeoutException):
+        return True
+    # requests reports read timeouts on streamed bodies as ConnectionError
+    return 'timed out' in str(error).lower()
+
+
+def _wrap_error(error: Exception) -> Optional[TransportError]:
+    """Convert a client library exception to TransportError, or None if it is not one."""
+    if isinstance(error, requests.exceptions.RequestException) or \
+            (httpx is not None and isinstance(error, httpx.HTTPError)):
+        return TransportTimeout(str(error)) if _is_timeout(error) else TransportError(str(error))
+    return None
+
+
+def iter_sse_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Split a raw event stream into decoded lines as the bytes arrive.
+
+    Lines end only at LF or CRLF. Generic line splitters also break on a
+    lone CR, U+2028 or U+2029, which may legitimately appear inside a JSON
+    data line and would cut the payload in two.
+    """
+    pending = []
+    for chunk in chunks:
+        if not chunk:
+            continue
+        parts = chunk.split(b'\n')
+        pending.append(parts[0])
+        for part in parts[1:]:
+            line = b''.join(pending)
+            if line.endswith(b'\r'):
+                line = line[:-1]
+            yield line.decode('utf-8', errors='replace')
+            pending = [part]
+
+    # The stream may close without a final line break
+    line = b''.join(pending)
+    if line:
+        yield line.decode('utf-8', errors='replace')
+
+
+def iter_sse_events(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """Parse Server-Sent Events incrementally, yielding (event, data) as each event completes.
+
+    Only the lines of the event being assembled are held in memory.
+    """
+    event_type = 'message'
+    data_lines = []
+
+    for line in lines:
+        if not line:
+            # A blank line dispatches the pending event
+            if data_lines:
+                yield event_type, '\n'.join(data_lines)
+            event_type = 'message'
+            data_lines = []
+            continue
+
+        if line.startswith(':'):
+            # Comment / keep-alive line
+            continue
+
+        field, _, value = line.partition(':')
+        if value.startswith(' '):
+            value = value[1:]
+
+        if field == 'data':
+            data_lines.append(value)
+        elif field == 'event':
+            event_type = value
+
+    # The stream may close without a trailing blank line
+    if data_lines:
+        yield event_type, '\n'.join(data_lines)
+
+
+class StreamedResponse:
+    """Uniform view over a streamed requests or httpx response."""
+
+    def __init__(self, response, is_httpx: bool = False):
+        self._response = response
+        self._is_httpx = is_httpx
+        self.status_code = response.status_code
+        self.headers = response.headers
+
+    def iter_lines(self) -> Iterator[str]:
+        """Yield decoded event stream lines as they arrive (always UTF-8, whatever the Content-Type says)."""
+        try:
+            if self._is_httpx:
+                chunks = self._response.iter_bytes()
+            else:
+                chunks = self._response.iter_content(chunk_size=None)
+            yield from iter_sse_lines(chunks)
+        except Exception as e:
+            wrapped = _wrap_error(e)
+            if wrapped is None:
+                raise
+            raise wrapped from e
+
+    @property
+    def text(self) -> str:
+        """Read and return the whole body."""
+        if self._is_httpx:
+            self._response.read()
+        return self._response.text
+
+    def close(self):
+        """Release the connection back to the pool."""
+        self._response.close()
+
+
+class MCPTransport:
+    """Pooled, keep-alive HTTP transport owned by an MCP client.
+
+    All requests share one connection pool, so TCP and TLS setup is paid once
+    per connection instead of once per request. When ``http2`` is requested and
+    httpx with HTTP/2 support is available, requests are multiplexed over a
+    single HTTP/2 connection; otherwise a pooled HTTP/1.1 requests session is used.
+    """
+
+    def __init__(self, url: str, headers: Dict[str, str] = None, pool_size: int = 10,
+                 timeout: float = 30, keepalive_expiry: float = 60, http2: bool = False):
+        self.url = url
+        self.timeout = timeout
+        self.pool_size = max(1, pool_size)
+        self.keepalive_expiry = keepalive_expiry
+        self.headers = {'Connection': 'keep-alive'}
+        self.headers.update(headers or {})
+
+        self.http2 = False
+        self._session = None
+        self._client = None
+
+        if http2:
+            self._client = self._create_http2_client()
+            self.http2 = self._client is not None
+
+        if self._client is None:
+            self._session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        """Create a pooled HTTP/1.1 session with keep-alive connections."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(self.headers)
+        return session
+
+    def _create_http2_client(self) -> Optional[Any]:
+        """Create an HTTP/2 client, or return None if HTTP/2 is unavailable."""
+        if httpx is None:
+            print("! MCPTransport: httpx not installed, falling back to HTTP/1.1 keep-alive")
+            return None
+
+        try:
+            limits = httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+                keepalive_expiry=self.keepalive_expiry
+            )
+            return httpx.Client(http2=True, limits=limits, timeout=self.timeout, headers=self.headers)
+        except ImportError:
+            # httpx raises ImportError when the h2 package is missing
+            print("! MCPTransport: h2 package not installed, falling back to HTTP/1.1 keep-alive")
+            return None
+
+    def _request(self, method: str, stream: bool = False, **kwargs):
+        """Send a request to the server URL, normalizing client errors to TransportError."""
+        try:
+            if self._client is not None:
+                request = self._client.build_request(method, self.url, **kwargs)
+                return self._client.send(request, stream=stream)
+            return self._session.request(method, self.url, timeout=self.timeout, stream=stream, **kwargs)
+        except Exception as e:
+            wrapped = _wrap_error(e)
+            if wrapped is None:
+                raise
+            raise wrapped from e
+
+    def post(self, payload: Dict[str, Any], headers: Dict[str, str] = None):
+        """POST a JSON payload to the server URL and return the response.
+
+        The returned object exposes ``status_code``, ``headers``, ``text`` and ``json()``.
+        """
+        return self._request('POST', json=payload, headers=headers)
+
+    def post_stream(self, payload: Dict[str, Any], headers: Dict[str, str] = None) -> StreamedResponse:
+        """POST a JSON payload and return the response without reading its body.
+
+        The caller must close the returned response.
+        """
+        response = self._request('POST', stream=True, json=payload, headers=headers)
+        return StreamedResponse(response, is_httpx=self._client is not None)
+
+    def delete(self, headers: Dict[str, str] = None):
+        """Send a DELETE to the server URL (used to end an MCP session)."""
+        return self._request('DELETE', headers=headers)
+
+    def resize(self, pool_size: int):
+        """Rebuild the connection pool with room for ``pool_size`` connections.
+
+        Idle connections of the old pool are closed, so call this between
+        requests rather than while some are in flight.
+        """
+        pool_size = max(1, pool_size)
+        if pool_size == self.pool_size:
+            return
+        self.pool_size = pool_size
+        if self._client is not None:
+            old, self._client = self._client, self._create_http2_client()
+        else:
+            old, self._session = self._session, self._create_session()
+        old.close()
+
+    def close(self):
+        """Close all pooled connections."""
+        if self._client is not None:
+            self._client.close()
+        if self._session is not None:
+            self._session.close()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get the transport configuration."""
+        return {
+            'protocol': 'HTTP/2' if self.http2 else 'HTTP/1.1',
+            'pool_size': self.pool_size,
+            'keepalive_expiry': self.keepalive_expiry,
+            'timeout': self.timeout
+        }
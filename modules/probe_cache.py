@@ -0,0 +1,150 @@
+"""
+Shared cache of ffprobe results.
+"""
+import atexit
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+import ffmpeg
+
+from config import PROBE_CACHE_ENABLED, PROBE_CACHE_PATH, PROBE_CACHE_MAX_ENTRIES
+
+
+class ProbeCache:
+    """ffprobe results keyed by resolved path, file size and modification time.
+
+    Results are kept in memory for the run and persisted as JSON so later
+    runs skip probing files that have not changed. A change of size or
+    mtime_ns invalidates the entry. The file is written atomically at exit,
+    and every ``_SAVE_INTERVAL`` new probes so an interrupted run keeps its work.
+    """
+
+    _SAVE_INTERVAL = 50
+
+    def __init__(self, cache_path: Optional[Path] = None, max_entries: int = 20000):
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+        if self.cache_path is not None:
+            self._load()
+            atexit.register(self.save)
+
+    def _load(self):
+        """Read persisted entries, ignoring a missing or corrupt file."""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            if isinstance(entries, dict):
+                self._entries = entries
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"! ProbeCache: Ignoring unreadable cache {self.cache_path}: {e}")
+
+    def save(self):
+        """Write the entries to disk if anything changed since the last save."""
+        if self.cache_path is None:
+            return
+
+        with self._lock:
+            if not self._unsaved:
+                return
+            entries = dict(self._entries)
+            self._unsaved = 0
+
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"! ProbeCache: Could not save {self.cache_path}: {e}")
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        """Cache key for a file: its resolved path."""
+        return str(Path(path).resolve())
+
+    def probe(self, path: Path) -> Dict[str, Any]:
+        """Return ffprobe output for a file, probing only if it changed since the last probe.
+
+        Raises ffmpeg.Error like ffmpeg.probe, and OSError if the file is missing.
+        """
+        key = self._key(path)
+        stat = os.stat(key)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+                self.hits += 1
+                return entry['probe']
+            self.misses += 1
+
+        probe = ffmpeg.probe(key)
+
+        with self._lock:
+            # Re-inserting moves the key to the end, so eviction drops the oldest probes first
+            self._entries.pop(key, None)
+            self._entries[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'probe': probe}
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._unsaved += 1
+            should_save = self._unsaved >= self._SAVE_INTERVAL
+
+        if should_save:
+            self.save()
+        return probe
+
+    def invalidate(self, path: Path):
+        """Forget the cached probe of a file (e.g. after rewriting it)."""
+        with self._lock:
+            if self._entries.pop(self._key(path), None) is not None:
+                self._unsaved += 1
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._unsaved += 1
+            self.hits = 0
+            self.misses = 0
+        self.save()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for this process and the number of cached files."""
+        return {
+            'path': str(self.cache_path) if self.cache_path else None,
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+_shared_cache: Optional[ProbeCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_probe_cache() -> ProbeCache:
+    """Return the probe cache shared by every module in the process."""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = ProbeCache(
+                    PROBE_CACHE_PATH if PROBE_CACHE_ENABLED else None,
+                    max_entries=PROBE_CACHE_MAX_ENTRIES
+                )
+    return _shared_cache
+
+
+def probe_video(path: Path) -> Dict[str, Any]:
+    """Probe a file through the shared cache."""
+    return get_probe_cache().probe(path)
@@ -0,0 +1,125 @@
+"""
+Sentence-aware packing of subtitle cue fragments for translation.
+"""
+import re
+from typing import List, Dict, Optional, Any
+
+
+class SentencePacker:
+    """Merges adjacent cue fragments into sentence units and splits translations back.
+
+    A unit is closed when a fragment ends with terminal punctuation, when the
+    next fragment starts a new line of dialogue, when a cue was left out
+    between two fragments (``positions`` not consecutive, e.g. a [MUSIC] cue
+    passed through), or when adding the next fragment would exceed
+    ``max_chars``. Each unit is translated once; its translation is
+    redistributed across the original cues in proportion to their source
+    lengths, cutting only at word boundaries.
+    """
+
+    # Sentence-final punctuation, optionally followed by closing quotes or brackets
+    _TERMINAL = re.compile(r'[.!?…:;。！？♪]["\'»”’)\]]*$')
+
+    # A leading dash or speaker label marks a new line of dialogue
+    _DIALOGUE_START = re.compile(r'^(?:[-–—]\s|[A-Z][A-Z ]{1,20}:\s)')
+
+    def __init__(self, texts: List[str], max_chars: int = 300, positions: Optional[List[int]] = None):
+        self.total = len(texts)
+        self.max_chars = max_chars
+        self.units: List[str] = []
+        self.groups: List[List[int]] = []
+        self._lengths = [len(text or "") for text in texts]
+
+        group: List[int] = []
+        group_chars = 0
+        for index, text in enumerate(texts):
+            text = (text or "").strip()
+            if group and positions is not None and positions[index] != positions[index - 1] + 1:
+                self._close(texts, group)
+                group, group_chars = [], 0
+            if group and (group_chars + 1 + len(text) > max_chars or self._DIALOGUE_START.match(text)):
+                self._close(texts, group)
+                group, group_chars = [], 0
+
+            group.append(index)
+            group_chars += len(text) + (1 if group_chars else 0)
+
+            if not text or self._TERMINAL.search(text):
+                self._close(texts, group)
+                group, group_chars = [], 0
+
+        if group:
+            self._close(texts, group)
+
+    def _close(self, texts: List[str], group: List[int]):
+        """Record a finished unit."""
+        self.groups.append(group)
+        self.units.append(' '.join((texts[index] or "").strip() for index in group))
+
+    @property
+    def saved(self) -> int:
+        """Number of translation requests avoided compared with one per cue."""
+        return self.total - len(self.units)
+
+    @staticmethod
+    def split_proportionally(text: str, weights: List[int]) -> List[str]:
+        """Split text at word boundaries into len(weights) parts sized like the weights.
+
+        No part is ever empty: with fewer words than parts, the last word is
+        carried over the remaining parts, as an empty cue shows as a blank subtitle.
+        """
+        parts = len(weights)
+        words = text.split()
+        if parts == 1 or not words:
+            return [text] * parts
+        if len(words) < parts:
+            return words + [words[-1]] * (parts - len(words))
+
+        # Character offset at which each word ends, counting single spaces
+        word_ends = []
+        position = 0
+        for word in words:
+            position += len(word) + (1 if word_ends else 0)
+            word_ends.append(position)
+
+        if not sum(weights):
+            weights = [1] * parts
+        total_weight = sum(weights)
+        result = []
+        start_word = 0
+        cumulative = 0
+        for part in range(parts - 1):
+            cumulative += weights[part]
+            target = position * cumulative / total_weight
+            # Leave at least one word for each remaining part
+            last_allowed = len(words) - (parts - part - 1)
+            end_word = start_word + 1
+            while end_word < last_allowed and abs(word_ends[end_word] - target) < abs(word_ends[end_word - 1] - target):
+                end_word += 1
+            result.append(' '.join(words[start_word:end_word]))
+            start_word = end_word
+        result.append(' '.join(words[start_word:]))
+        return result
+
+    def unpack(self, unit_translations: List[Optional[str]]) -> List[Optional[str]]:
+        """Redistribute unit translations onto the original cue positions."""
+        results: List[Optional[str]] = [None] * self.total
+        for group, translated in zip(self.groups, unit_translations):
+            if translated is None or not translated.strip():
+                continue
+            pieces = self.split_proportionally(translated, [self._lengths[index] for index in group])
+            for index, piece in zip(group, pieces):
+                results[index] = piece
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the packing counters."""
+        return {
+            'total_cues': self.total,
+            'sentence_units': len(self.units),
+            'requests_saved': self.saved
+        }
+
+    def describe(self) -> str:
+        """Short human-readable summary of the savings."""
+        return f"{self.total} cues → {len(self.units)} sentence units ({self.saved} requests saved)"
@@ -8,15 +8,23 @@ from pathlib import Path
 from typing import List, Dict, Optional
 import ffmpeg
 import os
-from config import BASE_VIDEOS_DIR, SUBTITLES_DIR, SUPPORTED_VIDEO_FORMATS, SUPPORTED_SUBTITLE_FORMATS, FFMPEG_PATH
+from config import (BASE_VIDEOS_DIR, SUBTITLES_DIR, SUPPORTED_VIDEO_FORMATS, SUPPORTED_SUBTITLE_FORMATS, FFMPEG_PATH,
+                    SUBTITLE_EXTRACTION_ENGINE, BITMAP_SUBTITLE_ACTION)
+from modules.probe_cache import probe_video
+from modules.matroska_reader import MatroskaError, MATROSKA_SUFFIXES, extract_text_tracks
+from modules.extraction_planner import ExtractionJob, ExtractionPlan, plan_extraction
 
 
 class SubtitleExtractor:
     """Handles extraction of subtitles from video files."""
     
-    def __init__(self):
+    def __init__(self, engine: str = None):
         self.base_videos_dir = BASE_VIDEOS_DIR  # Default fallback
         self.subtitles_dir = SUBTITLES_DIR
+        self.engine = engine or SUBTITLE_EXTRACTION_ENGINE
+        
+        # ffmpeg runs started so far, each one a read of its source video
+        self.ffmpeg_runs = 0
         
         # Configure FFmpeg path by adding to PATH
         if FFMPEG_PATH and os.path.exists(FFMPEG_PATH):
@@ -37,9 +45,8 @@ class SubtitleExtractor:
     def get_video_info(self, video_path: Path) -> Dict:
         """Get information about a video file including available subtitle tracks."""
         try:
-            probe = ffmpeg.probe(str(video_path))
-            return probe
-        except ffmpeg.Error as e:
+            return probe_video(video_path)
+        except (ffmpeg.Error, OSError) as e:
             print(f"Error probing video {video_path}: {e}")
             return {}
     
@@ -51,94 +58,228 @@ class SubtitleExtractor:
         if 'streams' in info:
             for stream in info['streams']:
                 if stream.get('codec_type') == 'subtitle':
+                    tags = stream.get('tags', {})
+                    disposition = stream.get('disposition', {})
                     subtitle_tracks.append({
                         'index': stream.get('index'),
                         'codec_name': stream.get('codec_name'),
-                        'language': stream.get('tags', {}).get('language', 'unknown'),
-                        'title': stream.get('tags', {}).get('title', ''),
-                        'codec_long_name': stream.get('codec_long_name', '')
+                        'language': tags.get('language', 'unknown'),
+                        'title': tags.get('title', ''),
+                        'codec_long_name': stream.get('codec_long_name', ''),
+                        'default': bool(disposition.get('default')),
+                        'forced': bool(disposition.get('forced')),
+                        'hearing_impaired': bool(disposition.get('hearing_impaired')),
+                        'cue_count': self._tagged_cue_count(tags)
                     })
         
         return subtitle_tracks
     
-    def extract_subtitle(self, video_path: Path, subtitle_index: int, output_format: str = 'srt') -> Optional[Path]:
-        """Extract subtitle track from video file."""
-        # Ensure output_format has a dot prefix for comparison
-        if not output_format.startswith('.'):
-            output_format = '.' + output_format
-            
-        if output_format not in SUPPORTED_SUBTITLE_FORMATS:
-            raise ValueError(f"Unsupported subtitle format: {output_format}")
+    @staticmethod
+    def _tagged_cue_count(tags: Dict) -> Optional[int]:
+        """Cue count from the statistics tags muxers such as mkvmerge write, if present."""
+        for key, value in tags.items():
+            if key.upper().startswith('NUMBER_OF_FRAMES'):
+                try:
+                    return int(value)
+                except (TypeError, ValueError):
+                    return None
+        return None
+    
+    def _extract_native(self, video_path: Path, requests: List[tuple]) -> Dict[int, Path]:
+        """Extract text tracks of a Matroska file with the native reader, without spawning ffmpeg.
         
-        # Create output filename (remove dot for filename)
-        video_name = video_path.stem
-        output_filename = f"{video_name}_subtitle_{subtitle_index}{output_format}"
+        Returns {stream index: output path} for the tracks written; anything
+        the reader cannot handle is left for ffmpeg.
+        """
+        if self.engine != 'auto' or video_path.suffix.lower() not in MATROSKA_SUFFIXES:
+            return {}
+        
+        try:
+            written = extract_text_tracks(video_path, requests)
+        except (MatroskaError, OSError) as e:
+            print(f"  Native Matroska reader unavailable ({e}), using ffmpeg")
+            return {}
         
-        # Output to subtitles directory, not the input directory
-        output_path = self.subtitles_dir / output_filename
+        extracted = {}
+        for index, path in written.items():
+            if path.exists() and path.stat().st_size > 0:
+                print(f"Successfully extracted subtitle: {path.name} (native reader)")
+                extracted[index] = path
+        return extracted
+    
+    def _ffmpeg_outputs(self, stream, jobs: List[ExtractionJob], paths: List[Path]) -> list:
+        """Build one ffmpeg output per job, mapped by absolute stream index."""
+        return [
+            ffmpeg.output(stream[str(job.index)], str(path), **job.ffmpeg_options())
+            for job, path in zip(jobs, paths)
+        ]
+    
+    def _run_ffmpeg(self, stream_spec):
+        """Run an ffmpeg command, counting it as one read of the source."""
+        self.ffmpeg_runs += 1
+        ffmpeg.run(stream_spec, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+    
+    def _extract_with_ffmpeg(self, video_path: Path, jobs: List[ExtractionJob], output_paths: List[Path]) -> List[Path]:
+        """Extract tracks in a single ffmpeg run, one output per track.
         
+        If the combined run fails, each track is extracted on its own so the
+        others still succeed.
+        """
         try:
-            # Extract subtitle using FFmpeg
-            # Use the correct subtitle stream mapping - try different approaches
+            # One output per track; ffmpeg demuxes the source once and feeds every output
             stream = ffmpeg.input(str(video_path))
+            outputs = self._ffmpeg_outputs(stream, jobs, output_paths)
+            self._run_ffmpeg(ffmpeg.merge_outputs(*outputs))
             
-            # First try the direct stream mapping
-            try:
-                output_stream = ffmpeg.output(stream, str(output_path), 
-                                           map=f"0:{subtitle_index}",
-                                           f=output_format.replace('.', ''),  # Remove dot for FFmpeg format
-                                           acodec='none',  # No audio
-                                           vcodec='none')  # No video
-                
-                # Run FFmpeg
-                result = ffmpeg.run(output_stream, overwrite_output=True, quiet=False, capture_stdout=True, capture_stderr=True)
-                
-            except ffmpeg.Error:
-                # If direct mapping fails, try using the subtitle stream mapping
-                print(f"  Retrying with subtitle stream mapping...")
-                output_stream = ffmpeg.output(stream, str(output_path), 
-                                           map=f"0:s:{subtitle_index}",
-                                           f=output_format.replace('.', ''),  # Remove dot for FFmpeg format
-                                           acodec='none',  # No audio
-                                           vcodec='none')  # No video
-                
-                # Run FFmpeg
-                result = ffmpeg.run(output_stream, overwrite_output=True, quiet=False, capture_stdout=True, capture_stderr=True)
-            
-            # Result is already captured from the try/except blocks above
-            
-            if output_path.exists() and output_path.stat().st_size > 0:
-                print(f"Successfully extracted subtitle: {output_filename}")
-                return output_path
-            else:
-                print(f"Failed to extract subtitle: {output_filename}")
-                print(f"FFmpeg output: {result}")
-                return None
-                
         except ffmpeg.Error as e:
+            if len(jobs) > 1:
+                print(f"  Combined extraction failed, extracting tracks one by one...")
+                extracted = []
+                for job, path in zip(jobs, output_paths):
+                    extracted.extend(self._extract_with_ffmpeg(video_path, [job], [path]))
+                return extracted
+            
             print(f"Error extracting subtitle from {video_path}: {e}")
             if hasattr(e, 'stderr'):
                 print(f"FFmpeg stderr: {e.stderr.decode() if e.stderr else 'No stderr'}")
-            return None
+            return []
+        
+        extracted_files = []
+        for path in output_paths:
+            if path.exists() and path.stat().st_size > 0:
+                print(f"Successfully extracted subtitle: {path.name}")
+                extracted_files.append(path)
+            else:
+                print(f"Failed to extract subtitle: {path.name}")
+        
+        return extracted_files
+    
+    def extract_planned(self, video_path: Path, plan: ExtractionPlan) -> List[Path]:
+        """Run an extraction plan, reading the source once.
+        
+        With the "auto" engine, text tracks of Matroska files are read by the
+        native reader, which seeks straight to their blocks. Remaining tracks
+        are extracted in a single ffmpeg run, each mapped by its absolute
+        stream index to its own output.
+        """
+        for line in plan.describe_skipped():
+            print(f"  {line}")
+        
+        paths = [job.output_path(self.subtitles_dir, video_path) for job in plan.jobs]
+        native = self._extract_native(video_path, [(job.index, path) for job, path in zip(plan.jobs, paths) if not job.copy])
+        
+        extracted = [native[job.index] for job in plan.jobs if job.index in native]
+        pending = [(job, path) for job, path in zip(plan.jobs, paths) if job.index not in native]
+        if pending:
+            extracted += self._extract_with_ffmpeg(video_path, [job for job, _ in pending], [path for _, path in pending])
+        return extracted
     
-    def extract_all_subtitles(self, video_path: Path) -> List[Path]:
-        """Extract all available subtitle tracks from a video file."""
+    def extract_subtitles(self, video_path: Path, subtitle_indexes: List[int], output_format: str = 'srt') -> List[Path]:
+        """Extract several subtitle tracks, converted to one format, reading the source once."""
+        # Ensure output_format has a dot prefix for comparison
+        if not output_format.startswith('.'):
+            output_format = '.' + output_format
+            
+        if output_format not in SUPPORTED_SUBTITLE_FORMATS:
+            raise ValueError(f"Unsupported subtitle format: {output_format}")
+        
+        plan = ExtractionPlan()
+        plan.jobs = [ExtractionJob({'index': index}, output_format) for index in subtitle_indexes]
+        return self.extract_planned(video_path, plan)
+    
+    def extract_subtitle(self, video_path: Path, subtitle_index: int, output_format: str = 'srt') -> Optional[Path]:
+        """Extract subtitle track from video file."""
+        extracted = self.extract_subtitles(video_path, [subtitle_index], output_format)
+        return extracted[0] if extracted else None
+    
+    def plan_tracks(self, video_path: Path, output_format: str = None) -> ExtractionPlan:
+        """Classify the file's subtitle tracks and plan how each is extracted."""
         subtitle_tracks = self.list_subtitle_tracks(video_path)
-        extracted_files = []
+        if subtitle_tracks:
+            print(f"Found {len(subtitle_tracks)} subtitle track(s) in {video_path.name}")
+        return plan_extraction(subtitle_tracks, output_format, BITMAP_SUBTITLE_ACTION)
+    
+    def extract_all_subtitles(self, video_path: Path, output_format: Optional[str] = 'srt') -> List[Path]:
+        """Extract all available subtitle tracks from a video file in a single pass.
         
-        if not subtitle_tracks:
+        Text tracks are converted to ``output_format`` (SRT, which translation
+        needs) or keep their native format when it is None; bitmap tracks are
+        stream-copied (native format only) or skipped, never converted.
+        """
+        plan = self.plan_tracks(video_path, output_format)
+        
+        if not plan.jobs:
+            if not plan.skipped:
+                print(f"No subtitle tracks found in {video_path}")
+            else:
+                for line in plan.describe_skipped():
+                    print(f"  {line}")
+            return []
+        
+        for job in plan.jobs:
+            print(f"Extracting track {job.index} ({job.track['language']}): {job.track['title']}")
+        
+        return self.extract_planned(video_path, plan)
+    
+    def extract_and_strip(self, video_path: Path, output_video_path: Path, output_format: Optional[str] = 'srt') -> Dict:
+        """Extract every subtitle track and write a video+audio-only MKV in one read of the source.
+        
+        A single ffmpeg run writes each planned subtitle track to its sidecar
+        file (as ``output_format``, or native with None) and copies the video and audio streams into ``output_video_path``.
+        If that run fails, extraction and stripping fall back to separate runs.
+        When every track is skipped (bitmap tracks), the video is still stripped.
+        
+        Returns a dict with the extracted 'subtitles', the 'skipped' tracks,
+        the stripped 'video' (None on failure or when the file has no subtitle
+        tracks), the number of ffmpeg runs that read the source ('source_reads'),
+        'bytes_read' (the source size times those runs) and 'bytes_written'.
+        """
+        result = {'subtitles': [], 'skipped': [], 'video': None, 'source_reads': 0, 'bytes_read': 0, 'bytes_written': 0}
+        
+        plan = self.plan_tracks(video_path, output_format)
+        result['skipped'] = plan.skipped
+        for line in plan.describe_skipped():
+            print(f"  {line}")
+        
+        if not plan.jobs and not plan.skipped:
             print(f"No subtitle tracks found in {video_path}")
-            return extracted_files
+            return result
         
-        print(f"Found {len(subtitle_tracks)} subtitle track(s) in {video_path.name}")
+        subtitle_paths = [job.output_path(self.subtitles_dir, video_path) for job in plan.jobs]
+        runs_before = self.ffmpeg_runs
         
-        for track in subtitle_tracks:
-            print(f"Extracting track {track['index']} ({track['language']}): {track['title']}")
-            extracted_file = self.extract_subtitle(video_path, track['index'])
-            if extracted_file:
-                extracted_files.append(extracted_file)
+        stream = ffmpeg.input(str(video_path))
+        stripped_output = ffmpeg.output(stream['v'], stream['a?'], str(output_video_path),
+                                        vcodec='copy', acodec='copy', f='matroska')
+        subtitle_outputs = self._ffmpeg_outputs(stream, plan.jobs, subtitle_paths)
         
-        return extracted_files
+        try:
+            self._run_ffmpeg(ffmpeg.merge_outputs(*subtitle_outputs, stripped_output))
+            result['subtitles'] = [path for path in subtitle_paths if path.exists() and path.stat().st_size > 0]
+            for path in result['subtitles']:
+                print(f"Successfully extracted subtitle: {path.name}")
+        except ffmpeg.Error as e:
+            print(f"  Combined extract-and-strip failed, falling back to separate passes...")
+            if plan.jobs:
+                result['subtitles'] = self._extract_with_ffmpeg(video_path, plan.jobs, subtitle_paths)
+            if subtitle_outputs:
+                try:
+                    self._run_ffmpeg(stripped_output)
+                except ffmpeg.Error as strip_error:
+                    print(f"Error creating video without subtitles {video_path}: {strip_error}")
+            else:
+                print(f"Error creating video without subtitles {video_path}: {e}")
+        
+        if output_video_path.exists() and output_video_path.stat().st_size > 0:
+            print(f"Successfully created video without subtitles: {output_video_path.name}")
+            result['video'] = output_video_path
+        
+        result['source_reads'] = self.ffmpeg_runs - runs_before
+        result['bytes_read'] = video_path.stat().st_size * result['source_reads']
+        result['bytes_written'] = sum(
+            path.stat().st_size for path in result['subtitles'] + ([result['video']] if result['video'] else [])
+        )
+        return result
     
     def set_input_directory(self, input_dir: Path):
         """Set the input directory for video processing."""
@@ -0,0 +1,225 @@
+"""
+Compact in-memory model of SRT subtitles, with the project's single SRT parser and writer.
+"""
+import re
+from array import array
+from pathlib import Path
+from typing import List, Optional, Iterable, Iterator, Tuple, TextIO
+
+from modules.charset_detection import read_subtitle_text
+
+# A timing line; hours may exceed two digits and the millisecond separator varies between tools
+_TIMING = re.compile(
+    r'[ \t]*(\d+):(\d\d?):(\d\d?)[,.:](\d{3})[ \t]*-->[ \t]*(\d+):(\d\d?):(\d\d?)[,.:](\d{3})'
+)
+# The same with one- or two-digit milliseconds, written by some tools ("00:00:01,5" is 500 ms)
+_TIMING_SHORT_MS = re.compile(
+    r'[ \t]*(\d+):(\d\d?):(\d\d?)[,.:](\d{1,3})[ \t]*-->[ \t]*(\d+):(\d\d?):(\d\d?)[,.:](\d{1,3})'
+)
+# A cue number left at the end of a cue's text when the blank separator line is missing
+_CUE_NUMBER = re.compile(r'[ \t]*[0-9]+[ \t]*')
+_HTML_TAG = re.compile(r'<[^>]+>')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _match_timing(string: str, pos: int = 0, endpos: int = None) -> Optional[Tuple[str, ...]]:
+    """Fields of a timing line at ``pos`` (milliseconds padded to three digits), or None."""
+    if endpos is None:
+        endpos = len(string)
+    match = _TIMING.match(string, pos, endpos)
+    if match:
+        return match.groups()
+    match = _TIMING_SHORT_MS.match(string, pos, endpos)
+    if match:
+        return tuple(g.ljust(3, '0') if i in (3, 7) else g for i, g in enumerate(match.groups()))
+    return None
+
+
+def _timing_ms(g: Tuple[str, ...]) -> Tuple[int, int]:
+    """Start and end milliseconds of matched timing fields."""
+    return (((int(g[0]) * 60 + int(g[1])) * 60 + int(g[2])) * 1000 + int(g[3]),
+            ((int(g[4]) * 60 + int(g[5])) * 60 + int(g[6])) * 1000 + int(g[7]))
+
+
+def format_timestamp(ms: int) -> str:
+    """Format milliseconds as an SRT timestamp (HH:MM:SS,mmm)."""
+    ms = max(0, ms)
+    seconds, millis = divmod(ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{millis:03d}"
+
+
+def clean_text(text: str) -> str:
+    """Cue text for translation: HTML tags removed and whitespace (including line breaks) collapsed."""
+    return _WHITESPACE.sub(' ', _HTML_TAG.sub('', text)).strip()
+
+
+def format_cue(number: int, start: int, end: int, text: str) -> str:
+    """One SRT cue block, followed by its blank separator line."""
+    return f"{number}\n{format_timestamp(start)} --> {format_timestamp(end)}\n{text}\n\n"
+
+
+def _iter_lines(content: str) -> Iterator[str]:
+    """Lines of a string split on LF only, without building a list of them all."""
+    begin = 0
+    end = content.find('\n')
+    while end != -1:
+        yield content[begin:end]
+        begin = end + 1
+        end = content.find('\n', begin)
+    yield content[begin:]
+
+
+def iter_srt_cues(lines: Iterable[str]) -> Iterator[Tuple[int, int, str]]:
+    """Lazily parse SRT lines (e.g. an open file) into (start_ms, end_ms, text) tuples.
+
+    The project's one SRT tokenizer: ``SubtitleDocument.parse`` runs on it
+    too, so streamed and whole-file reads cannot disagree. A blank or
+    whitespace-only line ends a cue. Only the cue being read is held, so
+    memory does not grow with the file.
+    """
+    timing = None
+    text_lines: List[str] = []
+    first = True
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if first:
+            line = line.lstrip('\ufeff')
+            first = False
+
+        groups = _match_timing(line) if '-->' in line else None
+        if groups:
+            if timing:
+                # No blank line before this cue: its number ended up in the previous text
+                if text_lines and _CUE_NUMBER.fullmatch(text_lines[-1]):
+                    text_lines.pop()
+                yield timing[0], timing[1], '\n'.join(text_lines).strip()
+            timing = _timing_ms(groups)
+            text_lines = []
+        elif not line.strip():
+            if timing:
+                yield timing[0], timing[1], '\n'.join(text_lines).strip()
+                timing = None
+        elif timing:
+            text_lines.append(line)
+
+    if timing:
+        yield timing[0], timing[1], '\n'.join(text_lines).strip()
+
+
+class SrtWriter:
+    """Writes cues to an open text file as they arrive, numbering them from 1."""
+
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.count = 0
+
+    def write(self, start: int, end: int, text: str):
+        """Append one cue."""
+        self.count += 1
+        self.f.write(format_cue(self.count, start, end, text))
+
+    def write_all(self, cues: Iterable[Tuple[int, int, str]]):
+        """Append several cues and flush them to disk."""
+        for start, end, text in cues:
+            self.write(start, end, text)
+        self.f.flush()
+
+
+class SubtitleDocument:
+    """SRT cues held as parallel arrays instead of one dict per cue.
+
+    Start and end times are integer milliseconds in ``array('q')``; each
+    cue's text is a (begin, end) slice of a single ``source`` string, so a
+    10k-cue file costs a few arrays and one buffer. Cue numbers are not
+    stored: the writer renumbers from 1, which also repairs malformed
+    numbering.
+
+    The model trades speed for memory: parsing converts every timestamp to
+    integers, so it is slower than a parser that keeps timing lines as text
+    (see tools/benchmark_subtitle_model.py) while holding much less per cue.
+    """
+
+    __slots__ = ('source', 'starts', 'ends', 'spans')
+
+    def __init__(self):
+        self.source = ''
+        self.starts = array('q')
+        self.ends = array('q')
+        self.spans = array('q')  # begin, end offsets into source, two per cue
+
+    @classmethod
+    def parse(cls, content: str) -> 'SubtitleDocument':
+        """Parse SRT text with the same tokenizer as ``iter_srt_cues``.
+
+        Handles a UTF-8 BOM, CRLF or CR line endings, missing or wrong cue
+        numbers and a missing blank line between cues. Text before the first
+        timing line is ignored; multi-line cue text is kept with its line breaks.
+        """
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return cls.from_cues(iter_srt_cues(_iter_lines(content)))
+
+    @classmethod
+    def load(cls, path: Path, encoding: str = None) -> 'SubtitleDocument':
+        """Read and parse an SRT file, detecting its encoding unless one is given."""
+        if encoding is None:
+            return cls.parse(read_subtitle_text(path))
+        with open(path, 'r', encoding=encoding, newline='') as f:
+            return cls.parse(f.read())
+
+    @classmethod
+    def from_cues(cls, cues: Iterable[Tuple[int, int, str]]) -> 'SubtitleDocument':
+        """Build a document from (start_ms, end_ms, text) tuples."""
+        document = cls()
+        parts = []
+        offset = 0
+        for start, end, text in cues:
+            document.starts.append(start)
+            document.ends.append(end)
+            document.spans.append(offset)
+            offset += len(text)
+            document.spans.append(offset)
+            parts.append(text)
+        document.source = ''.join(parts)
+        return document
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def text(self, index: int) -> str:
+        """Text of one cue."""
+        return self.source[self.spans[2 * index]:self.spans[2 * index + 1]]
+
+    def texts(self) -> List[str]:
+        """Texts of every cue, in order."""
+        source, spans = self.source, self.spans
+        return [source[spans[i]:spans[i + 1]] for i in range(0, len(spans), 2)]
+
+    def with_texts(self, texts: List[Optional[str]]) -> 'SubtitleDocument':
+        """Copy of the document with new cue texts; None keeps a cue's original text."""
+        if len(texts) != len(self):
+            raise ValueError(f"Expected {len(self)} texts, got {len(texts)}")
+        return SubtitleDocument.from_cues(
+            (self.starts[i], self.ends[i], text if text is not None else self.text(i))
+            for i, text in enumerate(texts)
+        )
+
+    def cues(self) -> Iterator[Tuple[int, int, str]]:
+        """Iterate over (start_ms, end_ms, text) tuples."""
+        return zip(self.starts, self.ends, self.texts())
+
+    def timing_line(self, index: int) -> str:
+        """SRT timing line of one cue."""
+        return f"{format_timestamp(self.starts[index])} --> {format_timestamp(self.ends[index])}"
+
+    def to_srt(self) -> str:
+        """Serialize as SRT with cues numbered from 1."""
+        return ''.join(format_cue(number, start, end, text)
+                       for number, (start, end, text) in enumerate(self.cues(), 1))
+
+    def save(self, path: Path, encoding: str = 'utf-8'):
+        """Write the document as an SRT file."""
+        with open(path, 'w', encoding=encoding, newline='') as f:
+            f.write(self.to_srt())
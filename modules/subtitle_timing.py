@@ -0,0 +1,202 @@
+"""
+Vectorized subtitle timing fixes: shift, framerate conversion, duration limits, overlaps and gaps.
+"""
+from fractions import Fraction
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from config import (MIN_SUBTITLE_DURATION, MAX_SUBTITLE_DURATION, SUBTITLE_TIMING_ENABLED,
+                    SUBTITLE_CLOSE_GAPS_MS)
+from modules.subtitle_model import SubtitleDocument
+
+# Optional: numpy runs every operation over the whole file at once; without it the timing stage is skipped
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Rounded NTSC rates and the exact ratios they stand for
+_NTSC_RATES = {
+    '23.976': Fraction(24000, 1001),
+    '23.98': Fraction(24000, 1001),
+    '29.97': Fraction(30000, 1001),
+    '59.94': Fraction(60000, 1001),
+}
+
+
+def parse_fps(value: Union[str, float]) -> Fraction:
+    """Frame rate from "25", "23.976" or "24000/1001"; rounded NTSC rates map to their exact ratio."""
+    text = str(value).strip()
+    fps = _NTSC_RATES.get(text) or Fraction(text)
+    if fps <= 0:
+        raise ValueError(f"Invalid frame rate: {value}")
+    return fps
+
+
+class CueTimings:
+    """Start and end times of every cue as int64 millisecond arrays.
+
+    Each operation is a handful of NumPy calls over the whole file, so even
+    100k-cue files are retimed in milliseconds. ``order`` tracks which
+    original cue each row holds once cues are sorted or dropped, so texts
+    never have to be copied. Counters of what changed are kept in ``stats``.
+    """
+
+    def __init__(self, starts, ends):
+        if np is None:
+            raise ImportError("numpy is required for subtitle timing adjustments")
+        self.starts = np.array(starts, dtype=np.int64)
+        self.ends = np.array(ends, dtype=np.int64)
+        self.order = np.arange(len(self.starts))
+        self.stats: Dict[str, int] = {}
+
+    @classmethod
+    def from_document(cls, document: SubtitleDocument) -> 'CueTimings':
+        """Wrap a document's timing arrays (copied once, without a per-cue loop)."""
+        return cls(np.frombuffer(document.starts, dtype=np.int64), np.frombuffer(document.ends, dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _count(self, name: str, value):
+        self.stats[name] = self.stats.get(name, 0) + int(value)
+
+    def _keep(self, mask):
+        """Drop the cues where ``mask`` is False."""
+        self._count('dropped', len(mask) - np.count_nonzero(mask))
+        self.starts, self.ends, self.order = self.starts[mask], self.ends[mask], self.order[mask]
+
+    def shift(self, offset_ms: int) -> 'CueTimings':
+        """Move every cue by ``offset_ms``; cues pushed entirely before zero are dropped."""
+        if offset_ms:
+            self.starts += offset_ms
+            self.ends += offset_ms
+            self._keep(self.ends > 0)
+            np.maximum(self.starts, 0, out=self.starts)
+            self._count('shifted', len(self))
+        return self
+
+    def convert_framerate(self, source_fps: Union[str, float], target_fps: Union[str, float]) -> 'CueTimings':
+        """Rescale times for a video played at another frame rate (e.g. 23.976 → 25 for PAL speed-up)."""
+        factor = parse_fps(source_fps) / parse_fps(target_fps)
+        if factor != 1:
+            self.starts = np.rint(self.starts * float(factor)).astype(np.int64)
+            self.ends = np.rint(self.ends * float(factor)).astype(np.int64)
+            self._count('rescaled', len(self))
+        return self
+
+    def sort(self) -> 'CueTimings':
+        """Order cues by start time, keeping the original order of cues that start together."""
+        if len(self) > 1 and np.any(self.starts[1:] < self.starts[:-1]):
+            order = np.argsort(self.starts, kind='stable')
+            self.starts, self.ends, self.order = self.starts[order], self.ends[order], self.order[order]
+            self._count('reordered', np.count_nonzero(order != np.arange(len(order))))
+        return self
+
+    def clamp_durations(self, min_ms: int, max_ms: int) -> 'CueTimings':
+        """Lengthen cues shorter than ``min_ms`` and shorten those longer than ``max_ms``."""
+        durations = self.ends - self.starts
+        self._count('lengthened', np.count_nonzero(durations < min_ms))
+        self._count('shortened', np.count_nonzero(durations > max_ms))
+        self.ends = self.starts + np.clip(durations, min_ms, max_ms)
+        return self
+
+    def resolve_overlaps(self, min_ms: int = 0) -> 'CueTimings':
+        """End each cue no later than the next one starts (cues must be sorted).
+        
+        Cues starting together (two speakers, stacked lines) are meant to be
+        on screen at once and are left alone, and no cue is trimmed below
+        ``min_ms``: it ends at the next start or at its minimum, whichever is later.
+        """
+        if len(self) > 1:
+            trimmed = np.maximum(self.starts[1:], self.starts[:-1] + min_ms)
+            overlapping = (self.starts[1:] > self.starts[:-1]) & (self.ends[:-1] > trimmed)
+            self._count('overlaps_resolved', np.count_nonzero(overlapping))
+            self.ends[:-1] = np.where(overlapping, trimmed, self.ends[:-1])
+        return self
+
+    def close_gaps(self, max_gap_ms: int, max_ms: int) -> 'CueTimings':
+        """Extend cues up to the next start when the gap is at most ``max_gap_ms``, within ``max_ms``."""
+        if len(self) > 1 and max_gap_ms > 0:
+            gaps = self.starts[1:] - self.ends[:-1]
+            closing = (gaps > 0) & (gaps <= max_gap_ms)
+            extended = np.minimum(self.starts[1:], self.starts[:-1] + max_ms)
+            self._count('gaps_closed', np.count_nonzero(closing & (extended > self.ends[:-1])))
+            self.ends[:-1] = np.where(closing, np.maximum(extended, self.ends[:-1]), self.ends[:-1])
+        return self
+
+    def normalize(self, min_ms: int, max_ms: int, max_gap_ms: int) -> 'CueTimings':
+        """Sort, clamp durations, resolve overlaps then close small gaps.
+
+        Overlaps are resolved after clamping, so a cue lengthened into the
+        next one is trimmed back, but never below ``min_ms``.
+        """
+        return self.sort().clamp_durations(min_ms, max_ms).resolve_overlaps(min_ms).close_gaps(max_gap_ms, max_ms)
+
+    def to_document(self, document: SubtitleDocument) -> SubtitleDocument:
+        """The document with these timings, sharing its text buffer."""
+        result = SubtitleDocument()
+        result.source = document.source
+        result.starts.frombytes(self.starts.tobytes())
+        result.ends.frombytes(self.ends.tobytes())
+        spans = np.frombuffer(document.spans, dtype=np.int64).reshape(-1, 2)[self.order]
+        result.spans.frombytes(np.ascontiguousarray(spans).tobytes())
+        return result
+
+
+class TimingAdjuster:
+    """Optional stage applied to translated subtitle files.
+
+    Applies a shift and a framerate conversion when requested, then (when
+    ``normalize`` is set) enforces ``MIN_SUBTITLE_DURATION`` and
+    ``MAX_SUBTITLE_DURATION``, resolves overlaps and closes small gaps.
+    """
+
+    def __init__(self, shift_ms: int = 0, source_fps: Union[str, float] = None,
+                 target_fps: Union[str, float] = None, normalize: bool = SUBTITLE_TIMING_ENABLED):
+        if (source_fps is None) != (target_fps is None):
+            raise ValueError("Framerate conversion needs both a source and a target frame rate")
+        if source_fps is not None:
+            parse_fps(source_fps)
+            parse_fps(target_fps)
+        self.shift_ms = shift_ms or 0
+        self.source_fps = source_fps
+        self.target_fps = target_fps
+        self.normalize = normalize
+        self.min_ms = int(round(MIN_SUBTITLE_DURATION * 1000))
+        self.max_ms = int(round(MAX_SUBTITLE_DURATION * 1000))
+        self.max_gap_ms = SUBTITLE_CLOSE_GAPS_MS
+        self.last_stats: Dict[str, int] = {}
+
+    @property
+    def active(self) -> bool:
+        """Whether the stage has anything to do."""
+        return bool(self.shift_ms or self.source_fps or self.normalize)
+
+    def adjust_document(self, document: SubtitleDocument) -> SubtitleDocument:
+        """Return the document with adjusted timings; ``last_stats`` says what changed."""
+        timings = CueTimings.from_document(document)
+        if self.source_fps is not None:
+            timings.convert_framerate(self.source_fps, self.target_fps)
+        timings.shift(self.shift_ms)
+        if self.normalize:
+            timings.normalize(self.min_ms, self.max_ms, self.max_gap_ms)
+        self.last_stats = timings.stats
+        return timings.to_document(document)
+
+    def adjust_file(self, subtitle_path: Path) -> Optional[Dict[str, int]]:
+        """Adjust an SRT file in place; returns the change counters, or None when the stage is skipped."""
+        if not self.active:
+            return None
+        if np is None:
+            print("! SubtitleTiming: numpy not installed, timing adjustments skipped")
+            return None
+
+        document = SubtitleDocument.load(subtitle_path)
+        adjusted = self.adjust_document(document)
+        changed = {name: count for name, count in self.last_stats.items() if count}
+        if changed:
+            adjusted.save(subtitle_path)
+            print(f"  ⏱️ Timing adjusted in {Path(subtitle_path).name}: "
+                  + ", ".join(f"{count} {name.replace('_', ' ')}" for name, count in changed.items()))
+        return changed
@@ -0,0 +1,215 @@
+"""
+Scoring and selection of the subtitle track to translate.
+"""
+import re
+from pathlib import Path
+from typing import List, Dict, Optional, Any, Tuple
+
+from modules.charset_detection import read_subtitle_text
+from modules.extraction_planner import classify_codec
+from modules.language_id import detect_subtitle_language
+from modules.subtitle_model import SubtitleDocument
+
+# ISO 639-1 codes used in the UI and the tags containers use for them (ISO 639-2/B, 639-2/T)
+LANGUAGE_TAGS = {
+    'en': {'en', 'eng'},
+    'fr': {'fr', 'fre', 'fra'},
+    'es': {'es', 'spa'},
+    'de': {'de', 'ger', 'deu'},
+    'it': {'it', 'ita'},
+    'pt': {'pt', 'por'},
+    'ru': {'ru', 'rus'},
+    'ja': {'ja', 'jpn'},
+    'ko': {'ko', 'kor'},
+    'zh': {'zh', 'chi', 'zho', 'cmn', 'yue'},
+    'ar': {'ar', 'ara'},
+}
+
+# ISO 639-2/B code written to containers for each ISO 639-1 code (the form Matroska and ffmpeg expect)
+CONTAINER_LANGUAGE_TAGS = {
+    'en': 'eng',
+    'fr': 'fre',
+    'es': 'spa',
+    'de': 'ger',
+    'it': 'ita',
+    'pt': 'por',
+    'ru': 'rus',
+    'ja': 'jpn',
+    'ko': 'kor',
+    'zh': 'chi',
+    'ar': 'ara',
+}
+
+UNKNOWN_LANGUAGE_TAGS = {'', 'und', 'unknown', 'mis', 'mul', 'zxx'}
+
+_FORCED_TITLE = re.compile(r'\b(forced|foreign|signs?)\b', re.IGNORECASE)
+_SDH_TITLE = re.compile(r'\b(sdh|cc|hearing[ -]impaired|hi)\b', re.IGNORECASE)
+_SUBTITLE_INDEX = re.compile(r'_subtitle_(\d+)$')
+
+TRACK_MODES = ['auto', 'first']
+
+
+def language_matches(tag: Optional[str], language: str) -> bool:
+    """Whether a container language tag (e.g. 'eng', 'en-US') denotes an ISO 639-1 language."""
+    primary = (tag or '').lower().split('-')[0]
+    return primary in LANGUAGE_TAGS.get(language, {language})
+
+
+def container_language_tag(language: Optional[str]) -> Optional[str]:
+    """ISO 639-2/B tag to write in a container for a language code; unknown codes pass through."""
+    if not language:
+        return None
+    return CONTAINER_LANGUAGE_TAGS.get(language.lower(), language)
+
+
+def count_cues(subtitle_path: Path) -> int:
+    """Count the cues of an extracted subtitle file."""
+    try:
+        content = read_subtitle_text(subtitle_path)
+    except OSError:
+        return 0
+    if subtitle_path.suffix.lower() in ('.ass', '.ssa'):
+        return content.count('\nDialogue:')
+    return len(SubtitleDocument.parse(content))
+
+
+def subtitle_index_from_path(subtitle_path: Path) -> Optional[int]:
+    """Stream index encoded in an extracted file name ({video}_subtitle_{index}.ext)."""
+    match = _SUBTITLE_INDEX.search(subtitle_path.stem)
+    return int(match.group(1)) if match else None
+
+
+class TrackSelector:
+    """Scores subtitle tracks so only the best one is sent to translation.
+
+    A track scores higher when its language tag matches the source language,
+    when it is a full (not forced/signs-only) track, when its codec is text
+    and when it has more cues. Bitmap tracks can never be translated and are
+    never selected.
+    """
+
+    def __init__(self, source_language: str = 'en'):
+        self.source_language = source_language
+
+    def score(self, track: Dict[str, Any]) -> Tuple[float, List[str]]:
+        """Return the track's score and the reasons behind it."""
+        score = 0.0
+        reasons = []
+
+        language = track.get('language', 'unknown')
+        if track.get('language_detected'):
+            language = f"{language} (detected)"
+        if language_matches(track.get('language'), self.source_language):
+            score += 100
+            reasons.append(f"language {language} matches {self.source_language}")
+        elif (track.get('language') or '').lower() in UNKNOWN_LANGUAGE_TAGS:
+            score += 20
+            reasons.append("language unknown")
+        else:
+            reasons.append(f"language {language} is not {self.source_language}")
+
+        title = track.get('title', '') or ''
+        if track.get('forced') or _FORCED_TITLE.search(title):
+            score -= 60
+            reasons.append("forced/signs only")
+        if track.get('hearing_impaired') or _SDH_TITLE.search(title):
+            score -= 10
+            reasons.append("SDH (sound descriptions)")
+
+        codec_name = track.get('codec_name')
+        kind = classify_codec(codec_name)
+        if kind == 'bitmap':
+            score -= 1000
+            reasons.append(f"bitmap codec {codec_name}")
+        elif codec_name == 'subrip':
+            score += 30
+        elif kind == 'text':
+            score += 20
+        else:
+            reasons.append(f"unrecognized codec {codec_name}")
+
+        cue_count = track.get('cue_count')
+        if cue_count:
+            score += min(cue_count / 50, 20)
+            reasons.append(f"{cue_count} cues")
+
+        if track.get('default'):
+            score += 5
+            reasons.append("default track")
+
+        return score, reasons
+
+    def rank(self, tracks: List[Dict[str, Any]]) -> List[Tuple[float, Dict[str, Any], List[str]]]:
+        """Return (score, track, reasons) for every track, best first; ties keep track order."""
+        scored = [(*self.score(track), position, track) for position, track in enumerate(tracks)]
+        scored.sort(key=lambda item: (-item[0], item[2]))
+        return [(score, track, reasons) for score, reasons, _, track in scored]
+
+    def select(self, tracks: List[Dict[str, Any]], mode: str = 'auto') -> Optional[Dict[str, Any]]:
+        """Pick the track to translate.
+
+        ``mode`` is "auto" (highest score), "first" (first text track) or a
+        stream index. Returns None when no track can be translated.
+        """
+        translatable = [track for track in tracks if classify_codec(track.get('codec_name')) != 'bitmap']
+        if not translatable:
+            return None
+
+        mode = str(mode or 'auto').strip().lower()
+        if mode == 'first':
+            return translatable[0]
+        if mode.isdigit():
+            for track in translatable:
+                if track.get('index') == int(mode):
+                    return track
+            print(f"[WARNING] Subtitle track {mode} not found, selecting automatically")
+
+        return self.rank(translatable)[0][1]
+
+    def select_file(self, tracks: List[Dict[str, Any]], subtitle_paths: List[Path],
+                    mode: str = 'auto') -> Optional[Path]:
+        """Pick one of the extracted subtitle files of a video.
+
+        Each file is matched to its probed track through the stream index in
+        its name; the cue count is read from the file when the container did
+        not record it, and the language is identified from the text when the
+        track is untagged. Files that match no probed track are scored from
+        their extension and text alone.
+        """
+        tracks_by_index = {track.get('index'): track for track in tracks}
+        candidates = []
+        for path in subtitle_paths:
+            index = subtitle_index_from_path(path)
+            track = dict(tracks_by_index.get(index) or {
+                'index': index,
+                'language': 'unknown',
+                'title': '',
+                'codec_name': 'subrip' if path.suffix.lower() == '.srt' else path.suffix.lower().lstrip('.')
+            })
+            if not track.get('cue_count'):
+                track['cue_count'] = count_cues(path)
+            if (track.get('language') or '').lower() in UNKNOWN_LANGUAGE_TAGS:
+                detected = detect_subtitle_language(path)
+                if detected:
+                    track['language'] = detected
+                    track['language_detected'] = True
+            track['path'] = path
+            candidates.append(track)
+
+        if not candidates:
+            return None
+
+        if len(candidates) > 1:
+            for line in self.describe(candidates):
+                print(f"  🎯 {line}")
+
+        chosen = self.select(candidates, mode)
+        return chosen['path'] if chosen else None
+
+    def describe(self, tracks: List[Dict[str, Any]]) -> List[str]:
+        """Human-readable ranking for logs."""
+        return [
+            f"track {track.get('index')} ({track.get('language')}, {track.get('codec_name')}): "
+            f"score {score:.0f} - {', '.join(reasons) or 'no signals'}"
+            for score, track, reasons in self.rank(tracks)
+        ]
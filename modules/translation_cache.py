@@ -0,0 +1,201 @@
+"""
+Persistent translation memory backed by SQLite.
+"""
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import List, Dict, Optional, Any, Iterable, Tuple
+
+
+class TranslationCache:
+    """Disk-backed translation memory keyed by (source lang, target lang, normalized text).
+
+    The database runs in WAL mode with a busy timeout so several worker
+    processes can read and write it at once. Entries unused for longer than
+    ``max_age_days`` are evicted, and the least recently used entries are
+    dropped once the table grows past ``max_entries``.
+    """
+
+    # SQLite limits the number of bound parameters per statement
+    _QUERY_CHUNK = 500
+
+    # Evict after this many new entries have been written
+    _EVICT_INTERVAL = 1000
+
+    _WHITESPACE = re.compile(r'\s+')
+
+    def __init__(self, db_path: Path, max_entries: int = 200000, max_age_days: float = 180):
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+        self._writes_since_evict = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._create_schema()
+        self.evict()
+
+    @classmethod
+    def normalize_text(cls, text: str) -> str:
+        """Normalize text for use as a cache key."""
+        return cls._WHITESPACE.sub(' ', unicodedata.normalize('NFC', text or '')).strip()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get the connection owned by the calling thread."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(str(self.db_path), timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _create_schema(self):
+        """Create the translation table if it does not exist."""
+        connection = self._connect()
+        with connection:
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS translations (
+                    source_lang TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    source_text TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (source_lang, target_lang, source_text)
+                ) WITHOUT ROWID
+            ''')
+            connection.execute('CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations (last_used)')
+
+    def get_many(self, source_lang: str, target_lang: str, texts: Iterable[str]) -> Dict[str, str]:
+        """Look up several texts, returning {normalized text: translation} for the hits."""
+        keys = list(dict.fromkeys(self.normalize_text(text) for text in texts))
+        found: Dict[str, str] = {}
+        if not keys:
+            return found
+
+        connection = self._connect()
+        try:
+            for i in range(0, len(keys), self._QUERY_CHUNK):
+                chunk = keys[i:i + self._QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = connection.execute(
+                    f'SELECT source_text, translation FROM translations '
+                    f'WHERE source_lang = ? AND target_lang = ? AND source_text IN ({placeholders})',
+                    [source_lang, target_lang, *chunk]
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                now = time.time()
+                with connection:
+                    connection.executemany(
+                        'UPDATE translations SET last_used = ? '
+                        'WHERE source_lang = ? AND target_lang = ? AND source_text = ?',
+                        [(now, source_lang, target_lang, key) for key in found]
+                    )
+        except sqlite3.Error as e:
+            print(f"[WARNING] Translation memory lookup failed: {e}")
+
+        with self._stats_lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, source_lang: str, target_lang: str, text: str) -> Optional[str]:
+        """Look up a single text."""
+        return self.get_many(source_lang, target_lang, [text]).get(self.normalize_text(text))
+
+    def put_many(self, source_lang: str, target_lang: str, pairs: Iterable[Tuple[str, str]]):
+        """Store (source text, translation) pairs."""
+        now = time.time()
+        rows = [
+            (source_lang, target_lang, self.normalize_text(text), translation, now, now)
+            for text, translation in pairs
+            if text and translation
+        ]
+        if not rows:
+            return
+
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany(
+                    'INSERT INTO translations '
+                    '(source_lang, target_lang, source_text, translation, created_at, last_used) '
+                    'VALUES (?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (source_lang, target_lang, source_text) '
+                    'DO UPDATE SET translation = excluded.translation, last_used = excluded.last_used',
+                    rows
+                )
+        except sqlite3.Error as e:
+            print(f"[WARNING] Translation memory write failed: {e}")
+            return
+
+        with self._stats_lock:
+            self._writes_since_evict += len(rows)
+            should_evict = self._writes_since_evict >= self._EVICT_INTERVAL
+            if should_evict:
+                self._writes_since_evict = 0
+        if should_evict:
+            self.evict()
+
+    def put(self, source_lang: str, target_lang: str, text: str, translation: str):
+        """Store a single translation."""
+        self.put_many(source_lang, target_lang, [(text, translation)])
+
+    def evict(self) -> int:
+        """Remove expired entries and trim the table to max_entries. Returns rows removed."""
+        connection = self._connect()
+        removed = 0
+        try:
+            with connection:
+                if self.max_age_days and self.max_age_days > 0:
+                    cutoff = time.time() - self.max_age_days * 86400
+                    removed += connection.execute(
+                        'DELETE FROM translations WHERE last_used < ?', (cutoff,)
+                    ).rowcount
+
+                if self.max_entries and self.max_entries > 0:
+                    count = connection.execute('SELECT COUNT(*) FROM translations').fetchone()[0]
+                    excess = count - self.max_entries
+                    if excess > 0:
+                        removed += connection.execute(
+                            'DELETE FROM translations WHERE (source_lang, target_lang, source_text) IN ('
+                            'SELECT source_lang, target_lang, source_text FROM translations '
+                            'ORDER BY last_used LIMIT ?)', (excess,)
+                        ).rowcount
+        except sqlite3.Error as e:
+            print(f"[WARNING] Translation memory eviction failed: {e}")
+        return removed
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        connection = self._connect()
+        with connection:
+            connection.execute('DELETE FROM translations')
+        with self._stats_lock:
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for this process and the number of stored entries."""
+        try:
+            entries = self._connect().execute('SELECT COUNT(*) FROM translations').fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+
+        lookups = self.hits + self.misses
+        return {
+            'path': str(self.db_path),
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,162 @@
+"""
+Concurrent translation engine for the LARA MCP client.
+"""
+import asyncio
+import threading
+import time
+from typing import List, Dict, Optional, Callable
+
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by threads and event loops.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    A rate of zero or less disables limiting. One bucket is meant to live as
+    long as the client it limits, so consecutive calls share the budget.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """Add the tokens accumulated since the last update."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def take(self, amount: float = 1) -> float:
+        """Block until ``amount`` tokens are available and consume them; returns the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+
+        # Requests larger than the bucket are allowed through once it is full
+        amount = min(amount, self.capacity)
+
+        started = time.monotonic()
+        # Waiters are served one at a time: the lock is held while sleeping
+        with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                time.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+        return time.monotonic() - started
+
+    async def acquire(self, amount: float = 1):
+        """Wait, without blocking the event loop, until ``amount`` tokens are available and consume them."""
+        if self.rate > 0:
+            await asyncio.to_thread(self.take, amount)
+
+
+def take_batch(texts: List[str], start: int, max_cues: int, max_chars: int) -> int:
+    """Return the end index of the batch beginning at ``start``.
+
+    A batch is closed when adding the next text would exceed either the cue
+    budget or the character budget. A single text longer than the character
+    budget is sent on its own.
+    """
+    end = start
+    chars = 0
+    while end < len(texts) and end - start < max_cues:
+        text_chars = len(texts[end] or "")
+        if end > start and chars + text_chars > max_chars:
+            break
+        chars += text_chars
+        end += 1
+    return end
+
+
+class AsyncTranslationEngine:
+    """Runs translate requests concurrently with a bounded number in flight.
+
+    Workers pull the next batch from the input texts only when a slot is free,
+    so the batch size and concurrency limit are read at dispatch time: the
+    ``batch_size_fn`` and ``concurrency_fn`` callables (e.g. an adaptive
+    controller) may change them while the run is in progress. Each batch is
+    sent through ``translate_fn`` (a blocking callable, run in a worker thread).
+    Results are returned in input order regardless of completion order.
+
+    ``requests_per_second`` and ``chars_per_second`` only limit what this
+    engine dispatches. ``MCPClient.create_engine`` leaves them at zero: the
+    client draws every translate request, whichever path sends it, from its
+    own buckets inside ``translate_fn``.
+    """
+
+    def __init__(self, translate_fn: Callable[[List[str], str, str], List[Optional[str]]],
+                 max_concurrency: int = 4, requests_per_second: float = 0,
+                 chars_per_second: float = 0, max_batch_chars: int = 4000,
+                 batch_size_fn: Callable[[], int] = None, concurrency_fn: Callable[[], int] = None):
+        self.translate_fn = translate_fn
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_second = requests_per_second
+        self.chars_per_second = chars_per_second
+        self.request_bucket = TokenBucket(requests_per_second)
+        self.char_bucket = TokenBucket(chars_per_second)
+        self.max_batch_chars = max(1, max_batch_chars)
+        self.batch_size_fn = batch_size_fn or (lambda: 50)
+        self.concurrency_fn = concurrency_fn or (lambda: self.max_concurrency)
+
+    async def translate_texts_async(self, texts: List[str], source_lang: str, target_lang: str,
+                                    on_batch_done: Callable[[int, int], None] = None) -> List[Optional[str]]:
+        """Translate texts in dynamically sized batches, preserving input order.
+
+        ``on_batch_done`` receives the number of texts completed so far and the total.
+        """
+        results: List[Optional[str]] = [None] * len(texts)
+        request_bucket, char_bucket = self.request_bucket, self.char_bucket
+        condition = asyncio.Condition()
+        cursor = 0
+        in_flight = 0
+        completed = 0
+
+        def can_dispatch() -> bool:
+            limit = min(max(1, self.concurrency_fn()), self.max_concurrency)
+            return cursor >= len(texts) or in_flight < limit
+
+        async def worker():
+            nonlocal cursor, in_flight, completed
+            while True:
+                async with condition:
+                    await condition.wait_for(can_dispatch)
+                    if cursor >= len(texts):
+                        return
+                    start = cursor
+                    cursor = take_batch(texts, start, max(1, self.batch_size_fn()), self.max_batch_chars)
+                    batch = texts[start:cursor]
+                    in_flight += 1
+
+                try:
+                    await request_bucket.acquire(1)
+                    await char_bucket.acquire(sum(len(text or "") for text in batch))
+                    translations = await asyncio.to_thread(self.translate_fn, batch, source_lang, target_lang)
+                    results[start:start + len(batch)] = translations
+                finally:
+                    async with condition:
+                        in_flight -= 1
+                        completed += len(batch)
+                        condition.notify_all()
+
+                if on_batch_done:
+                    on_batch_done(completed, len(texts))
+
+        await asyncio.gather(*(worker() for _ in range(self.max_concurrency)))
+        return results
+
+    def translate_texts(self, texts: List[str], source_lang: str, target_lang: str,
+                        on_batch_done: Callable[[int, int], None] = None) -> List[Optional[str]]:
+        """Blocking wrapper around translate_texts_async for synchronous callers."""
+        return asyncio.run(self.translate_texts_async(texts, source_lang, target_lang, on_batch_done))
+
+    def get_status(self) -> Dict[str, float]:
+        """Get the engine limits."""
+        return {
+            'max_concurrency': self.max_concurrency,
+            'concurrency': self.concurrency_fn(),
+            'batch_size': self.batch_size_fn(),
+            'requests_per_second': self.requests_per_second,
+            'chars_per_second': self.chars_per_second
+        }
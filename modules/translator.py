@@ -7,7 +7,12 @@ import time
 from pathlib import Path
 from typing import List, Dict, Optional
 import requests
-from config import MCP_SERVER_URL, SOURCE_LANGUAGE, TARGET_LANGUAGE
+from config import MCP_SERVER_URL, SOURCE_LANGUAGE, TARGET_LANGUAGE, CUE_CLASSIFIER_ENABLED, PLACEHOLDER_MASKING_ENABLED
+from modules.cue_dedup import CueDeduplicator
+from modules.cue_classifier import CueClassifier, PlaceholderMasker, CAPITALIZED_NOUN_LANGUAGES
+from modules.subtitle_model import SubtitleDocument, clean_text
+from modules.encoding_repair import repair_text
+from modules.charset_detection import read_subtitle_text
 
 
 class LARATranslator:
@@ -19,6 +24,12 @@ class LARATranslator:
         self.access_key_secret = access_key_secret or os.getenv("LARA_ACCESS_KEY_SECRET")
         self.session = requests.Session()
         
+        # Deduplication counters of the most recently translated file
+        self.last_dedup_stats = {}
+        
+        # Pass-through and masking counters of the most recently translated file
+        self.last_classifier_stats = {}
+        
         # Validate credentials and set up session
         self._setup_credentials()
     
@@ -130,8 +141,8 @@ class LARATranslator:
             if response.status_code == 200:
                 result = response.json()
                 translated_text = result.get('translated_text', text)
-                # Apply encoding fix for French characters
-                fixed_translated_text = self._fix_french_encoding(translated_text)
+                # Repair UTF-8 text the server or transport decoded as Latin-1
+                fixed_translated_text = repair_text(translated_text)
                 print(f"✅ Translation successful: '{text}' → '{fixed_translated_text}'")
                 return fixed_translated_text
             else:
@@ -186,39 +197,62 @@ class LARATranslator:
             print(f"Subtitle file not found: {subtitle_path}")
             return None
         
-        # Read subtitle file
+        # Read subtitle file once, in its detected encoding
         try:
-            with open(subtitle_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            # Try different encodings
-            for encoding in ['latin-1', 'cp1252', 'iso-8859-1']:
-                try:
-                    with open(subtitle_path, 'r', encoding=encoding) as f:
-                        content = f.read()
-                    break
-                except UnicodeDecodeError:
-                    continue
-            else:
-                print(f"Could not read subtitle file with any encoding: {subtitle_path}")
-                return None
+            content = read_subtitle_text(subtitle_path)
+        except OSError as e:
+            print(f"Could not read subtitle file {subtitle_path}: {e}")
+            return None
         
         # Parse SRT format and extract text
-        subtitle_blocks = self._parse_srt(content)
-        if not subtitle_blocks:
+        document = SubtitleDocument.parse(content)
+        if not len(document):
             print(f"No subtitle blocks found in {subtitle_path}")
             return None
         
         # Extract text for translation
-        texts_to_translate = [block['text'] for block in subtitle_blocks]
-        
-        print(f"Translating {len(texts_to_translate)} subtitle blocks...")
+        texts_to_translate = [clean_text(text) for text in document.texts()]
+        
+        # Cues with nothing to translate are passed through without an API call
+        classifier = CueClassifier(texts_to_translate) if CUE_CLASSIFIER_ENABLED else None
+        pending_texts = classifier.pending_texts if classifier else texts_to_translate
+        self.last_classifier_stats = classifier.get_stats() if classifier else {}
+        
+        # Names, numbers and timestamps become placeholders so similar cues share a translation
+        masker = None
+        masked_texts = pending_texts
+        if PLACEHOLDER_MASKING_ENABLED:
+            masker = PlaceholderMasker(pending_texts, mask_names=SOURCE_LANGUAGE not in CAPITALIZED_NOUN_LANGUAGES)
+            masked_texts = masker.masked
+            self.last_classifier_stats.update(masker.get_stats())
+        
+        # Collapse identical cues so each unique string is translated once
+        dedup = CueDeduplicator(masked_texts)
+        self.last_dedup_stats = dedup.get_stats()
+        self.last_classifier_stats['requests_avoided'] = (
+            self.last_classifier_stats.get('unique_passed_through', 0) +
+            self.last_classifier_stats.get('merged_by_masking', 0)
+        )
+        
+        print(f"Translating {len(pending_texts)} subtitle blocks ({dedup.describe()}, "
+              f"{self.last_classifier_stats['requests_avoided']} requests avoided)...")
         
         # Translate texts
-        translated_texts = self.translate_batch(texts_to_translate)
+        translated_texts = dedup.expand(self.translate_batch(dedup.unique_texts))
+        
+        if masker:
+            translated_texts, failed = masker.unmask(translated_texts)
+            if failed:
+                # Placeholders lost in translation: translate those cues again unmasked
+                retried = self.translate_batch([pending_texts[i] for i in failed])
+                for i, translation in zip(failed, retried):
+                    translated_texts[i] = translation
+        
+        if classifier:
+            translated_texts = classifier.merge(translated_texts)
         
         # Create translated subtitle content
-        translated_content = self._create_translated_srt(subtitle_blocks, translated_texts)
+        translated_content = document.with_texts([text or None for text in translated_texts]).to_srt()
         
         # Write translated subtitle file
         if output_path is None:
@@ -235,72 +269,6 @@ class LARATranslator:
             print(f"Error writing translated subtitle: {e}")
             return None
     
-    def _parse_srt(self, content: str) -> List[Dict]:
-        """Parse SRT content and extract subtitle blocks."""
-        blocks = []
-        lines = content.strip().split('\n')
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # Skip empty lines
-            if not line:
-                i += 1
-                continue
-            
-            # Check if this is a subtitle number
-            if line.isdigit():
-                # Parse subtitle block
-                try:
-                    # Subtitle number
-                    number = int(line)
-                    i += 1
-                    
-                    # Timestamp line
-                    if i < len(lines):
-                        timestamp = lines[i].strip()
-                        i += 1
-                    else:
-                        break
-                    
-                    # Text lines
-                    text_lines = []
-                    while i < len(lines) and lines[i].strip():
-                        text_lines.append(lines[i].strip())
-                        i += 1
-                    
-                    if text_lines:
-                        blocks.append({
-                            'number': number,
-                            'timestamp': timestamp,
-                            'text': ' '.join(text_lines)
-                        })
-                    
-                except (ValueError, IndexError):
-                    i += 1
-                    continue
-            else:
-                i += 1
-        
-        return blocks
-    
-    def _create_translated_srt(self, original_blocks: List[Dict], translated_texts: List[str]) -> str:
-        """Create SRT content from original blocks and translated texts."""
-        if len(original_blocks) != len(translated_texts):
-            print("Warning: Number of original blocks doesn't match translated texts")
-            return ""
-        
-        srt_content = []
-        
-        for i, block in enumerate(original_blocks):
-            srt_content.append(str(block['number']))
-            srt_content.append(block['timestamp'])
-            srt_content.append(translated_texts[i] if translated_texts[i] else block['text'])
-            srt_content.append('')  # Empty line between blocks
-        
-        return '\n'.join(srt_content)
-    
     def reload_credentials(self):
         """Reload credentials from environment variables."""
         print("🔄 Reloading LARA credentials...")
@@ -314,52 +282,6 @@ class LARATranslator:
             print("❌ Failed to reload valid credentials")
         
         return self._credentials_valid
-    
-    def _fix_french_encoding(self, text: str) -> str:
-        """Fix common French encoding issues."""
-        if not text:
-            return text
-        
-        # Common encoding fixes for French characters
-        encoding_fixes = {
-            'Ã©': 'é',  # é
-            'Ã¨': 'è',  # è
-            'Ã ': 'à',  # à
-            'Ã¢': 'â',  # â
-            'Ãª': 'ê',  # ê
-            'Ã®': 'î',  # î
-            'Ã´': 'ô',  # ô
-            'Ã¹': 'ù',  # ù
-            'Ã»': 'û',  # û
-            'Ã§': 'ç',  # ç
-            'Ã«': 'ë',  # ë
-            'Ã¯': 'ï',  # ï
-            'Ã¶': 'ö',  # ö
-            'Ã¼': 'ü',  # ü
-            'Ã¦': 'æ',  # æ
-            'Å"': 'œ',  # œ
-            'Â«': '«',  # «
-            'Â»': '»',  # »
-            'Â°': '°',  # °
-            'Â±': '±',  # ±
-            'Â²': '²',  # ²
-            'Â³': '³',  # ³
-            'Â¼': '¼',  # ¼
-            'Â½': '½',  # ½
-            'Â¾': '¾',  # ¾
-            'Â ': '',   # Remove standalone Â characters
-            'Â?': '?',  # Fix Â followed by question mark
-            'Â!': '!',  # Fix Â followed by exclamation
-            'Â.': '.',  # Fix Â followed by period
-            'Â,': ',',  # Fix Â followed by comma
-        }
-        
-        # Apply fixes
-        fixed_text = text
-        for corrupted, correct in encoding_fixes.items():
-            fixed_text = fixed_text.replace(corrupted, correct)
-        
-        return fixed_text
 
 
 def main():
@@ -6,6 +6,9 @@ from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
 from typing import List, Optional, Callable
 
+from config import SUBTITLE_TRACK_SELECTION
+from modules.track_selector import TRACK_MODES
+
 
 class FolderSelectionFrame(ttk.LabelFrame):
     """Folder selection widgets."""
@@ -268,6 +271,13 @@ class LanguageSelectionFrame(ttk.LabelFrame):
         target_combo = ttk.Combobox(self, textvariable=self.target_language, width=8, state="readonly")
         target_combo['values'] = ['fr', 'en', 'es', 'de', 'it', 'pt', 'ru', 'ja', 'ko', 'zh', 'ar']
         target_combo.grid(row=0, column=3, sticky=tk.W, padx=(0, 10))
+        
+        # Source subtitle track ("auto", "first" or a stream index typed in)
+        ttk.Label(self, text="Source Track:").grid(row=0, column=4, sticky=tk.W, padx=(20, 10))
+        self.track_mode = tk.StringVar(value=SUBTITLE_TRACK_SELECTION)
+        self.track_combo = ttk.Combobox(self, textvariable=self.track_mode, width=8)
+        self.track_combo['values'] = TRACK_MODES
+        self.track_combo.grid(row=0, column=5, sticky=tk.W, padx=(0, 10))
     
     def get_source_language(self) -> str:
         """Get the selected source language."""
@@ -277,6 +287,15 @@ class LanguageSelectionFrame(ttk.LabelFrame):
         """Get the selected target language."""
         return self.target_language.get()
     
+    def set_track_mode_callback(self, callback):
+        """Call ``callback`` once a track mode is picked or typed in (on Enter or leaving the field), not on every keystroke."""
+        for event in ('<<ComboboxSelected>>', '<Return>', '<FocusOut>'):
+            self.track_combo.bind(event, lambda event: callback())
+    
+    def get_track_mode(self) -> str:
+        """Get the source track selection mode."""
+        return self.track_mode.get().strip() or 'auto'
+    
     def set_languages(self, source: str, target: str):
         """Set the source and target languages."""
         self.source_language.set(source)
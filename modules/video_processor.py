@@ -8,11 +8,17 @@ from typing import List, Dict, Optional
 import ffmpeg
 import os
 from config import OUTPUT_DIR, FFMPEG_CRF, FFMPEG_PRESET, FFMPEG_PATH
+from modules.probe_cache import probe_video
+from modules.charset_detection import detect_charset, ffmpeg_charset
+from modules.track_selector import container_language_tag
 
 
 class VideoProcessor:
     """Handles video processing and subtitle incorporation."""
     
+    # ffmpeg encoders for text subtitle files, used when their charset must be converted
+    TEXT_SUBTITLE_CODECS = {'.srt': 'srt', '.ass': 'ass', '.ssa': 'ass', '.vtt': 'webvtt'}
+    
     def __init__(self):
         self.output_dir = OUTPUT_DIR  # Default fallback
         
@@ -36,17 +42,20 @@ class VideoProcessor:
         """Set the output directory for video processing."""
         self.output_dir = output_dir
     
+    @staticmethod
+    def _charset_options(subtitle_path: Path, option: str) -> Dict[str, str]:
+        """ffmpeg option naming a text subtitle file's charset, or none for UTF-8 and bitmap files."""
+        if subtitle_path.suffix.lower() not in VideoProcessor.TEXT_SUBTITLE_CODECS:
+            return {}
+        try:
+            charset = ffmpeg_charset(detect_charset(subtitle_path))
+        except OSError:
+            return {}
+        return {option: charset} if charset else {}
+    
     def incorporate_subtitle(self, video_path: Path, subtitle_path: Path, 
                            output_path: Path = None, language_code: str = 'fra') -> Optional[Path]:
         """Incorporate subtitle file into video."""
-        if not video_path.exists():
-            print(f"Video file not found: {video_path}")
-            return None
-        
-        if not subtitle_path.exists():
-            print(f"Subtitle file not found: {subtitle_path}")
-            return None
-        
         # Create output filename
         if output_path is None:
             video_name = video_path.stem
@@ -54,46 +63,216 @@ class VideoProcessor:
             output_filename = f"{video_name}_with_{subtitle_name}.mkv"
             output_path = self.output_dir / output_filename
         
+        return self.incorporate_subtitles(video_path, [{'path': subtitle_path, 'language': language_code}], output_path)
+    
+    def incorporate_subtitles(self, video_path: Path, tracks: List[Dict],
+                              output_path: Path = None) -> Optional[Path]:
+        """Add several subtitle tracks to a video in a single remux.
+        
+        Each track is a dict with a 'path' and optional 'language' (ISO 639-1
+        or 639-2), 'title', 'default' and 'forced'. Language, title and
+        default/forced flags are set per stream, and the video is read and
+        written once however many tracks are added. Existing streams are kept.
+        """
+        if not tracks:
+            print(f"No subtitle tracks to add to {video_path.name}")
+            return None
+        
+        # Create output filename
+        if output_path is None:
+            output_path = self.output_dir / f"{video_path.stem}_with_subtitles.mkv"
+        
+        variant = {'name': 'subtitles', 'output_path': output_path, 'tracks': tracks, 'keep_subtitles': True}
+        return self.create_output_variants(video_path, [variant]).get('subtitles')
+    
+    def plan_output_variants(self, video_path: Path, tracks: List[Dict], output_path: Path = None,
+                             per_language: bool = False, without_subtitles: bool = False,
+                             hardcoded: bool = False) -> List[Dict]:
+        """Plan the deliverables of one video, to be written by a single ``create_output_variants`` run.
+        
+        Always plans the MKV with every track added; optionally one MKV per
+        language, a subtitle-free MKV and burned-in videos (one per language
+        with ``per_language``, otherwise the first track only).
+        """
+        output_dir = output_path.parent if output_path else self.output_dir
+        variants = [{
+            'name': 'subtitles',
+            'output_path': output_path or output_dir / f"{video_path.stem}_with_subtitles.mkv",
+            'tracks': tracks,
+            'keep_subtitles': True
+        }]
+        
+        if per_language:
+            for track in tracks:
+                language = track.get('language') or Path(track['path']).stem
+                variants.append({
+                    'name': f"subtitles_{language}",
+                    'output_path': output_dir / f"{video_path.stem}_{language}.mkv",
+                    'tracks': [dict(track, default=True)]
+                })
+        
+        if without_subtitles:
+            variants.append({
+                'name': 'no_subtitles',
+                'output_path': output_dir / f"{video_path.stem}_no_subtitles.mkv",
+                'tracks': []
+            })
+        
+        if hardcoded:
+            for track in (tracks if per_language else tracks[:1]):
+                subtitle_path = Path(track['path'])
+                variants.append({
+                    'name': f"hardcoded_{subtitle_path.stem}",
+                    'output_path': output_dir / f"{video_path.stem}_hardcoded_{subtitle_path.stem}.mkv",
+                    'tracks': [],
+                    'burn': subtitle_path
+                })
+        
+        return variants
+    
+    def create_output_variants(self, video_path: Path, variants: List[Dict]) -> Dict[str, Optional[Path]]:
+        """Write several outputs of one video from a single read of the source.
+        
+        Each variant is a dict with a 'name', an 'output_path', the subtitle
+        'tracks' to add (see ``incorporate_subtitles``), 'keep_subtitles' to
+        keep the source's own subtitle streams and an optional subtitle file
+        to 'burn' in. ffmpeg demuxes the source once and feeds every output;
+        stream-copy variants never decode, and burned-in variants share one
+        decode through a ``split`` filter. If the combined run fails, each
+        variant is written on its own so the others still succeed.
+        Returns {variant name: output path, or None on failure}.
+        """
+        if not video_path.exists():
+            print(f"Video file not found: {video_path}")
+            return {variant['name']: None for variant in variants}
+        
+        for variant in variants:
+            for subtitle_path in [track['path'] for track in variant.get('tracks', [])] + [variant.get('burn')]:
+                if subtitle_path and not Path(subtitle_path).exists():
+                    print(f"Subtitle file not found: {subtitle_path}")
+                    return {variant['name']: None for variant in variants}
+        
+        print(f"Processing video: {video_path.name}")
+        for variant in variants:
+            tracks = ', '.join(Path(track['path']).name for track in variant.get('tracks', []))
+            burned = f", burning {Path(variant['burn']).name}" if variant.get('burn') else ''
+            print(f"  🎬 {variant['output_path'].name}: {tracks or 'no added subtitles'}{burned}")
+        
+        # Get video info
+        video_info = self._get_video_info(video_path)
+        if not video_info:
+            return {variant['name']: None for variant in variants}
+        existing = sum(1 for s in video_info.get('streams', []) if s.get('codec_type') == 'subtitle')
+        
         try:
-            print(f"Processing video: {video_path.name}")
-            print(f"Adding subtitle: {subtitle_path.name}")
-            
-            # Get video info
-            video_info = self._get_video_info(video_path)
-            if not video_info:
-                return None
+            subprocess.run(self._variants_command(video_path, variants, existing),
+                           capture_output=True, text=True, errors='replace', check=True)
+        except subprocess.CalledProcessError as e:
+            if len(variants) > 1:
+                print(f"  Combined run failed, writing variants one by one...")
+                results = {}
+                for variant in variants:
+                    results.update(self.create_output_variants(video_path, [variant]))
+                return results
+            print(f"Error processing video {video_path}: {e}")
+            print(f"FFmpeg stderr: {e.stderr}")
+            return {variants[0]['name']: None}
+        except OSError as e:
+            print(f"Error processing video {video_path}: {e}")
+            return {variant['name']: None for variant in variants}
+        
+        results = {}
+        for variant in variants:
+            output_path = variant['output_path']
+            if output_path.exists() and output_path.stat().st_size > 0:
+                print(f"Successfully created video: {output_path.name}")
+                results[variant['name']] = output_path
+            else:
+                print(f"Failed to create video: {output_path.name}")
+                results[variant['name']] = None
+        return results
+    
+    def _variants_command(self, video_path: Path, variants: List[Dict], existing: int) -> List[str]:
+        """ffmpeg command writing every variant: one input per subtitle file, one output per variant.
+        
+        Built directly because ffmpeg-python cannot repeat an option for one
+        stream (language and title metadata).
+        """
+        cmd = ['ffmpeg', '-y', '-i', str(video_path)]
+        
+        # Each subtitle file is read once, whichever variants use it
+        inputs: Dict[Path, int] = {}
+        converted: Dict[Path, bool] = {}
+        for variant in variants:
+            for track in variant.get('tracks', []):
+                subtitle_path = Path(track['path'])
+                if subtitle_path in inputs:
+                    continue
+                # Tell ffmpeg the subtitle charset when it is not UTF-8
+                charset_options = self._charset_options(subtitle_path, 'sub_charenc')
+                for option, value in charset_options.items():
+                    cmd += [f'-{option}', value]
+                cmd += ['-i', str(subtitle_path)]
+                inputs[subtitle_path] = len(inputs) + 1
+                converted[subtitle_path] = bool(charset_options)
+        
+        # Burned-in variants share one decode of the video, split between their subtitle filters
+        burned = [variant for variant in variants if variant.get('burn')]
+        if burned:
+            if len(burned) > 1:
+                graph = [f"[0:v]split={len(burned)}" + ''.join(f"[src{i}]" for i in range(len(burned)))]
+                sources = [f"[src{i}]" for i in range(len(burned))]
+            else:
+                graph, sources = [], ["[0:v]"]
+            for i, (variant, source) in enumerate(zip(burned, sources)):
+                graph.append(f"{source}{self._subtitles_filter(Path(variant['burn']))}[burn{i}]")
+            cmd += ['-filter_complex', ';'.join(graph)]
+        
+        for variant in variants:
+            tracks = variant.get('tracks', [])
+            kept = existing if variant.get('keep_subtitles') else 0
             
-            # Create FFmpeg command to add subtitle
-            stream = ffmpeg.input(str(video_path))
+            if variant.get('burn'):
+                cmd += ['-map', f"[burn{burned.index(variant)}]", '-map', '0:a?']
+            elif variant.get('keep_subtitles'):
+                cmd += ['-map', '0']
+            else:
+                cmd += ['-map', '0:v', '-map', '0:a?']
+            for track in tracks:
+                cmd += ['-map', f"{inputs[Path(track['path'])]}:s:0"]
             
-            # Add subtitle stream
-            subtitle_stream = ffmpeg.input(str(subtitle_path))
+            cmd += ['-c', 'copy']  # Copy every stream; only burned-in video is re-encoded
+            if variant.get('burn'):
+                cmd += ['-c:v', 'libx264', '-crf', str(FFMPEG_CRF), '-preset', FFMPEG_PRESET]
             
-            # Output with subtitle
-            stream = ffmpeg.output(
-                stream, 
-                subtitle_stream,
-                str(output_path),
-                vcodec='copy',  # Copy video codec
-                acodec='copy',  # Copy audio codec
-                scodec='copy',  # Copy subtitle codec
-                metadata=f"language={language_code}",
-                f='matroska'  # Force MKV output format
-            )
+            # A new default track replaces the video's own default subtitle; kept tracks keep their other flags
+            if any(track.get('default') for track in tracks):
+                for n in range(kept):
+                    cmd += [f'-disposition:s:{n}', '-default']
             
-            # Run FFmpeg
-            ffmpeg.run(stream, overwrite_output=True, quiet=False)
+            for i, track in enumerate(tracks):
+                n = kept + i
+                subtitle_path = Path(track['path'])
+                if converted[subtitle_path]:
+                    # Stream copy bypasses the decoder, so a charset conversion needs a (text to text) re-encode
+                    cmd += [f'-c:s:{n}', self.TEXT_SUBTITLE_CODECS[subtitle_path.suffix.lower()]]
+                language = container_language_tag(track.get('language'))
+                if language:
+                    cmd += [f'-metadata:s:s:{n}', f"language={language}"]
+                if track.get('title'):
+                    cmd += [f'-metadata:s:s:{n}', f"title={track['title']}"]
+                flags = [flag for flag in ('default', 'forced') if track.get(flag)]
+                cmd += [f'-disposition:s:{n}', '+'.join(flags) or '0']
             
-            if output_path.exists() and output_path.stat().st_size > 0:
-                print(f"Successfully created video with subtitle: {output_path.name}")
-                return output_path
-            else:
-                print(f"Failed to create video with subtitle: {output_path.name}")
-                return None
-                
-        except ffmpeg.Error as e:
-            print(f"Error processing video {video_path}: {e}")
-            return None
+            cmd += ['-f', 'matroska', str(variant['output_path'])]  # Force MKV output format
+        
+        return cmd
+    
+    def _subtitles_filter(self, subtitle_path: Path) -> str:
+        """``subtitles`` filter burning a file in, escaped for a filter graph (Windows drive colons included)."""
+        escaped = str(subtitle_path).replace('\\', '/').replace("'", r"'\''").replace(':', r'\:')
+        options = ''.join(f":{option}={value}" for option, value in self._charset_options(subtitle_path, 'charenc').items())
+        return f"subtitles=filename='{escaped}'{options}"
     
     def create_hardcoded_subtitle_video(self, video_path: Path, subtitle_path: Path,
                                       output_path: Path = None, language_code: str = 'fra') -> Optional[Path]:
@@ -121,7 +300,8 @@ class VideoProcessor:
             stream = ffmpeg.input(str(video_path))
             
             # Add subtitle filter
-            stream = ffmpeg.filter(stream, 'subtitles', str(subtitle_path))
+            stream = ffmpeg.filter(stream, 'subtitles', str(subtitle_path),
+                                   **self._charset_options(subtitle_path, 'charenc'))
             
             # Output with hardcoded subtitle
             stream = ffmpeg.output(
@@ -149,11 +329,10 @@ class VideoProcessor:
             return None
     
     def _get_video_info(self, video_path: Path) -> Optional[Dict]:
-        """Get information about a video file."""
+        """Get information about a video file (cached, so repeated checks do not re-probe)."""
         try:
-            probe = ffmpeg.probe(str(video_path))
-            return probe
-        except ffmpeg.Error as e:
+            return probe_video(video_path)
+        except (ffmpeg.Error, OSError) as e:
             print(f"Error probing video {video_path}: {e}")
             return None
     
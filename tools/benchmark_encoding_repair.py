@@ -0,0 +1,126 @@
+"""
+Benchmark mojibake repair: the former per-client _fix_french_encoding vs the shared repair engine.
+
+Also checks that valid text, including uppercase Portuguese and French whose
+"Ã " and "Â" look like mojibake, is left unchanged and exits non-zero if not.
+
+Usage:
+    python tools/benchmark_encoding_repair.py [--cues 20000] [--runs 3]
+"""
+import argparse
+import contextlib
+import io
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from modules.encoding_repair import repair_text
+
+SAMPLE_CUES = [
+    "Je ne sais pas où il est allé.",
+    "C'était déjà trop tard, à mon avis.",
+    "Ça va ? Tu as l'air fatigué.",
+    "Nous irons à la plage cet été.",
+    "Il n'y a rien à faire, crois-moi.",
+    "Bonjour !",
+]
+
+# Valid text that must come out of repair_text unchanged
+VALID_CUES = [
+    "IRMÃ E MÃE",
+    "MAÇÃ É BOA",
+    "NÃO SEI, IRMÃ.",
+    "ÇA VA ? À DEMAIN, CHÂTEAU ÉTÉ.",
+    "Â, Ê, Î, Ô, Û : LES ACCENTS CIRCONFLEXES.",
+    "Nous irons à la plage cet été.",
+]
+
+LEGACY_FIXES = {
+    'Ã©': 'é', 'Ã¨': 'è', 'Ã ': 'à', 'Ã¢': 'â', 'Ãª': 'ê', 'Ã®': 'î', 'Ã´': 'ô', 'Ã¹': 'ù',
+    'Ã»': 'û', 'Ã§': 'ç', 'Ã«': 'ë', 'Ã¯': 'ï', 'Ã¶': 'ö', 'Ã¼': 'ü', 'Ã¦': 'æ', 'Å"': 'œ',
+    'Â«': '«', 'Â»': '»', 'Â°': '°', 'Â±': '±', 'Â²': '²', 'Â³': '³', 'Â¼': '¼', 'Â½': '½',
+    'Â¾': '¾', 'Â ': '', 'Â?': '?', 'Â!': '!', 'Â.': '.', 'Â,': ',',
+}
+
+
+def legacy_fix_french_encoding(text: str) -> str:
+    """The former MCPClient._fix_french_encoding, debug prints included."""
+    if not text:
+        return text
+    print(f"🔧 DEBUG: Fixing encoding for: '{text}'")
+    print(f"🔧 DEBUG: Text bytes: {text.encode('utf-8')}")
+    fixed_text = text
+    for corrupted, correct in LEGACY_FIXES.items():
+        if corrupted in fixed_text:
+            print(f"🔧 DEBUG: Replacing '{corrupted}' with '{correct}'")
+            fixed_text = fixed_text.replace(corrupted, correct)
+    pattern = r'Â([?!.,:;])'
+    if re.search(pattern, fixed_text):
+        fixed_text = re.sub(pattern, r'\1', fixed_text)
+    pattern2 = r'Â\s*([?!.,:;])'
+    if re.search(pattern2, fixed_text):
+        fixed_text = re.sub(pattern2, r'\1', fixed_text)
+    if fixed_text != text:
+        print(f"🔧 DEBUG: Fixed text: '{fixed_text}'")
+    else:
+        print(f"🔧 DEBUG: No encoding issues found")
+    return fixed_text
+
+
+def make_cues(count: int):
+    """Alternate clean cues and their mojibake (UTF-8 decoded as Windows-1252) versions."""
+    cues = []
+    for i in range(count):
+        text = SAMPLE_CUES[i % len(SAMPLE_CUES)]
+        cues.append(text.encode('utf-8').decode('cp1252', errors='replace') if i % 2 else text)
+    return cues
+
+
+def cues_per_second(function, cues, runs: int) -> float:
+    """Best throughput of several runs, with any printing discarded."""
+    best = float('inf')
+    for _ in range(runs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            for cue in cues:
+                function(cue)
+            best = min(best, time.perf_counter() - started)
+    return len(cues) / best if best > 0 else float('inf')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mojibake repair throughput")
+    parser.add_argument('--cues', type=int, default=20000, help="Number of cues (half of them garbled)")
+    parser.add_argument('--runs', type=int, default=3, help="Runs per implementation (best is reported)")
+    args = parser.parse_args()
+
+    cues = make_cues(args.cues)
+    expected = [SAMPLE_CUES[i % len(SAMPLE_CUES)] for i in range(args.cues)]
+
+    before = cues_per_second(legacy_fix_french_encoding, cues, args.runs)
+    after = cues_per_second(repair_text, cues, args.runs)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        legacy_correct = sum(legacy_fix_french_encoding(c) == e for c, e in zip(cues, expected))
+    engine_correct = sum(repair_text(c) == e for c, e in zip(cues, expected))
+
+    print(f"📦 {args.cues} cues, half of them garbled")
+    print(f"\nBefore (_fix_french_encoding): {before:12,.0f} cues/s, {legacy_correct / len(cues):.1%} correct")
+    print(f"After (repair_text):           {after:12,.0f} cues/s, {engine_correct / len(cues):.1%} correct")
+    print(f"Speed-up:                      {after / before:12.1f}x")
+
+    altered = [(text, repair_text(text)) for text in VALID_CUES if repair_text(text) != text]
+    garbled = [text.encode('utf-8').decode('cp1252', errors='replace') for text in VALID_CUES]
+    unrepaired = [(text, repair_text(bad)) for text, bad in zip(VALID_CUES, garbled) if repair_text(bad) != text]
+    print(f"\nValid text left unchanged:     {len(VALID_CUES) - len(altered)}/{len(VALID_CUES)}")
+    print(f"Garbled versions repaired:     {len(VALID_CUES) - len(unrepaired)}/{len(VALID_CUES)}")
+    for text, result in altered + unrepaired:
+        print(f"[ERROR] {text!r} -> {result!r}")
+    if altered or unrepaired:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark subtitle extraction: native Matroska reader vs ffmpeg.
+
+Usage:
+    python tools/benchmark_extraction.py path/to/video.mkv [--runs 3]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from modules.matroska_reader import MatroskaReader, TEXT_CODECS
+from modules.subtitle_extractor import SubtitleExtractor
+
+
+def time_engine(extractor: SubtitleExtractor, video_path: Path, indexes, output_format: str, runs: int) -> float:
+    """Return the best wall-clock time of several extraction runs."""
+    best = float('inf')
+    for _ in range(runs):
+        started = time.perf_counter()
+        extractor.extract_subtitles(video_path, indexes, output_format)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def cue_text(path: Path):
+    """Subtitle text lines of an output file, without timing lines."""
+    lines = path.read_text(encoding='utf-8').splitlines()
+    return [line.split(',', 9)[-1] if line.startswith('Dialogue:') else line
+            for line in lines if '-->' not in line]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare native and ffmpeg subtitle extraction")
+    parser.add_argument('video', type=Path, help="Matroska file with text subtitle tracks")
+    parser.add_argument('--runs', type=int, default=3, help="Runs per engine (best time is reported)")
+    args = parser.parse_args()
+
+    with MatroskaReader(args.video) as reader:
+        tracks = [track for track in reader.tracks if track.is_text_subtitle]
+
+    if not tracks:
+        print(f"No text subtitle tracks the native reader can handle in {args.video}")
+        return
+
+    size_mb = args.video.stat().st_size / 1024 / 1024
+    print(f"📦 {args.video.name}: {size_mb:.1f} MB, {len(tracks)} text subtitle track(s)")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        results = {}
+        for engine in ('auto', 'ffmpeg'):
+            extractor = SubtitleExtractor(engine=engine)
+            extractor.subtitles_dir = Path(temp_dir) / engine
+            extractor.subtitles_dir.mkdir()
+
+            elapsed = 0.0
+            for output_format in sorted({TEXT_CODECS[track.codec_id] for track in tracks}):
+                indexes = [track.position for track in tracks if TEXT_CODECS[track.codec_id] == output_format]
+                elapsed += time_engine(extractor, args.video, indexes, output_format, args.runs)
+            results[engine] = elapsed
+
+        # ffmpeg shifts timestamps by the input start time, so only the text is compared
+        native_files = sorted((Path(temp_dir) / 'auto').iterdir())
+        identical = all(cue_text(path) == cue_text(Path(temp_dir) / 'ffmpeg' / path.name)
+                        for path in native_files)
+
+    print(f"\nNative reader: {results['auto']:.3f}s")
+    print(f"ffmpeg:        {results['ffmpeg']:.3f}s")
+    if results['auto'] > 0:
+        print(f"Speed-up:      {results['ffmpeg'] / results['auto']:.1f}x")
+    print(f"Cue text identical: {'yes' if identical else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark SRT parsing and serialization with the compact subtitle model.
+
+Usage:
+    python tools/benchmark_subtitle_model.py [path/to/file.srt] [--cues 10000] [--runs 5]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from modules.subtitle_model import SubtitleDocument, format_timestamp
+
+
+def synthetic_srt(cues: int) -> str:
+    """SRT content with two-line cues, CRLF line endings and a BOM."""
+    parts = ['\ufeff']
+    for i in range(cues):
+        start = i * 2500
+        parts.append(f"{i + 1}\r\n{format_timestamp(start)} --> {format_timestamp(start + 2000)}\r\n"
+                     f"Line {i} of the subtitle, with <i>some</i> markup.\r\nSecond line {i}!\r\n\r\n")
+    return ''.join(parts)
+
+
+def parse_dict_per_cue(content: str):
+    """Line-by-line parser building one dict per cue (the previous approach), as the baseline.
+
+    It keeps timing lines as strings, so it does less work than the compact
+    model, which converts every timestamp to milliseconds.
+    """
+    entries = []
+    lines = content.strip().split('\n')
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        if line.isdigit():
+            entry = {'number': line}
+            i += 1
+            if i < len(lines):
+                entry['timing'] = lines[i].strip()
+                i += 1
+            text_lines = []
+            while i < len(lines) and lines[i].strip() and not lines[i].strip().isdigit():
+                text_lines.append(lines[i].strip())
+                i += 1
+            if text_lines:
+                entry['text'] = '\n'.join(text_lines)
+                entries.append(entry)
+        i += 1
+    return entries
+
+
+def best_time(function, runs: int) -> float:
+    """Return the best wall-clock time of several runs."""
+    best = float('inf')
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def peak_memory(function) -> int:
+    """Peak bytes allocated while building and holding a function's result."""
+    tracemalloc.start()
+    result = function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the compact SRT parser and writer")
+    parser.add_argument('srt', type=Path, nargs='?', help="SRT file to benchmark (default: synthetic content)")
+    parser.add_argument('--cues', type=int, default=10000, help="Cues in the synthetic content")
+    parser.add_argument('--runs', type=int, default=5, help="Runs per measurement (best time is reported)")
+    args = parser.parse_args()
+
+    if args.srt:
+        content = args.srt.read_text(encoding='utf-8', errors='replace')
+        label = args.srt.name
+    else:
+        content = synthetic_srt(args.cues)
+        label = f"synthetic ({args.cues} cues)"
+
+    document = SubtitleDocument.parse(content)
+    print(f"📦 {label}: {len(content) / 1024:.0f} KB, {len(document)} cues")
+
+    parse_time = best_time(lambda: SubtitleDocument.parse(content), args.runs)
+    baseline_time = best_time(lambda: parse_dict_per_cue(content), args.runs)
+    write_time = best_time(document.to_srt, args.runs)
+    memory = peak_memory(lambda: SubtitleDocument.parse(content))
+    baseline_memory = peak_memory(lambda: parse_dict_per_cue(content))
+
+    print(f"\nParse (compact model):                {parse_time * 1000:8.1f} ms, peak {memory / 1024:8.0f} KB")
+    print(f"Parse (dict per cue, timing as text): {baseline_time * 1000:8.1f} ms, peak {baseline_memory / 1024:8.0f} KB")
+    print(f"Serialize (compact model):            {write_time * 1000:8.1f} ms")
+    if memory > 0:
+        print(f"Memory saved:                         {1 - memory / baseline_memory:8.0%}")
+    print(f"Round trip stable: {'yes' if SubtitleDocument.parse(document.to_srt()).to_srt() == document.to_srt() else 'no'}")
+
+
+if __name__ == "__main__":
+    main()